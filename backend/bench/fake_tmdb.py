@@ -0,0 +1,250 @@
+"""
+Local stand-in for the TMDB API, for benchmarks and offline runs.
+
+Answers from recorded fixtures when it has the exact request (fixtures are keyed like
+the response cache: "/path?k=v&..." without api_key, see fixtures.py) and otherwise
+from a deterministic synthetic catalogue, so every endpoint the backend uses works
+with no fixtures at all. Latency, jitter and error rate are injected per request.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PAGE_SIZE = 20
+GENRES = [
+    (28, "Aksiyon"), (12, "Macera"), (16, "Animasyon"), (35, "Komedi"), (80, "Suç"),
+    (18, "Dram"), (14, "Fantastik"), (27, "Korku"), (878, "Bilim-Kurgu"), (53, "Gerilim"),
+]
+WORDS = [
+    "yüzüklerin", "efendisi", "matrix", "yıldız", "savaşları", "istanbul", "karanlık",
+    "şövalye", "dönüş", "gece", "son", "büyük", "kayıp", "şehir", "aşk", "hikaye",
+    "ölüm", "yolu", "deniz", "ateş", "kral", "sır", "zaman", "rüya", "gölge",
+]
+
+
+class Catalogue:
+    """Synthetic movies 1..n with genres, collections (odd ids, in groups of up to three) and recommendations."""
+
+    def __init__(self, n_movies: int = 2000, seed: int = 42):
+        self.n_movies = n_movies
+        rng = random.Random(seed)
+        self.movies = {}
+        for mid in range(1, n_movies + 1):
+            title = " ".join(rng.sample(WORDS, rng.randint(1, 3))).title()
+            self.movies[mid] = {
+                "id": mid,
+                "title": title,
+                "original_title": title,
+                "poster_path": f"/poster{mid}.jpg",
+                "backdrop_path": f"/backdrop{mid}.jpg",
+                "release_date": f"{rng.randint(1960, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "vote_average": round(rng.uniform(3, 9), 1),
+                "vote_count": rng.randint(0, 20000),
+                # Roughly Zipf-shaped, like the real catalogue
+                "popularity": round(1000 / mid ** 0.7, 3),
+                "overview": "Sentetik film.",
+                "genre_ids": sorted({rng.choice(GENRES)[0] for _ in range(rng.randint(1, 3))}),
+            }
+        self.by_popularity = sorted(self.movies.values(), key=lambda m: -m["popularity"])
+        self._seed = seed
+
+    def collection_of(self, mid: int):
+        return 100000 + (mid - 1) // 3 if mid % 2 == 1 else None
+
+    def details(self, mid: int, append: str = "") -> dict | None:
+        movie = self.movies.get(mid)
+        if movie is None:
+            return None
+        genre_names = dict(GENRES)
+        details = {
+            **movie,
+            "runtime": 80 + mid % 90,
+            "genres": [{"id": gid, "name": genre_names[gid]} for gid in movie["genre_ids"]],
+            "belongs_to_collection": None,
+        }
+        collection_id = self.collection_of(mid)
+        if collection_id is not None:
+            details["belongs_to_collection"] = {"id": collection_id, "name": f"{movie['title']} Serisi"}
+        if "credits" in append:
+            details["credits"] = self.credits(mid)
+        if "recommendations" in append:
+            details["recommendations"] = self.page(self.recommendations(mid), 1)
+        return details
+
+    def credits(self, mid: int) -> dict:
+        rng = random.Random(self._seed * 7919 + mid)
+        return {
+            "id": mid,
+            "cast": [{"name": f"Oyuncu {rng.randint(1, 5000)}", "order": i} for i in range(15)],
+            "crew": [{"name": f"Yönetmen {mid % 700}", "job": "Director"}]
+                    + [{"name": f"Ekip {rng.randint(1, 5000)}", "job": "Writer"} for _ in range(10)],
+        }
+
+    def recommendations(self, mid: int) -> list[dict]:
+        # Biased towards popular movies and towards neighbours, so multi-movie
+        # selections actually share candidates
+        rng = random.Random(self._seed * 104729 + mid)
+        picks = []
+        while len(picks) < PAGE_SIZE:
+            if rng.random() < 0.5:
+                other = max(1, min(self.n_movies, mid + rng.randint(-60, 60)))
+            else:
+                other = min(self.n_movies, int(rng.paretovariate(0.8)))
+            if other != mid and other not in picks:
+                picks.append(other)
+        return [self.movies[o] for o in picks]
+
+    def collection(self, collection_id: int) -> dict | None:
+        first = (collection_id - 100000) * 3 + 1
+        parts = [self.movies[m] for m in range(first, first + 3) if m in self.movies and self.collection_of(m) == collection_id]
+        if not parts:
+            return None
+        return {"id": collection_id, "name": f"{parts[0]['title']} Serisi", "parts": parts[::-1]}
+
+    def search(self, query: str) -> list[dict]:
+        q = query.casefold()
+        return [m for m in self.by_popularity if q in m["title"].casefold()]
+
+    def discover(self, with_genres: str) -> list[dict]:
+        wanted = {int(g) for g in with_genres.replace(",", "|").split("|") if g}
+        return [m for m in self.by_popularity if wanted & set(m["genre_ids"])]
+
+    @staticmethod
+    def page(results: list[dict], page: int) -> dict:
+        total = len(results)
+        return {
+            "page": page,
+            "results": results[(page - 1) * PAGE_SIZE:page * PAGE_SIZE],
+            "total_pages": max(1, -(-total // PAGE_SIZE)),
+            "total_results": total,
+        }
+
+
+def fixture_key(path: str, params: dict) -> str:
+    # Same shape as tmdb_service.cache_key
+    query = "&".join(f"{k}={params[k]}" for k in sorted(params) if k != "api_key")
+    return f"{path}?{query}"
+
+
+def create_fake_tmdb(
+    fixtures: dict | None = None,
+    catalogue: Catalogue | None = None,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 42,
+) -> FastAPI:
+    """
+    FastAPI app that serves the TMDB endpoints the backend uses under /3.
+    app.state.calls counts requests by endpoint ("movie", "collection", "trending", ...);
+    GET /__stats returns the counter and POST /__reset clears it.
+    """
+    app = FastAPI()
+    app.state.calls = Counter()
+    fixtures = fixtures or {}
+    catalogue = catalogue or Catalogue(seed=seed)
+    rng = random.Random(seed)
+
+    @app.get("/__stats")
+    def stats():
+        return dict(app.state.calls)
+
+    @app.post("/__reset")
+    def reset():
+        app.state.calls.clear()
+        return {}
+
+    @app.get("/3/{path:path}")
+    async def tmdb(path: str, request: Request):
+        path = "/" + path
+        params = dict(request.query_params)
+        app.state.calls[path.strip("/").split("/")[0]] += 1
+        app.state.calls["total"] += 1
+
+        delay = latency_ms + rng.uniform(0, jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if error_rate and rng.random() < error_rate:
+            return JSONResponse({"status_code": 11, "status_message": "Injected error"}, status_code=503)
+
+        key = fixture_key(path, params)
+        if key in fixtures:
+            return JSONResponse(fixtures[key])
+
+        data = answer(catalogue, path, params)
+        if data is None:
+            return JSONResponse({"status_code": 34, "status_message": "Not found"}, status_code=404)
+        return JSONResponse(data)
+
+    return app
+
+
+def answer(catalogue: Catalogue, path: str, params: dict):
+    parts = path.strip("/").split("/")
+    page = int(params.get("page", 1))
+    if page > 500:
+        return None
+
+    if parts[0] == "movie" and len(parts) == 2 and parts[1].isdigit():
+        return catalogue.details(int(parts[1]), params.get("append_to_response", ""))
+    if parts[0] == "movie" and len(parts) == 3 and parts[1].isdigit():
+        if parts[2] == "credits":
+            return catalogue.credits(int(parts[1]))
+        if parts[2] == "recommendations":
+            return catalogue.page(catalogue.recommendations(int(parts[1])), page)
+    if parts[0] == "collection" and len(parts) == 2 and parts[1].isdigit():
+        return catalogue.collection(int(parts[1]))
+    if path == "/trending/movie/week":
+        return catalogue.page(catalogue.by_popularity[:200], page)
+    if path == "/search/movie":
+        return catalogue.page(catalogue.search(params.get("query", "")), page)
+    if path == "/discover/movie":
+        return catalogue.page(catalogue.discover(params.get("with_genres", "")), page)
+    return None
+
+
+class FakeTMDBServer:
+    """Runs a fake TMDB app with uvicorn on 127.0.0.1 in a background thread."""
+
+    def __init__(self, app: FastAPI, port: int = 0):
+        self.app = app
+        self.config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(self.config)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        sock = self.server.servers[0].sockets[0]
+        host, port = sock.getsockname()[:2]
+        return f"http://{host}:{port}/3"
+
+    @property
+    def calls(self) -> Counter:
+        return self.app.state.calls
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake TMDB server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,57 @@
+"""
+Record TMDB fixtures for the fake server from the TMDB response cache.
+
+Usage:
+    python bench/fixtures.py [--cache .cache/tmdb_cache.sqlite3] [--output bench/fixtures.json.gz]
+
+Every payload in the cache (whatever the app or warm.py fetched from the real API,
+expired entries included) is written as {cache key: payload}. The fake server
+answers those requests with the recorded payloads; anything else falls back to its
+synthetic catalogue.
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_fixtures(path) -> dict:
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def export_fixtures(cache_path, output) -> int:
+    db = sqlite3.connect(cache_path)
+    try:
+        fixtures = {key: json.loads(value) for key, value in db.execute("SELECT key, value FROM entries ORDER BY key")}
+    finally:
+        db.close()
+
+    opener = gzip.open if str(output).endswith(".gz") else open
+    with opener(output, "wt", encoding="utf-8") as f:
+        json.dump(fixtures, f, ensure_ascii=False, separators=(",", ":"))
+    return len(fixtures)
+
+
+def main():
+    from services.tmdb_service import TMDB_CACHE_PATH
+
+    parser = argparse.ArgumentParser(description="Record fake TMDB fixtures from the response cache")
+    parser.add_argument("--cache", default=TMDB_CACHE_PATH, help="TMDB response cache (SQLite)")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures.json.gz"))
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cache):
+        print(f"No TMDB cache at {args.cache}, nothing to record")
+        return
+    count = export_fixtures(args.cache, args.output)
+    print(f"Recorded {count} responses into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
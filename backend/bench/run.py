@@ -0,0 +1,249 @@
+"""
+Benchmark the API offline against a local fake TMDB server (bench/fake_tmdb.py).
+
+Usage:
+    python bench/run.py [--concurrency 1,8,32] [--requests 200] [--latency-ms 40 --jitter-ms 20]
+                        [--error-rate 0.01] [--cache cold|warm|off] [--fixtures bench/fixtures.json.gz]
+                        [--endpoints search,trends,details,recommendations-1,...] [--output results.json]
+
+Every endpoint is driven in-process (ASGI, the real lifespan and TMDB client) at each
+concurrency level and reported with p50/p95/p99 latency, throughput and the number of
+upstream calls it caused. With --output the report is written as JSON with stable key
+order. Requests are drawn from a seeded generator, so two reports of the same
+configuration differ only where the code did: diffing them shows latency as well as
+fan-out (upstream call) regressions.
+
+Cache modes: "cold" clears what earlier runs left behind before every run (the TMDB
+response cache, recommendation sessions, the collection index and the typeahead
+cache), "warm" also replays the run's requests once untimed first, "off" disables
+the response cache entirely.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+sys.path.append(BENCH_DIR)
+
+from fake_tmdb import WORDS, Catalogue, FakeTMDBServer, create_fake_tmdb
+from fixtures import load_fixtures
+
+ENDPOINTS = ["search", "trends", "details", "recommendations-1", "recommendations-5", "recommendations-20"]
+
+
+def request_pool(catalogue: Catalogue, fixtures: dict):
+    """Movie ids and search queries to draw requests from (the recorded ones when there are fixtures)."""
+    movie_ids = sorted({int(m) for key in fixtures for m in re.findall(r"^/movie/(\d+)\?", key)})
+    queries = sorted({q for key in fixtures if key.startswith("/search/movie?")
+                      for q in parse_qs(key.split("?", 1)[1]).get("query", [])})
+    if not movie_ids:
+        movie_ids = [m["id"] for m in catalogue.by_popularity[:500]]
+    if not queries:
+        queries = sorted({word[:n] for word in WORDS for n in (3, 4, len(word))})
+    return movie_ids, queries
+
+
+def build_requests(endpoint: str, count: int, movie_ids: list[int], queries: list[str], rng: random.Random):
+    urls = []
+    for _ in range(count):
+        if endpoint == "search":
+            urls.append(f"/api/movies/search?query={rng.choice(queries)}")
+        elif endpoint == "trends":
+            urls.append("/api/movies/trends")
+        elif endpoint == "details":
+            urls.append(f"/api/movies/{rng.choice(movie_ids)}")
+        elif endpoint.startswith("recommendations-"):
+            size = min(int(endpoint.split("-")[1]), len(movie_ids))
+            urls.append(f"/api/recommendations?movie_ids={','.join(map(str, rng.sample(movie_ids, size)))}")
+        else:
+            raise ValueError(f"Unknown endpoint {endpoint}")
+    return urls
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    # Nearest-rank, so the value is always one that was actually measured
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+async def drive(client, urls: list[str], concurrency: int):
+    queue = list(reversed(urls))
+    latencies, errors, degraded = [], 0, 0
+
+    async def worker():
+        nonlocal errors, degraded
+        while queue:
+            url = queue.pop()
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                failed = response.status_code >= 400
+                # Shed by admission control and answered from cache (see main.py)
+                degraded += "x-degraded" in response.headers
+            except Exception:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, degraded, time.perf_counter() - started
+
+
+async def settle():
+    # Let speculative background work (page prefetches) finish so it's counted in this run
+    from services import tmdb_service
+    while tmdb_service._background:
+        await asyncio.gather(*tmdb_service._background, return_exceptions=True)
+
+
+def reset_caches():
+    # Everything a run would otherwise find filled by the runs before it (all in tmp, see main())
+    from services import tmdb_service
+    tmdb_service.response_cache.clear()
+    tmdb_service.rec_sessions.clear()
+    tmdb_service.collection_index.clear()
+    tmdb_service.typeahead_cache.clear()
+
+
+async def run_benchmarks(args, server: FakeTMDBServer, movie_ids, queries):
+    import httpx
+    import main
+
+    results = []
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    rng = random.Random(f"{args.seed}-{endpoint}-{concurrency}")
+                    urls = build_requests(endpoint, args.requests, movie_ids, queries, rng)
+
+                    reset_caches()
+                    if args.cache == "warm":
+                        await drive(client, urls, concurrency)
+                    await settle()
+
+                    before = Counter(server.calls)
+                    latencies, errors, degraded, elapsed = await drive(client, urls, concurrency)
+                    await settle()
+                    upstream = Counter(server.calls)
+                    upstream.subtract(before)
+
+                    latencies.sort()
+                    result = {
+                        "endpoint": endpoint,
+                        "concurrency": concurrency,
+                        "requests": len(urls),
+                        "errors": errors,
+                        "degraded": degraded,
+                        "p50_ms": round(percentile(latencies, 50), 2),
+                        "p95_ms": round(percentile(latencies, 95), 2),
+                        "p99_ms": round(percentile(latencies, 99), 2),
+                        "mean_ms": round(sum(latencies) / len(latencies), 2),
+                        "max_ms": round(latencies[-1], 2),
+                        "throughput_rps": round(len(urls) / elapsed, 1),
+                        "upstream_calls": upstream["total"],
+                        "upstream_calls_per_request": round(upstream["total"] / len(urls), 3),
+                        "upstream_by_endpoint": {k: v for k, v in sorted(upstream.items()) if k != "total" and v},
+                    }
+                    results.append(result)
+                    print(f"{endpoint:<20} c={concurrency:<4} p50={result['p50_ms']:>8.2f}ms "
+                          f"p95={result['p95_ms']:>8.2f}ms p99={result['p99_ms']:>8.2f}ms "
+                          f"{result['throughput_rps']:>8.1f} req/s  upstream={result['upstream_calls']:<5} "
+                          f"errors={errors}  degraded={degraded}")
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=BENCH_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline API benchmark against a fake TMDB")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma separated, from: " + ", ".join(ENDPOINTS))
+    parser.add_argument("--concurrency", default="1,8,32", help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="injected upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="extra random upstream latency (uniform)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream requests answered with 503")
+    parser.add_argument("--cache", choices=["cold", "warm", "off"], default="cold")
+    parser.add_argument("--fixtures", help="recorded responses (see bench/fixtures.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else {}
+    catalogue = Catalogue(seed=args.seed)
+    movie_ids, queries = request_pool(catalogue, fixtures)
+    fake = create_fake_tmdb(fixtures, catalogue, args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp, FakeTMDBServer(fake) as server:
+        # Must be in place before the app modules are imported (they read it at import time).
+        # Explicit environment settings still win for the read-only indexes and the limits;
+        # the stores a run writes to (and reset_caches() empties) always live in tmp, so
+        # the fake upstream's data never ends up in, or wipes, a real cache or index.
+        os.environ["TMDB_BASE_URL"] = server.base_url
+        os.environ["TMDB_API_KEY"] = "bench"
+        os.environ["TMDB_CACHE_ENABLED"] = "false" if args.cache == "off" else "true"
+        os.environ["TMDB_CACHE_PATH"] = os.path.join(tmp, "tmdb_cache.sqlite3")
+        os.environ["COLLECTION_INDEX_PATH"] = os.path.join(tmp, "collections.sqlite3")
+        os.environ["PREFETCH_ENABLED"] = "false"
+        os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(tmp, "search_index.bin"))
+        os.environ.setdefault("REC_MATRIX_PATH", os.path.join(tmp, "rec_matrix"))
+        os.environ.setdefault("IMAGE_CACHE_DIR", os.path.join(tmp, "images"))
+        os.environ.setdefault("TMDB_RATE_LIMIT", "100000")
+        os.environ.setdefault("TMDB_RATE_BURST", "100000")
+
+        if sys.platform == 'win32':
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        results = asyncio.run(run_benchmarks(args, server, movie_ids, queries))
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "cache": args.cache,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "error_rate": args.error_rate,
+                "fixtures": len(fixtures),
+                "seed": args.seed,
+            },
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Measure cold start against its budget: how long importing the app takes, and how long
+a fresh server process takes until /ready answers 200 (imports, lifespan, warm-up).
+
+Usage:
+    python bench/startup.py [--runs 5] [--import-budget 0.8] [--ready-budget 1.0] [--profile]
+
+Every run is a new interpreter, so nothing is shared between runs but the OS page
+cache; the medians are compared with the budgets and the exit status is 1 when one
+is over. --profile lists the imports that took longest (python -X importtime), which
+is where to look when the import budget is blown. Uses the configured indexes and
+caches (see services/settings.py); prefetching is off unless set explicitly.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("PREFETCH_ENABLED", "false")
+    return env
+
+
+def measure_import() -> float:
+    result = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=child_env(),
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(timeout: float = 30.0) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=child_env(),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass  # not listening yet, or 503 while warming up
+            if server.poll() is not None:
+                raise RuntimeError(f"The server exited with status {server.returncode}")
+            time.sleep(0.005)
+        raise RuntimeError(f"/ready didn't answer 200 within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def slowest_imports(count: int = 15) -> list[tuple[float, float, str]]:
+    """(cumulative, self, module) in seconds for the imports of main that took longest."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR,
+                            env=child_env(), capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1e6, int(own) / 1e6, module.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    from services.settings import settings
+
+    parser = argparse.ArgumentParser(description="Measure cold start against its budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=settings.startup_import_budget,
+                        help="seconds (default: STARTUP_IMPORT_BUDGET)")
+    parser.add_argument("--ready-budget", type=float, default=1.0, help="seconds from process start to /ready")
+    parser.add_argument("--profile", action="store_true", help="list the slowest imports")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    readies = [measure_ready() for _ in range(args.runs)]
+
+    over = False
+    for label, values, budget in (("import main", imports, args.import_budget), ("ready", readies, args.ready_budget)):
+        median = statistics.median(values)
+        over |= median > budget
+        print(f"{label:12} median {median:.3f}s  min {min(values):.3f}s  max {max(values):.3f}s  "
+              f"budget {budget:.3f}s  {'OVER' if median > budget else 'ok'}")
+
+    if args.profile:
+        print(f"\n{'cumulative':>10} {'self':>8}  module")
+        for cumulative, own, module in slowest_imports():
+            print(f"{cumulative:10.3f} {own:8.3f}  {module}")
+
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
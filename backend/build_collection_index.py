@@ -0,0 +1,88 @@
+"""
+Bulk load the movie -> collection index used for sequel groups.
+
+Usage:
+    python build_collection_index.py collection_ids_05_15_2024.json.gz [--concurrency 8] [--all]
+
+The input is TMDB's daily collection ID export (gzipped, one JSON object per line:
+{"id": 10, "name": "Star Wars Collection"}), see
+https://developer.themoviedb.org/docs/daily-id-exports. Each collection is fetched once
+through the normal TMDB client (rate limited, cached) and indexed with its parts, so
+every movie that belongs to a collection is mapped. Collections already indexed and
+still fresh are skipped unless --all is given, so re-running the script only refreshes
+what went stale. The index is shared with running servers (SQLite); they pick up the
+new entries on restart and keep adding to it as they go.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+
+# Add project root to python path to allow imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.tmdb_service import (
+    collection_index, create_tmdb_client, fetch_sequel_group, gather_bounded, response_cache,
+)
+from services.upstream import UpstreamUnavailable
+
+
+def read_export(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f if line.strip()]
+
+
+async def load(collection_ids, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    indexed = failed = 0
+
+    async def index_one(collection_id):
+        nonlocal indexed, failed
+        try:
+            group = await fetch_sequel_group(client, collection_id)
+        except UpstreamUnavailable:
+            group = None
+        if group:
+            indexed += 1
+        else:
+            failed += 1
+        done = indexed + failed
+        if done % 500 == 0:
+            print(f"  {done}/{len(collection_ids)}")
+
+    async with create_tmdb_client() as client:
+        await gather_bounded(index_one, collection_ids, semaphore)
+    return indexed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load the movie -> collection index")
+    parser.add_argument("exports", nargs="+", help="TMDB collection_ids_*.json.gz export file(s)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--all", action="store_true", help="re-fetch collections that are already indexed and fresh")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    collection_ids = []
+    for export in args.exports:
+        collection_ids.extend(read_export(export))
+    collection_ids = list(dict.fromkeys(collection_ids))
+    if not args.all:
+        collection_ids = [cid for cid in collection_ids if collection_index.stale(cid)]
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    indexed, failed = asyncio.run(load(collection_ids, args.concurrency))
+    print(f"Indexed {indexed} collections ({failed} missing or failed), {len(collection_index)} in the index, "
+          f"in {time.perf_counter() - started:.1f}s")
+    collection_index.close()
+    response_cache.close()
+
+
+if __name__ == "__main__":
+    main()
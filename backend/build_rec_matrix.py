@@ -0,0 +1,80 @@
+"""
+Build the precomputed item-to-item recommendation matrix used by /api/recommendations.
+
+Usage:
+    python build_rec_matrix.py [--fetch ids.txt]
+
+Harvests every recommendation list sitting in the TMDB response cache (they come
+appended to the cached movie details).
+With --fetch, the lists of the movie ids in the given file (one per line) are first
+downloaded into the cache. Running servers pick up a new matrix on restart.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+# Add project root to python path to allow imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.rec_matrix import RecMatrix, write_matrix
+from services.tmdb_service import (
+    LANGUAGE, REC_MATRIX_PATH, TMDB_CACHE_PATH,
+    bundled_recommendations, create_tmdb_client, gather_bounded, get_movie_recommendations, response_cache,
+)
+
+
+async def fetch_lists(movie_ids):
+    async with create_tmdb_client() as client:
+        await gather_bounded(lambda mid: get_movie_recommendations(client, mid), movie_ids)
+    response_cache.close()
+
+
+def harvest(cache_path):
+    # Movie details are fetched with their recommendations appended (first page)
+    details_key = re.compile(rf"^/movie/(\d+)\?append_to_response=[^&]*recommendations[^&]*&language={re.escape(LANGUAGE)}$")
+    rec_lists = {}
+    db = sqlite3.connect(cache_path)
+    try:
+        for key, value in db.execute("SELECT key, value FROM entries WHERE key LIKE '/movie/%'"):
+            match = details_key.match(key)
+            if match:
+                rec_lists[int(match.group(1))] = bundled_recommendations(json.loads(value))
+    finally:
+        db.close()
+    return rec_lists
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the item-to-item recommendation matrix")
+    parser.add_argument("--fetch", help="file with movie ids (one per line) whose lists should be downloaded first")
+    parser.add_argument("--cache", default=TMDB_CACHE_PATH, help="TMDB response cache (SQLite)")
+    parser.add_argument("--output", default=REC_MATRIX_PATH, help="matrix directory to write")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.fetch:
+        with open(args.fetch) as f:
+            ids = [int(line) for line in f if line.strip()]
+        asyncio.run(fetch_lists(ids))
+
+    if not os.path.exists(args.cache):
+        print(f"No TMDB cache at {args.cache}, nothing to harvest")
+        return
+
+    rec_lists = harvest(args.cache)
+    write_matrix(args.output, rec_lists)
+
+    matrix = RecMatrix(args.output)
+    matrix.rows_for([0])  # load it back as a sanity check
+    print(f"Built matrix from {len(rec_lists)} recommendation lists "
+          f"({len(matrix.ids)} movies, {len(matrix.indices)} links) into {args.output} "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
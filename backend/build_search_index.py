@@ -0,0 +1,104 @@
+"""
+Build the local movie search index used by /api/movies/search.
+
+Usage:
+    python build_search_index.py movie_ids_05_15_2024.json.gz [--min-popularity 1.0]
+
+The input is TMDB's daily ID export (gzipped, one JSON object per line:
+{"adult": false, "id": 603, "original_title": "The Matrix", "popularity": 80.1, "video": false}),
+see https://developer.themoviedb.org/docs/daily-id-exports.
+Localized titles, posters, release dates and ratings are taken from movie details
+already sitting in the TMDB response cache (warm.py fills it). Every movie of the
+export is indexed, so the index knows all matches of a query (above
+--min-popularity); the ones without cached details are indexed by their original
+title only, and the service fills those in from the response cache as it fills up
+(or asks TMDB while it can't). Running servers pick up a new index on restart.
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+# Add project root to python path to allow imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.search_index import SearchIndex, write_index
+from services.tmdb_service import LANGUAGE, SEARCH_INDEX_PATH, TMDB_CACHE_PATH
+
+
+def read_export(path, min_popularity):
+    movies = {}
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if row.get("adult") or row.get("video"):
+                continue
+            if (row.get("popularity") or 0) < min_popularity:
+                continue
+            movies[row["id"]] = {
+                "id": row["id"],
+                "title": row.get("original_title"),
+                "original_title": row.get("original_title"),
+                "popularity": row.get("popularity") or 0,
+            }
+    return movies
+
+
+def merge_cached_details(movies, cache_path):
+    """Fill in the movies' details from the response cache; returns the ids that had them."""
+    merged = set()
+    if not os.path.exists(cache_path):
+        return merged
+
+    details_key = re.compile(rf"^/movie/(\d+)\?(?:append_to_response=[^&]*&)?language={re.escape(LANGUAGE)}$")
+    db = sqlite3.connect(cache_path)
+    try:
+        for key, value in db.execute("SELECT key, value FROM entries WHERE key LIKE '/movie/%'"):
+            match = details_key.match(key)
+            if not match:
+                continue
+            movie = movies.get(int(match.group(1)))
+            if movie is None:
+                continue
+            details = json.loads(value)
+            for field in ("title", "poster_path", "release_date", "vote_average"):
+                if details.get(field):
+                    movie[field] = details[field]
+            merged.add(movie["id"])
+    finally:
+        db.close()
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local movie search index")
+    parser.add_argument("exports", nargs="+", help="TMDB movie_ids_*.json.gz export file(s)")
+    parser.add_argument("--min-popularity", type=float, default=1.0,
+                        help="skip movies below this popularity to keep the index small")
+    parser.add_argument("--cache", default=TMDB_CACHE_PATH, help="TMDB response cache (SQLite)")
+    parser.add_argument("--output", default=SEARCH_INDEX_PATH, help="index file to write")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    movies = {}
+    for export in args.exports:
+        movies.update(read_export(export, args.min_popularity))
+    merged = merge_cached_details(movies, args.cache)
+
+    write_index(args.output, list(movies.values()))
+    index = SearchIndex(args.output)
+    print(f"Indexed {len(index)} movies ({len(merged)} with cached details) into {args.output} "
+          f"({os.path.getsize(args.output) / 1024 / 1024:.1f} MB) in {time.perf_counter() - started:.1f}s")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
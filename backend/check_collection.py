@@ -2,16 +2,15 @@ import asyncio
 import os
 import sys
 from pathlib import Path
-import httpx
 
 # Add project root to python path to allow imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from services.tmdb_service import get_movie_details
+from services.tmdb_service import create_tmdb_client, get_movie_details
 
 async def check_collection():
     print("--- Checking Avatar (19995) ---")
-    async with httpx.AsyncClient() as client:
+    async with create_tmdb_client() as client:
         details = await get_movie_details(client, 19995)
         if details:
             print(f"Title: {details.get('title')}")
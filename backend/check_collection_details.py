@@ -2,16 +2,15 @@ import asyncio
 import os
 import sys
 from pathlib import Path
-import httpx
 
 # Add project root to python path to allow imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from services.tmdb_service import TMDB_API_KEY, BASE_URL
+from services.tmdb_service import TMDB_API_KEY, BASE_URL, create_tmdb_client
 
 async def check_collection_details(collection_id):
     print(f"--- Checking Collection Details ({collection_id}) ---")
-    async with httpx.AsyncClient() as client:
+    async with create_tmdb_client() as client:
         response = await client.get(
             f"{BASE_URL}/collection/{collection_id}",
             params={"api_key": TMDB_API_KEY, "language": "tr-TR"}
@@ -1,9 +1,172 @@
-from fastapi import FastAPI
+import time
+
+# How long importing the app takes, from here to the end of this module; checked
+# against STARTUP_IMPORT_BUDGET at startup (bench/startup.py measures it from a fresh process)
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import os
-from services.tmdb_service import search_movies, get_recommendations, get_full_movie_details
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from services.tmdb_service import (
+    cache_only, collection_index, create_tmdb_client, response_cache, search_movies_page, typeahead_search,
+    get_recommendations_page, get_recommendations_with_sequels, get_full_movie_details,
+    get_full_movie_details_batch, get_session_recommendations, get_weekly_trends_page, image_cache,
+    recommendations_continue, speculate, stream_session_recommendations, typeahead_local, warmup_steps,
+    TYPEAHEAD_ANSWERS, TYPEAHEAD_LIMIT,
+)
+from services.admission import AdmissionController, Overloaded
+from services.deadline import Deadline, deadline
+from services.images import CONTENT_TYPES, placeholder_svg, valid_image
+from services.metrics import Counter, Gauge, MetricsMiddleware, render as render_metrics
+from services.models import MOVIE_FIELDS, Movie, MovieDetails, SequelGroup, project
+from services.pagination import InvalidCursor, cursor_scope, decode_cursor, encode_cursor
+from services.prefetch import PrefetchScheduler
+from services.responses import dumps, json_response
+from services.settings import settings
+from services.startup import Warmup
+from services.typeahead import Debouncer
+from services.upstream import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+# Background warming of the trending movies (see services/prefetch.py)
+PREFETCH_ENABLED = settings.prefetch_enabled
+
+# Add a Server-Timing header breaking each request down into phases: time spent waiting
+# on TMDB per kind (movie = details/recommendations fan-out, collection = sequel lookups,
+# discover = genre fallback, trending, search), rank and serialize
+SERVER_TIMING_ENABLED = settings.server_timing
+
+# How long browsers may reuse a response before revalidating it with its ETag (seconds)
+HTTP_MAX_AGE = {
+    "search": 600,
+    "trends": 600,
+    "recommendations": 1800,
+    "movie": 3600,
+}
+
+# Typeahead keystrokes from one session that arrive closer together than this are
+# collapsed: only the last one may go to TMDB
+typeahead_debouncer = Debouncer(delay=settings.typeahead_debounce_ms / 1000)
+
+# Results per page of search, trends and (after the first page) recommendations.
+# The cursor for the next page comes back in the X-Next-Cursor header.
+API_PAGE_SIZE = settings.api_page_size
+
+# Admission control (see services/admission.py). Per lane: priority (freed slots go
+# to the lowest number first), concurrent requests, queue length and how many seconds
+# a request may wait in it (see ADMISSION_LANES in services/settings.py for the
+# defaults and how to override them). All lanes share ADMISSION_CAPACITY slots.
+# Shed requests are answered from the cache (see serve()).
+ADMISSION_ENABLED = settings.admission_enabled
+admission = AdmissionController(capacity=settings.admission_capacity)
+for lane_name, (priority, limit, max_queue, timeout) in settings.admission_lanes.items():
+    admission.add_lane(lane_name, priority, limit=limit, max_queue=max_queue, timeout=timeout)
+
+# Marks an answer that was served from cache because the request was shed: it may be
+# stale or partial (e.g. sequels only), so browsers shouldn't keep it either
+DEGRADED_HEADERS = {"X-Degraded": "overloaded", "Warning": '110 - "Response is Stale"'}
+SHED_RESPONSES = Counter(
+    "api_shed_responses_total",
+    "Shed requests by lane and how they were answered: degraded (from cache) or unavailable (503, nothing cached)",
+    ("lane", "answer"),
+)
+
+# Time budget of a request per lane, in seconds (overridable, e.g. DEADLINE_RECOMMENDATIONS=5).
+# Whatever TMDB hasn't answered by then is left out: the response carries what was
+# collected so far, marked "X-Degraded: deadline"; of the upstream calls nobody waits
+# for anymore, the ones not sent yet are cancelled and the ones on the wire finish and
+# fill the cache. Requests whose client disconnects are cancelled as well.
+REQUEST_DEADLINES = settings.deadlines
+PARTIAL_HEADERS = {"X-Degraded": "deadline"}
+DEADLINE_MISSES = Counter(
+    "api_deadline_misses_total",
+    "Requests answered with partial results because their deadline passed, by lane",
+    ("lane",),
+)
+CLIENT_DISCONNECTS = Counter(
+    "api_client_disconnects_total",
+    "Requests cancelled because the client went away before the answer was ready, by lane",
+    ("lane",),
+)
+# How often a request in progress checks whether its client is still there (seconds)
+DISCONNECT_POLL_INTERVAL = 0.25
+
+# Indexes, caches and numpy, loaded in the background right after startup instead of
+# by the first request that needs them; /ready says when that's done
+warmup = Warmup()
+Gauge("app_import_seconds", "How long importing the app took at startup", function=lambda: {(): IMPORT_SECONDS})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if IMPORT_SECONDS > settings.startup_import_budget:
+        logger.warning("Importing the app took %.2fs, over its %.2fs budget (see bench/startup.py)",
+                       IMPORT_SECONDS, settings.startup_import_budget)
+    # One pooled TMDB client for the whole process: connections (and TLS sessions)
+    # are reused across requests instead of being re-established every time.
+    app.state.tmdb_client = create_tmdb_client()
+    if settings.warmup_enabled:
+        for name, load, required in warmup_steps():
+            warmup.add(name, load, required)
+        warmup.start()
+    app.state.prefetcher = PrefetchScheduler(
+        app.state.tmdb_client,
+        interval=settings.prefetch_interval,
+        top_n=settings.prefetch_top_n,
+        concurrency=settings.prefetch_concurrency,
+    )
+    if PREFETCH_ENABLED:
+        app.state.prefetcher.start()
+    try:
+        yield
+    finally:
+        await app.state.prefetcher.stop()
+        await warmup.stop()
+        await app.state.tmdb_client.aclose()
+        response_cache.close()
+        collection_index.close()
+
+app = FastAPI(lifespan=lifespan)
+
+
+def get_tmdb_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.tmdb_client
+
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+    # TMDB is rate limiting us or down and there was nothing cached to fall back on.
+    # Say so instead of pretending there are no results.
+    headers = {"Retry-After": str(int(exc.retry_after) + 1)} if exc.retry_after else None
+    return JSONResponse(status_code=503, content={"error": "TMDB is temporarily unavailable"}, headers=headers)
 
-app = FastAPI()
+
+class ClientDisconnected(Exception):
+    pass
+
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected):
+    # Nobody reads this; 499 (nginx's "client closed request") keeps them apart in the metrics
+    return Response(status_code=499)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    # Shed and nothing cached to answer with
+    SHED_RESPONSES.inc(exc.lane, "unavailable")
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Server is busy, try again shortly"},
+        headers={"Retry-After": str(int(exc.retry_after) + 1)},
+    )
 
 
 origins = [
@@ -17,114 +180,465 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Recommendation-Session", "X-Degraded"],
 )
+app.add_middleware(MetricsMiddleware, server_timing=SERVER_TIMING_ENABLED)
+
+
+def page_offset(cursor: str | None, scope: str) -> int:
+    try:
+        return decode_cursor(cursor, scope)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def next_cursor_header(has_more: bool, offset: int, scope: str) -> dict:
+    return {"X-Next-Cursor": encode_cursor(offset, scope)} if has_more else {}
+
+
+# ?limit= (results per page, or the size of the first recommendations page) and
+# ?fields= (comma separated subset of the movie fields) let clients fetch only what they render
+LIMIT = Query(None, ge=1, le=100)
+
+
+def field_names(fields: str | None) -> tuple[str, ...] | None:
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in MOVIE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def movie_list(results: list[dict], names: tuple[str, ...] | None) -> list:
+    # TMDB returns: id, title, poster_path, release_date
+    # Frontend expects: id, title, poster, year (see services/models.py)
+    return project([Movie.from_tmdb(m) for m in results], names)
+
+
+class Answer:
+    """How an endpoint got its result: normally, shed to the cache, or cut short by its deadline."""
+
+    __slots__ = ("lane", "shed", "budget")
+
+    def __init__(self, lane: str, budget: Deadline):
+        self.lane = lane
+        self.shed = None
+        self.budget = budget
+
+    @property
+    def degraded(self) -> bool:
+        return self.shed is not None or self.budget.missed
+
+    def require(self, found):
+        # A degraded answer with nothing in it: say why instead of answering empty
+        if found or not self.degraded:
+            return
+        if self.shed is not None:
+            raise self.shed
+        raise HTTPException(status_code=504, detail="TMDB didn't answer in time")
+
+    def headers(self) -> dict:
+        if self.shed is not None:
+            SHED_RESPONSES.inc(self.lane, "degraded")
+            return DEGRADED_HEADERS
+        return PARTIAL_HEADERS if self.budget.missed else {}
+
+
+async def serve(request: Request, lane: str, fetch, degraded=None):
+    """
+    await fetch() for an endpoint of `lane`, returning (result, Answer):
+      - under the lane's deadline (see REQUEST_DEADLINES)
+      - admission controlled; when shed, degraded (fetch by default) runs against the
+        response cache only
+      - cancelled if the client disconnects first, upstream calls not sent yet included
+        (the ones on the wire finish and fill the cache)
+    """
+    with deadline(REQUEST_DEADLINES[lane]) as budget:
+        answer = Answer(lane, budget)
+
+        async def run():
+            if not ADMISSION_ENABLED:
+                return await fetch()
+            try:
+                async with admission.admit(lane):
+                    return await fetch()
+            except Overloaded as shed:
+                answer.shed = shed
+                with cache_only():
+                    return await (degraded or fetch)()
+
+        try:
+            result = await cancel_on_disconnect(request, run())
+        except ClientDisconnected:
+            CLIENT_DISCONNECTS.inc(lane)
+            raise
+    if budget.missed:
+        DEADLINE_MISSES.inc(lane)
+    return result, answer
+
+
+async def cancel_on_disconnect(request: Request, coro):
+    """Await coro in a task of its own, cancelled if the client goes away before it's done."""
+    work = asyncio.ensure_future(coro)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait((work, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not work.done():
+            work.cancel()
+    if not work.done():
+        raise ClientDisconnected()
+    return work.result()
+
+
+async def wait_for_disconnect(request: Request):
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+class AdmittedStream(StreamingResponse):
+    """
+    StreamingResponse that holds an admission slot of `lane` until it's done: the slot
+    is released however the response ends (sent in full, the client gone before the
+    body started or half way, an error), which the body generator alone can't see.
+    """
+
+    def __init__(self, content, lane: str, **kwargs):
+        super().__init__(content, **kwargs)
+        self.lane = lane
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                await self.body_iterator.aclose()
+            finally:
+                admission.release(self.lane)
+
+
+def respond(request: Request, payload, max_age: int, headers: dict | None = None, answer: Answer | None = None):
+    # json_response, or for a degraded answer the same marked as such and not cacheable
+    if answer is None or not answer.degraded:
+        return json_response(request, payload, max_age, headers)
+    return json_response(request, payload, 0, {**(headers or {}), **answer.headers()})
+
+
+def sequel_list(groups: list[dict], names: tuple[str, ...] | None) -> list:
+    if names is None:
+        return [SequelGroup.from_service(group) for group in groups]
+    return [{"title": group["title"], "movies": movie_list(group["movies"], names)} for group in groups]
 
 @app.get("/")
 def read_root():
     return {"message": "Movie Recommendation API is running"}
 
+@app.get("/ready")
+def ready_endpoint():
+    # Readiness probe: 503 until the warm-up has loaded the local data (liveness is "/")
+    status = {**warmup.probe(), "import_seconds": round(IMPORT_SECONDS, 4)}
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status, headers={"Cache-Control": "no-store"})
+
+@app.get("/metrics")
+def metrics_endpoint():
+    # Prometheus text exposition format
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Image URLs never change content (variants are content-addressed), so browsers keep them for a year
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+@app.get("/api/images/placeholder/{kind}.svg")
+def image_placeholder_endpoint(kind: str):
+    return Response(content=placeholder_svg(kind), media_type="image/svg+xml", headers={"Cache-Control": IMMUTABLE})
+
+@app.get("/api/images/{size}/{file_name}")
+async def image_endpoint(request: Request, size: str, file_name: str, client: httpx.AsyncClient = Depends(get_tmdb_client)):
+    """TMDB poster/backdrop variant (w92 ... original), fetched once and served from the disk cache."""
+    if not valid_image(size, file_name):
+        raise HTTPException(status_code=404, detail="Unknown image")
+
+    digest = await image_cache.get(client, size, file_name)
+    if digest is not None and request.headers.get("if-none-match") == f'"{digest}"':
+        return Response(status_code=304, headers={"ETag": f'"{digest}"', "Cache-Control": IMMUTABLE})
+
+    content = await image_cache.read(digest, file_name) if digest is not None else None
+    if digest is not None and content is None:
+        # Trimmed from the cache in the meantime: fetched again
+        digest = await image_cache.get(client, size, file_name)
+        content = await image_cache.read(digest, file_name) if digest is not None else None
+    if content is None:
+        # Missing upstream (or TMDB unreachable): placeholder, but let the browser retry later
+        kind = "backdrop" if size in ("w300", "w1280") else "poster"
+        return Response(content=placeholder_svg(kind), media_type="image/svg+xml", headers={"Cache-Control": "public, max-age=300"})
+
+    return Response(
+        content=content,
+        media_type=CONTENT_TYPES[file_name.rsplit(".", 1)[1]],
+        headers={"ETag": f'"{digest}"', "Cache-Control": IMMUTABLE},
+    )
+
 @app.get("/api/movies/search")
-async def search_movies_endpoint(query: str):
-    results = await search_movies(query)
-    # Transform to match frontend Movie type if needed, but TMDB returns similar fields.
-    # TMDB returns: id, title, poster_path, release_date
-    # Frontend expects: id, title, poster, year
-    
-    transformed_results = []
-    for m in results:
-        poster_path = m.get("poster_path")
-        poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "https://via.placeholder.com/500x750?text=No+Image"
-        
-        transformed_results.append({
-            "id": m.get("id"),
-            "title": m.get("title"),
-            "poster": poster_url,
-            "year": m.get("release_date", "")[:4] if m.get("release_date") else "",
-            "vote_average": m.get("vote_average", 0)
-        })
-        
-    return transformed_results
+async def search_movies_endpoint(
+    request: Request,
+    query: str,
+    cursor: str | None = None,
+    limit: int | None = LIMIT,
+    fields: str | None = None,
+    client: httpx.AsyncClient = Depends(get_tmdb_client),
+):
+    names = field_names(fields)
+    limit = limit or API_PAGE_SIZE
+    scope = cursor_scope("search", query)
+    offset = page_offset(cursor, scope)
+    (results, has_more), answer = await serve(request, "search", lambda: search_movies_page(client, query, offset, limit))
+    answer.require(results)
+    return respond(
+        request, movie_list(results, names), HTTP_MAX_AGE["search"],
+        next_cursor_header(has_more, offset + limit, scope), answer,
+    )
+
+@app.get("/api/movies/typeahead")
+async def typeahead_endpoint(
+    request: Request,
+    query: str,
+    session: str | None = None,
+    limit: int = Query(TYPEAHEAD_LIMIT, ge=1, le=TYPEAHEAD_LIMIT),
+    fields: str | None = None,
+    client: httpx.AsyncClient = Depends(get_tmdb_client),
+):
+    """
+    Search-as-you-type suggestions. Send a per-tab `session` id with every keystroke;
+    a keystroke superseded by a newer one (or whose client went away) gets 204.
+    """
+    names = field_names(fields)
+    results = await typeahead_local(query, limit)
+    if results is not None:
+        return respond(request, movie_list(results, names), HTTP_MAX_AGE["search"])
+
+    # Only TMDB knows: wait out the debounce before taking a search slot, not while
+    # holding one. Without a session id keystrokes of different users can't be told
+    # apart (a client address may be a whole NAT), so those aren't debounced.
+    if (session and not await typeahead_debouncer.wait(session)) or await request.is_disconnected():
+        TYPEAHEAD_ANSWERS.inc("superseded")
+        return Response(status_code=204)
+
+    results, answer = await serve(request, "search", lambda: typeahead_search(client, query, limit))
+    answer.require(results)
+    return respond(request, movie_list(results, names), HTTP_MAX_AGE["search"], answer=answer)
 
 @app.get("/api/recommendations")
-async def recommendations_endpoint(movie_ids: str):
-    from services.tmdb_service import get_recommendations_with_sequels
-    
+async def recommendations_endpoint(
+    request: Request,
+    movie_ids: str,
+    cursor: str | None = None,
+    session: str | None = None,
+    limit: int | None = LIMIT,
+    fields: str | None = None,
+    client: httpx.AsyncClient = Depends(get_tmdb_client),
+):
+    """
+    The first page holds the sequels and every ranked recommendation (the best `limit`
+    of them when given); the pages after it (X-Next-Cursor) continue down the ranking
+    and then with genre discovery for the selection, no sequels.
+    `session` is the X-Recommendation-Session of the previous answer: when the selection
+    only changed a little since, just the added movies are fetched.
+    """
+    names = field_names(fields)
+    empty = {"sequels": [], "recommendations": []}
     if not movie_ids:
-        return {"sequels": [], "recommendations": []}
-        
+        return json_response(request, empty, HTTP_MAX_AGE["recommendations"])
+
     try:
         ids_list = [int(id_str) for id_str in movie_ids.split(",") if id_str.strip()]
     except ValueError:
-        return {"sequels": [], "recommendations": []}
-        
-    data = await get_recommendations_with_sequels(ids_list)
-    
-    # Helper to transform movie data
-    def transform_movie(m):
-        poster_path = m.get("poster_path")
-        poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "https://via.placeholder.com/500x750?text=No+Image"
+        return json_response(request, empty, HTTP_MAX_AGE["recommendations"])
+
+    scope = cursor_scope("recommendations", *ids_list)
+    if cursor:
+        offset = page_offset(cursor, scope)
+        page_size = limit or API_PAGE_SIZE
+
+        async def cached_page():
+            # Shed: the part of the (cached) ranking this page covers, no genre discovery
+            ranked = (await get_recommendations_with_sequels(client, ids_list))["recommendations"]
+            return ranked[offset:offset + page_size], offset + page_size < len(ranked)
+
+        (results, has_more), answer = await serve(
+            request,
+            "recommendations",
+            lambda: get_recommendations_page(client, ids_list, offset, page_size, session),
+            cached_page,
+        )
+        answer.require(results)
+        return respond(
+            request, {"sequels": [], "recommendations": movie_list(results, names)},
+            HTTP_MAX_AGE["recommendations"], next_cursor_header(has_more, offset + page_size, scope), answer,
+        )
+
+    async def cached_result():
+        # Shed: sequels from the collection index, recommendations from whatever of the
+        # selection is cached (the session is left alone, it would be filled with gaps)
+        return session, await get_recommendations_with_sequels(client, ids_list)
+
+    (session, data), answer = await serve(
+        request, "recommendations", lambda: get_session_recommendations(client, ids_list, session), cached_result,
+    )
+    answer.require(data["sequels"] or data["recommendations"])
+    recommendations = data["recommendations"][:limit]
+    next_offset = len(recommendations)
+    has_more, prefetch = recommendations_continue(ids_list, data, next_offset, limit or API_PAGE_SIZE)
+    if prefetch and not answer.degraded and (not ADMISSION_ENABLED or admission.spare("recommendations")):
+        # Get the second page's genre discovery going while the client renders the first,
+        # unless the lane is busy: then it would take TMDB calls from requests somebody is
+        # waiting for
+        speculate(get_recommendations_page(client, ids_list, next_offset, limit or API_PAGE_SIZE, session))
+
+    headers = next_cursor_header(has_more, next_offset, scope)
+    if session:
+        headers["X-Recommendation-Session"] = session
+    return respond(request, {
+        "sequels": sequel_list(data["sequels"], names),
+        "recommendations": movie_list(recommendations, names),
+    }, HTTP_MAX_AGE["recommendations"], headers, answer)
+
+@app.get("/api/recommendations/stream")
+async def recommendations_stream_endpoint(
+    request: Request,
+    movie_ids: str,
+    session: str | None = None,
+    limit: int | None = LIMIT,
+    fields: str | None = None,
+    client: httpx.AsyncClient = Depends(get_tmdb_client),
+):
+    """
+    Same result as /api/recommendations, streamed as NDJSON (one JSON object per line)
+    while the upstream calls finish: "sequel" events as collections resolve,
+    "recommendations" updates after each movie, and a final "done" event (with the
+    session id to pass next time, see /api/recommendations; "partial" when the deadline
+    cut it short). When shed, the cached result comes as "sequel" events and "done" right away.
+    """
+    names = field_names(fields)
+    try:
+        ids_list = [int(id_str) for id_str in movie_ids.split(",") if id_str.strip()]
+    except ValueError:
+        ids_list = []
+
+    scope = cursor_scope("recommendations", *ids_list)
+
+    # The slot is held until the stream ends, so it's taken here instead of through
+    # serve() and given back by AdmittedStream
+    shed = None
+    if ADMISSION_ENABLED:
+        try:
+            await admission.acquire("recommendations")
+        except Overloaded as exc:
+            shed = exc
+
+    if shed is None:
+        source = stream_session_recommendations(client, ids_list, session)
+    else:
+        with cache_only():
+            data = await get_recommendations_with_sequels(client, ids_list)
+        if not data["sequels"] and not data["recommendations"]:
+            raise shed
+
+        async def cached_events():
+            for group in data["sequels"]:
+                yield {"type": "sequel", "group": group}
+            yield {"type": "done", **data}
+
+        source = cached_events()
+        SHED_RESPONSES.inc("recommendations", "degraded")
+
+    async def events():
+        # The deadline runs from the first event; a client that went away is noticed
+        # between events, and closing the source cancels its upstream calls not sent yet
+        with deadline(REQUEST_DEADLINES["recommendations"]) as budget:
+            try:
+                async for event in source:
+                    if await request.is_disconnected():
+                        CLIENT_DISCONNECTS.inc("recommendations")
+                        break
+                    yield dumps(stream_event(event, budget)) + b"\n"
+            except UpstreamUnavailable:
+                # Headers are already sent, so report it in-band instead of as a 503
+                yield dumps({"type": "error", "error": "TMDB is temporarily unavailable"}) + b"\n"
+            finally:
+                await source.aclose()
+        if budget.missed:
+            DEADLINE_MISSES.inc("recommendations")
+
+    def stream_event(event: dict, budget: Deadline) -> dict:
+        if event["type"] == "sequel":
+            return {"type": "sequel", "group": sequel_list([event["group"]], names)[0]}
+        if event["type"] == "recommendations":
+            return {"type": "recommendations", "recommendations": movie_list(event["recommendations"][:limit], names)}
+        # Headers are long gone by now, so the cursor (and whether this is partial) travels in the event
+        recommendations = event["recommendations"][:limit]
+        next_offset = len(recommendations)
+        has_more, _ = recommendations_continue(ids_list, event, next_offset, limit or API_PAGE_SIZE)
         return {
-            "id": m.get("id"),
-            "title": m.get("title"),
-            "poster": poster_url,
-            "year": m.get("release_date", "")[:4] if m.get("release_date") else "",
-            "vote_average": m.get("vote_average", 0)
+            "type": "done",
+            "sequels": sequel_list(event["sequels"], names),
+            "recommendations": movie_list(recommendations, names),
+            "next_cursor": encode_cursor(next_offset, scope) if ids_list and has_more else None,
+            "session": event.get("session"),
+            "partial": budget.missed,
         }
 
-    # Transform recommendations
-    transformed_recs = [transform_movie(m) for m in data["recommendations"]]
-    
-    # Transform sequels
-    transformed_sequels = []
-    for seq_group in data["sequels"]:
-        transformed_sequels.append({
-            "title": seq_group["title"],
-            "movies": [transform_movie(m) for m in seq_group["movies"]]
-        })
-
-    return {
-        "sequels": transformed_sequels,
-        "recommendations": transformed_recs
-    }
+    if shed is not None:
+        return StreamingResponse(events(), media_type="application/x-ndjson", headers=DEGRADED_HEADERS)
+    if not ADMISSION_ENABLED:
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+    return AdmittedStream(events(), "recommendations", media_type="application/x-ndjson")
 
 @app.get("/api/movies/trends")
-async def get_weekly_trends_endpoint():
-    from services.tmdb_service import get_weekly_trends
-    results = await get_weekly_trends()
-    
-    transformed_results = []
-    for m in results:
-        poster_path = m.get("poster_path")
-        poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "https://via.placeholder.com/500x750?text=No+Image"
-        
-        transformed_results.append({
-            "id": m.get("id"),
-            "title": m.get("title"),
-            "poster": poster_url,
-            "year": m.get("release_date", "")[:4] if m.get("release_date") else "",
-            "vote_average": m.get("vote_average", 0)
-        })
-        
-    return transformed_results
+async def get_weekly_trends_endpoint(
+    request: Request,
+    cursor: str | None = None,
+    limit: int | None = LIMIT,
+    fields: str | None = None,
+    client: httpx.AsyncClient = Depends(get_tmdb_client),
+):
+    names = field_names(fields)
+    limit = limit or API_PAGE_SIZE
+    scope = cursor_scope("trends")
+    offset = page_offset(cursor, scope)
+    (results, has_more), answer = await serve(request, "trends", lambda: get_weekly_trends_page(client, offset, limit))
+    answer.require(results)
+    return respond(
+        request, movie_list(results, names), HTTP_MAX_AGE["trends"],
+        next_cursor_header(has_more, offset + limit, scope), answer,
+    )
+
+class MovieBatchRequest(BaseModel):
+    ids: list[int] = Field(..., max_length=100)
+
+@app.post("/api/movies/batch")
+async def get_movies_batch_endpoint(
+    request: Request, body: MovieBatchRequest, client: httpx.AsyncClient = Depends(get_tmdb_client)
+):
+    # Details for a whole grid in one round-trip; unknown ids are simply left out
+    results, answer = await serve(request, "details", lambda: get_full_movie_details_batch(client, body.ids))
+    answer.require(results or not body.ids)
+    return Response(
+        content=dumps([MovieDetails.from_service(d) for d in results]),
+        media_type="application/json",
+        headers=answer.headers(),
+    )
 
 @app.get("/api/movies/{movie_id}")
-async def get_movie_details_endpoint(movie_id: int):
-    details = await get_full_movie_details(movie_id)
+async def get_movie_details_endpoint(request: Request, movie_id: int, client: httpx.AsyncClient = Depends(get_tmdb_client)):
+    details, answer = await serve(request, "details", lambda: get_full_movie_details(client, movie_id))
+    answer.require(details)
     if not details:
         return {"error": "Movie not found"}
-    
-    # Transform for frontend consistency if needed
-    poster_path = details.get("poster_path")
-    poster_url = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "https://via.placeholder.com/500x750?text=No+Image"
-    
-    backdrop_path = details.get("backdrop_path")
-    backdrop_url = f"https://image.tmdb.org/t/p/original{backdrop_path}" if backdrop_path else None
-
-    return {
-        **details,
-        "poster": poster_url,
-        "backdrop": backdrop_url,
-        "year": details.get("release_date", "")[:4] if details.get("release_date") else "",
-        "vote_average": details.get("vote_average", 0)
-    }
 
+    return respond(request, MovieDetails.from_service(details), HTTP_MAX_AGE["movie"], answer=answer)
+
+
+# Everything above runs on import (see _import_started)
+IMPORT_SECONDS = time.perf_counter() - _import_started
@@ -0,0 +1,135 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+from services.metrics import Counter, Gauge
+
+
+class Overloaded(Exception):
+    """Raised by AdmissionController.acquire() when a request is shed (queue full, or waited too long)."""
+
+    def __init__(self, lane: str, retry_after: float):
+        super().__init__(f"{lane} requests are being shed")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class Lane:
+    __slots__ = ("name", "priority", "limit", "max_queue", "timeout", "active", "queue")
+
+    def __init__(self, name: str, priority: int, limit: int, max_queue: int, timeout: float):
+        self.name = name
+        self.priority = priority
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.queue = deque()  # futures of the waiting requests, oldest first
+
+
+ADMISSIONS = Counter(
+    "api_admissions_total",
+    "Admission decisions by lane: admitted right away, admitted after queueing, "
+    "rejected (queue full) or timed_out (waited longer than the lane allows)",
+    ("lane", "outcome"),
+)
+
+
+class AdmissionController:
+    """
+    Bounds how many requests do upstream-bound work at once, so a traffic spike queues
+    (briefly) in front of the app instead of piling thousands of TMDB awaits onto the
+    event loop. Every lane (a group of endpoints) has its own concurrency limit and a
+    bounded wait queue with a timeout; all lanes share `capacity` slots, and when one
+    frees up the waiting lane with the lowest `priority` number gets it, so cheap
+    requests (details) go before expensive ones (multi-movie recommendations).
+    Requests that find the queue full or wait too long get Overloaded, and the caller
+    answers them from cache instead (see main.py).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.active = 0
+        self.lanes = {}
+        self._by_priority = []
+
+        Gauge("api_admission_active", "Requests holding an admission slot, by lane", ("lane",),
+              function=lambda: {(lane.name,): lane.active for lane in self._by_priority})
+        Gauge("api_admission_queued", "Requests waiting for an admission slot, by lane", ("lane",),
+              function=lambda: {(lane.name,): len(lane.queue) for lane in self._by_priority})
+
+    def add_lane(self, name: str, priority: int, limit: int, max_queue: int, timeout: float):
+        self.lanes[name] = Lane(name, priority, limit, max_queue, timeout)
+        self._by_priority = sorted(self.lanes.values(), key=lambda lane: lane.priority)
+
+    @asynccontextmanager
+    async def admit(self, name: str):
+        await self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    async def acquire(self, name: str):
+        """Wait for a slot in the lane; raises Overloaded when the request is shed."""
+        lane = self.lanes[name]
+        if not lane.queue and self._has_room(lane):
+            self._start(lane)
+            ADMISSIONS.inc(name, "admitted")
+            return
+
+        if len(lane.queue) >= lane.max_queue:
+            ADMISSIONS.inc(name, "rejected")
+            raise Overloaded(name, lane.timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        lane.queue.append(future)
+        try:
+            await asyncio.wait_for(future, lane.timeout)
+        except asyncio.TimeoutError:
+            ADMISSIONS.inc(name, "timed_out")
+            raise Overloaded(name, lane.timeout) from None
+        except asyncio.CancelledError:
+            # The client went away while we waited. If the slot was handed to us in
+            # the meantime, pass it on.
+            if future.done() and not future.cancelled():
+                self.release(name)
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            try:
+                lane.queue.remove(future)
+            except ValueError:
+                pass
+        ADMISSIONS.inc(name, "queued")
+
+    def spare(self, name: str) -> bool:
+        """Whether the lane would admit one more request right away (for optional work)."""
+        lane = self.lanes[name]
+        return not lane.queue and self._has_room(lane)
+
+    def release(self, name: str):
+        lane = self.lanes[name]
+        lane.active -= 1
+        self.active -= 1
+        self._dispatch()
+
+    def _has_room(self, lane: Lane) -> bool:
+        return self.active < self.capacity and lane.active < lane.limit
+
+    def _start(self, lane: Lane):
+        lane.active += 1
+        self.active += 1
+
+    def _dispatch(self):
+        # Hand free slots to the waiting requests, most important lanes first
+        for lane in self._by_priority:
+            while lane.queue and self._has_room(lane):
+                future = lane.queue.popleft()
+                if future.done():
+                    continue
+                self._start(lane)
+                future.set_result(None)
+            if self.active >= self.capacity:
+                return
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Returned by TieredCache.get() when there is no usable entry
+# (None is a valid cached value, so it can't be used as the "not found" marker).
+MISS = object()
+
+
+class TieredCache:
+    """
+    Two-level cache for decoded TMDB payloads.
+
+    - memory tier: bounded LRU (entry count and approximate byte size)
+    - disk tier: SQLite file that survives restarts, trimmed by total byte size
+
+    Values must be JSON-serializable and must be treated as read-only by callers,
+    since the memory tier hands out the same object to everyone.
+
+    On the event loop the disk tier stays off the loop: aget() / aget_stale() read it
+    in a worker thread, and set() queues the write, so entries set meanwhile go to
+    disk together in one transaction in the background. Outside a running loop
+    (scripts) get(), get_stale() and set() touch the disk directly; close() writes
+    whatever is still queued.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str | None,
+        max_memory_entries: int = 5000,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.db_path = Path(db_path) if db_path else None
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        # key -> (expires_at, value, size)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+
+        # The SQLite file is opened on first use so importing this module stays cheap.
+        # Guarded by a lock since the startup warm-up opens it from another thread.
+        self._db = None
+        self._disk_bytes = 0
+        self._connect_lock = threading.Lock()
+        # The connection is used from worker threads, one at a time
+        self._db_lock = threading.Lock()
+        # key -> (value, encoded, expires_at, size) set but not on disk yet; the batch
+        # being written is kept apart until it's there, so reads still find it
+        self._pending = {}
+        self._writing = {}
+        self._flushing = None
+        self._generation = 0  # bumped by clear(), so a batch queued before it is dropped
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "sets": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    # --- public API ---
+
+    def get(self, key: str):
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not MISS:
+            return value
+        return self._disk_result(key, self._unwritten(key) or self._read(key), now)
+
+    async def aget(self, key: str):
+        """get() for the event loop: a memory miss reads the disk tier in a worker thread."""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not MISS:
+            return value
+        row = self._unwritten(key)
+        if row is None and self.db_path is not None:
+            row = await asyncio.to_thread(self._read, key)
+        return self._disk_result(key, row, now)
+
+    def get_stale(self, key: str):
+        """
+        Return the last stored value even if it has expired (MISS if we never had one).
+        Expired entries stay around until they're evicted, so this is the
+        "last good payload" used when TMDB is unavailable.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            self.stats["stale_hits"] += 1
+            return entry[1]
+        return self._stale_result(self._unwritten(key) or self._read(key))
+
+    async def aget_stale(self, key: str):
+        """get_stale() for the event loop (see aget())."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self.stats["stale_hits"] += 1
+            return entry[1]
+        row = self._unwritten(key)
+        if row is None and self.db_path is not None:
+            row = await asyncio.to_thread(self._read, key)
+        return self._stale_result(row)
+
+    def set(self, key: str, value, ttl: float):
+        if ttl <= 0:
+            return
+
+        encoded = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        size = len(encoded.encode("utf-8"))
+        expires_at = time.time() + ttl
+
+        self.stats["sets"] += 1
+        self._remember(key, expires_at, value, size)
+        if self.db_path is None:
+            return
+
+        self._pending[key] = (value, encoded, expires_at, size)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flushing is None:
+            self._flushing = loop.create_task(self._flush_in_background())
+
+    def flush(self):
+        """Write the queued entries to disk now (blocking)."""
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._write(batch, self._generation)
+
+    def hit_ratio(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def clear(self):
+        self._memory.clear()
+        self._memory_bytes = 0
+        self._pending.clear()
+        db = self._connection()
+        with self._db_lock:
+            self._generation += 1
+            if db is not None:
+                db.execute("DELETE FROM entries")
+                db.commit()
+                self._disk_bytes = 0
+
+    def open(self):
+        """Open the disk tier now instead of on the first lookup."""
+        self._connection()
+
+    def close(self):
+        self.flush()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # --- internals ---
+
+    def _memory_get(self, key: str, now: float):
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value, _ = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value
+        return MISS
+
+    def _unwritten(self, key: str):
+        # (value, expires_at, size) of an entry set but not on disk yet
+        entry = self._pending.get(key) or self._writing.get(key)
+        return None if entry is None else (entry[0], entry[2], entry[3])
+
+    def _read(self, key: str):
+        # (value, expires_at, size) from the disk tier; runs in a worker thread from aget()
+        db = self._connection()
+        if db is None:
+            return None
+        with self._db_lock:
+            row = db.execute("SELECT value, expires_at, size FROM entries WHERE key = ?", (key,)).fetchone()
+        return None if row is None else (json.loads(row[0]), row[1], row[2])
+
+    def _disk_result(self, key: str, row, now: float):
+        if row is not None and row[1] > now:
+            self._remember(key, row[1], row[0], row[2])
+            self.stats["disk_hits"] += 1
+            return row[0]
+        self.stats["misses"] += 1
+        return MISS
+
+    def _stale_result(self, row):
+        if row is None:
+            return MISS
+        self.stats["stale_hits"] += 1
+        return row[0]
+
+    async def _flush_in_background(self):
+        try:
+            await asyncio.sleep(0)  # let the sets of this event loop turn join the batch
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                self._writing = batch
+                try:
+                    await asyncio.to_thread(self._write, batch, self._generation)
+                finally:
+                    self._writing = {}
+        except Exception:
+            logger.exception("Writing to the response cache failed")
+        finally:
+            self._flushing = None
+
+    def _write(self, batch: dict, generation: int):
+        db = self._connection()
+        if db is None:
+            return
+        with self._db_lock:
+            if generation != self._generation:
+                return  # cleared since these were set
+            for key, (_, encoded, expires_at, size) in batch.items():
+                previous = db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at, size) VALUES (?, ?, ?, ?)",
+                    (key, encoded, expires_at, size),
+                )
+                self._disk_bytes += size - (previous[0] if previous else 0)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._trim_disk()
+            db.commit()
+
+    def _remember(self, key, expires_at, value, size):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= old[2]
+
+        # Don't let one huge payload flush the whole memory tier
+        if size > self.max_memory_bytes:
+            return
+
+        self._memory[key] = (expires_at, value, size)
+        self._memory_bytes += size
+
+        while self._memory and (
+            len(self._memory) > self.max_memory_entries
+            or self._memory_bytes > self.max_memory_bytes
+        ):
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.stats["memory_evictions"] += 1
+
+    def _trim_disk(self):
+        # Drop entries that expire first (already expired ones come first)
+        # until we're comfortably below the limit again.
+        to_free = self._disk_bytes - int(self.max_disk_bytes * 0.9)
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY expires_at"):
+            if to_free <= 0:
+                break
+            victims.append((key,))
+            to_free -= size
+            self._disk_bytes -= size
+
+        self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.stats["disk_evictions"] += len(victims)
+
+    def _connection(self):
+        if self._db is not None or self.db_path is None:
+            return self._db
+        with self._connect_lock:
+            if self._db is None:
+                self._connect()
+            return self._db
+
+    def _connect(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+        db.commit()
+        self._disk_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._db = db
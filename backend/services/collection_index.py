@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Returned by CollectionIndex.collection_of() for movies the index knows nothing about
+# (None means "known not to belong to a collection")
+UNKNOWN = object()
+
+# Fields of a collection part that sequel groups use (see models.Movie); the rest of
+# TMDB's part payload (overview, genre ids, ...) isn't stored
+PART_FIELDS = ("id", "title", "original_title", "poster_path", "release_date", "vote_average")
+
+
+class CollectionIndex:
+    """
+    Persistent movie -> collection index, so sequel groups are a local lookup instead
+    of a /movie/{id} plus /collection/{id} round trip:
+
+        movies(movie_id, collection_id)         collection_id NULL: the movie has none
+        collections(id, name, parts, updated_at) cleaned name, parts sorted by release date
+
+    Filled incrementally from details and collections fetched anyway, or in bulk by
+    build_collection_index.py. Every movie mapping and the collection metadata are
+    held in memory (a few MB for all of TMDB); parts are read from SQLite on demand.
+    Collections older than `max_age` are still served, stale() tells callers to refresh them.
+    """
+
+    def __init__(self, db_path: Path | str | None, max_age: float = 7 * 24 * 3600):
+        self.db_path = Path(db_path) if db_path else None
+        self.max_age = max_age
+        self._movies = {}  # movie id -> collection id or None
+        self._updated_at = {}  # collection id -> updated_at
+        self._groups = {}  # collection id -> group, the ones read since startup
+        # The SQLite file is opened and read on first use so importing this module stays
+        # cheap; at startup that's the warm-up's job (services/startup.py)
+        self._db = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def __len__(self):
+        self._load()
+        return len(self._updated_at)
+
+    def collection_of(self, movie_id: int):
+        """Collection id of the movie, None if it has none, UNKNOWN if the index hasn't seen it."""
+        self._load()
+        return self._movies.get(movie_id, UNKNOWN)
+
+    def group(self, collection_id: int) -> dict | None:
+        """{"id", "name", "parts"} of the collection (see tmdb_service.build_sequel_group), or None."""
+        self._load()
+        group = self._groups.get(collection_id)
+        if group is None and collection_id in self._updated_at:
+            row = self._db.execute("SELECT name, parts FROM collections WHERE id = ?", (collection_id,)).fetchone()
+            if row is not None:
+                group = {"id": collection_id, "name": row[0], "parts": json.loads(row[1])}
+                self._groups[collection_id] = group
+        return group
+
+    def stale(self, collection_id: int) -> bool:
+        self._load()
+        updated_at = self._updated_at.get(collection_id)
+        return updated_at is None or time.time() - updated_at > self.max_age
+
+    def record_movie(self, movie_id: int, collection_id: int | None):
+        self._load()
+        if self._movies.get(movie_id, UNKNOWN) == collection_id:
+            return
+        self._movies[movie_id] = collection_id
+        if self._db is not None:
+            self._db.execute("INSERT OR REPLACE INTO movies (movie_id, collection_id) VALUES (?, ?)",
+                             (movie_id, collection_id))
+            self._db.commit()
+
+    def record_collection(self, group: dict):
+        """Store a sequel group (parts already sorted, name cleaned) and map its parts to it."""
+        self._load()
+        collection_id = group["id"]
+        parts = [{field: part.get(field) for field in PART_FIELDS} for part in group["parts"]]
+        group = {"id": collection_id, "name": group["name"], "parts": parts}
+        updated_at = time.time()
+
+        self._groups[collection_id] = group
+        self._updated_at[collection_id] = updated_at
+        for part in parts:
+            self._movies[part["id"]] = collection_id
+        if self._db is None:
+            return
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO collections (id, name, parts, updated_at) VALUES (?, ?, ?, ?)",
+            (collection_id, group["name"], json.dumps(parts, separators=(",", ":"), ensure_ascii=False), updated_at),
+        )
+        self._db.executemany(
+            "INSERT OR REPLACE INTO movies (movie_id, collection_id) VALUES (?, ?)",
+            [(part["id"], collection_id) for part in parts],
+        )
+        self._db.commit()
+
+    def clear(self):
+        self._load()
+        self._movies.clear()
+        self._updated_at.clear()
+        self._groups.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM movies")
+            self._db.execute("DELETE FROM collections")
+            self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                try:
+                    self._open()
+                finally:
+                    self._loaded = True
+
+    def _open(self):
+        if self.db_path is None:
+            return
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS movies (movie_id INTEGER PRIMARY KEY, collection_id INTEGER)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS collections ("
+            " id INTEGER PRIMARY KEY,"
+            " name TEXT NOT NULL,"
+            " parts TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        db.commit()
+        self._movies = dict(db.execute("SELECT movie_id, collection_id FROM movies"))
+        self._updated_at = dict(db.execute("SELECT id, updated_at FROM collections"))
+        self._db = db
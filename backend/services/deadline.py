@@ -0,0 +1,65 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class Deadline:
+    """
+    Time budget of one request. Every TMDB wait underneath checks it (see
+    tmdb_service.tmdb_get); whatever isn't back in time is left out, and `missed`
+    tells the endpoint its result is partial.
+    """
+
+    __slots__ = ("expires_at", "missed")
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+        self.missed = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+# Set per request by main.py. Tasks started on its behalf copy it along with the rest
+# of the context, so the budget reaches every fan-out without being passed around.
+current_deadline: ContextVar[Deadline | None] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Run the block under a budget of `seconds` (never later than an enclosing one)."""
+    parent = current_deadline.get()
+    budget = Deadline(seconds)
+    if parent is not None:
+        budget.expires_at = min(budget.expires_at, parent.expires_at)
+    token = current_deadline.set(budget)
+    try:
+        yield budget
+    finally:
+        current_deadline.reset(token)
+        if parent is not None and budget.missed:
+            parent.missed = True
+
+
+@contextmanager
+def no_deadline():
+    """For work that outlives the request (speculative prefetches, shared upstream fetches)."""
+    token = current_deadline.set(None)
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining() -> float | None:
+    budget = current_deadline.get()
+    return None if budget is None else budget.remaining()
+
+
+def missed() -> bool:
+    """True once something in this request was left out because its budget ran out."""
+    budget = current_deadline.get()
+    return budget is not None and budget.missed
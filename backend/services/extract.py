@@ -0,0 +1,211 @@
+import json
+
+import httpx
+
+# Streaming parser (pip install ijson). Without it the body is decoded in one go and
+# trimmed afterwards: same result, just more memory and CPU for the parts we drop.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_PARSE_ERRORS = (ijson.JSONError,) if ijson is not None else ()
+
+# Upstream payloads are trimmed to what the service reads before they're cached.
+# A spec says what to keep of a JSON document:
+#
+#   KEEP                 the value as it is
+#   Items(fields, ...)   a list of objects, each reduced to some of its scalar fields
+#   {"key": spec, ...}   an object, reduced to these keys
+#
+# With ijson the document is parsed as its bytes arrive and only the kept parts are
+# ever built: a credits list with hundreds of crew entries costs a couple of string
+# comparisons per entry instead of a dict each.
+KEEP = object()
+
+
+class Items:
+    """List of objects: keep `fields` of each (scalars only), the ones where `where` matches, at most `limit`."""
+
+    def __init__(self, fields: tuple[str, ...], limit: int | None = None, where: tuple[str, object] | None = None):
+        self.fields = fields
+        self.limit = limit
+        self.where = where
+        self.reads = set(fields) | ({where[0]} if where else set())
+
+    def accepts(self, item: dict) -> bool:
+        if self.where is None:
+            return True
+        value = item.get(self.where[0])
+        return not isinstance(value, (dict, list)) and value == self.where[1]
+
+    def full(self, items: list) -> bool:
+        return self.limit is not None and len(items) >= self.limit
+
+
+# Fields of a movie in a result list (search, discover, trending, recommendations,
+# collection parts): what models.Movie, the typeahead and the ranking read
+MOVIE_SUMMARY = Items(
+    ("id", "title", "original_title", "poster_path", "release_date", "vote_average", "vote_count", "popularity")
+)
+
+RESULTS_PAGE = {"page": KEEP, "total_pages": KEEP, "total_results": KEEP, "results": MOVIE_SUMMARY}
+
+# /movie/{id}?append_to_response=credits,recommendations: details, the first five cast
+# members and the directors (all that get_full_movie_details shows), first recommendations page
+MOVIE_BUNDLE = {
+    **{key: KEEP for key in (
+        "id", "title", "original_title", "poster_path", "backdrop_path", "overview", "release_date",
+        "runtime", "vote_average", "vote_count", "popularity", "genres", "belongs_to_collection",
+    )},
+    "credits": {
+        "cast": Items(("name",), limit=5),
+        "crew": Items(("name", "job"), where=("job", "Director")),
+    },
+    "recommendations": RESULTS_PAGE,
+}
+
+COLLECTION = {"id": KEEP, "name": KEEP, "parts": MOVIE_SUMMARY}
+
+
+def project(spec, value):
+    """Apply a spec to an already decoded document."""
+    if spec is KEEP:
+        return value
+    if isinstance(spec, Items):
+        if not isinstance(value, list):
+            return value
+        items = []
+        for item in value:
+            if spec.full(items):
+                break
+            if isinstance(item, dict) and spec.accepts(item):
+                items.append({
+                    field: item[field] for field in spec.fields
+                    if field in item and not isinstance(item[field], (dict, list))
+                })
+        return items
+    if not isinstance(value, dict):
+        return value
+    return {key: project(child, value[key]) for key, child in spec.items() if key in value}
+
+
+async def read_json(response: httpx.Response, spec):
+    """
+    The response body, trimmed by `spec`; streamed through ijson when it's installed.
+    A body that isn't valid JSON (cut off, or an HTML error page with a 200) raises
+    httpx.DecodingError, which the scheduler retries like a network error.
+    """
+    try:
+        if ijson is None:
+            return project(spec, json.loads(await response.aread()))
+
+        builder = _SpecBuilder(spec)
+        events = ijson.sendable_list()
+        parser = ijson.parse_coro(events, use_float=True)
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+            builder.feed(events)
+            del events[:]
+        parser.close()
+        builder.feed(events)
+        return builder.result
+    except (ValueError, *_PARSE_ERRORS) as exc:  # ValueError: json.loads, or undecodable text
+        raise httpx.DecodingError(f"Invalid JSON from {response.request.url.path}: {exc}",
+                                  request=response.request) from exc
+
+
+class _SpecBuilder:
+    """Builds the kept parts of a document from ijson (prefix, event, value) events."""
+
+    _SCALARS = ("string", "number", "boolean", "null")
+
+    def __init__(self, spec):
+        # ijson prefix ("credits.cast") -> (path of keys, spec there)
+        self._specs = {}
+        self._index(spec, ())
+        self.result = None
+        self._keep = None  # (path, ObjectBuilder, depth) of a KEEP value being built
+        self._item = None  # (prefix, Items spec, list, fields so far) of a list item being read
+
+    def _index(self, spec, path):
+        self._specs[".".join(path)] = (path, spec)
+        if isinstance(spec, dict):
+            for key, child in spec.items():
+                self._index(child, path + (key,))
+
+    def feed(self, events):
+        for prefix, event, value in events:
+            if self._keep is not None:
+                self._feed_keep(event, value)
+            elif self._item is not None:
+                self._feed_item(prefix, event, value)
+            else:
+                self._start(prefix, event, value)
+
+    def _start(self, prefix, event, value):
+        if event == "map_key":
+            return
+        if prefix.endswith(".item") or prefix == "item":
+            parent = self._specs.get(prefix[:-5].rstrip("."))
+            if parent is not None and isinstance(parent[1], Items) and event == "start_map":
+                items = self._get(parent[0])
+                if isinstance(items, list) and not parent[1].full(items):
+                    self._item = (prefix, parent[1], items, {})
+            return
+
+        entry = self._specs.get(prefix)
+        if entry is None:
+            return
+        path, spec = entry
+        if event in self._SCALARS:
+            self._set(path, value)
+        elif event == "start_map" and isinstance(spec, dict):
+            self._set(path, {})
+        elif event == "start_array" and isinstance(spec, Items):
+            self._set(path, [])
+        elif event in ("start_map", "start_array"):
+            # KEEP, or not the shape the spec expects: kept as it is, like project() does
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            self._keep = (path, builder, 1)
+
+    def _feed_keep(self, event, value):
+        path, builder, depth = self._keep
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            self._keep = None
+            self._set(path, builder.value)
+        else:
+            self._keep = (path, builder, depth)
+
+    def _feed_item(self, prefix, event, value):
+        item_prefix, spec, items, item = self._item
+        if prefix == item_prefix and event == "end_map":
+            self._item = None
+            if spec.accepts(item) and not spec.full(items):
+                items.append({field: item[field] for field in spec.fields if field in item})
+        elif event in self._SCALARS and prefix.startswith(item_prefix):
+            field = prefix[len(item_prefix) + 1:]
+            if field in spec.reads:
+                item[field] = value
+
+    def _get(self, path):
+        node = self.result
+        for key in path:
+            if not isinstance(node, dict):
+                return None
+            node = node.get(key)
+        return node
+
+    def _set(self, path, value):
+        if not path:
+            self.result = value
+            return
+        node = self._get(path[:-1])
+        if isinstance(node, dict):
+            node[path[-1]] = value
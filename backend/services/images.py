@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# TMDB renders every image in a fixed set of widths; we proxy those instead of resizing
+# ourselves (https://developer.themoviedb.org/docs/image-basics)
+POSTER_SIZES = ("w92", "w154", "w185", "w342", "w500", "w780", "original")
+BACKDROP_SIZES = ("w300", "w780", "w1280", "original")
+IMAGE_SIZES = frozenset(POSTER_SIZES + BACKDROP_SIZES)
+
+# TMDB file paths look like "/kqjL17yufvn9OVLyXYpvtyrFfak.jpg". Raster formats only:
+# an SVG from upstream could carry script, and we'd be serving it from our own origin
+_FILE_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}\.(jpg|jpeg|png|webp)$")
+CONTENT_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+
+def valid_image(size: str, file_name: str) -> bool:
+    return size in IMAGE_SIZES and _FILE_NAME.match(file_name) is not None
+
+
+def placeholder_svg(kind: str) -> str:
+    """A neutral "No Image" box with the poster (2:3) or backdrop (16:9) aspect ratio."""
+    width, height = (1280, 720) if kind == "backdrop" else (500, 750)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<rect width="100%" height="100%" fill="#cbd5e1"/>'
+        f'<text x="50%" y="50%" fill="#475569" font-family="sans-serif" font-size="{width // 12}" '
+        f'text-anchor="middle" dominant-baseline="middle">No Image</text></svg>'
+    )
+
+
+class ImageCache:
+    """
+    Content-addressed disk cache for TMDB images:
+
+        blobs/ab/abcdef....jpg    image bytes, named by their SHA-256
+        refs/w342/xyz.jpg         text file holding the digest of that variant
+
+    Every variant is downloaded once (concurrent requests for it share the download),
+    identical bytes are stored once, and because a digest never changes its content
+    the files can be served as immutable. When the blobs grow past max_bytes the
+    least recently written ones are deleted (in a thread, the event loop only keeps
+    a running total); refs pointing at them are re-fetched.
+    """
+
+    def __init__(self, directory: Path | str, base_url: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.base_url = base_url.rstrip("/")
+        self.max_bytes = max_bytes
+        self._digests = {}
+        self._in_flight = {}
+        self._total_bytes = None  # of the blobs, once they've been counted
+        self._trimming = None
+
+    def _ref_path(self, size: str, file_name: str) -> Path:
+        return self.directory / "refs" / size / file_name
+
+    def blob_path(self, digest: str, file_name: str) -> Path:
+        ext = file_name.rsplit(".", 1)[1]
+        return self.directory / "blobs" / digest[:2] / f"{digest}.{ext}"
+
+    def _cached_digest(self, size: str, file_name: str) -> str | None:
+        key = f"{size}/{file_name}"
+        digest = self._digests.get(key)
+        if digest is None:
+            try:
+                digest = self._ref_path(size, file_name).read_text().strip()
+            except FileNotFoundError:
+                return None
+            self._digests[key] = digest
+        if not self.blob_path(digest, file_name).exists():
+            self._digests.pop(key, None)
+            return None
+        return digest
+
+    async def get(self, client: httpx.AsyncClient, size: str, file_name: str) -> str | None:
+        """Digest of the image (fetched if needed; blob_path() locates it), or None if TMDB doesn't have it."""
+        digest = self._cached_digest(size, file_name)
+        if digest is not None:
+            return digest
+
+        key = f"{size}/{file_name}"
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(client, size, file_name))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def read(self, digest: str, file_name: str) -> bytes | None:
+        """The blob's bytes, or None if it was trimmed since get() returned its digest."""
+        try:
+            return await asyncio.to_thread(self.blob_path(digest, file_name).read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def _fetch(self, client: httpx.AsyncClient, size: str, file_name: str) -> str | None:
+        try:
+            response = await client.get(f"{self.base_url}/{size}/{file_name}")
+        except httpx.HTTPError as exc:
+            logger.warning("Image %s/%s could not be fetched: %s", size, file_name, exc)
+            return None
+        if response.status_code != 200 or not response.headers.get("content-type", "").startswith("image/"):
+            return None
+
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        blob = self.blob_path(digest, file_name)
+        if not blob.exists():
+            await asyncio.to_thread(_write_atomic, blob, content)
+            self._account(len(content))
+        await asyncio.to_thread(_write_atomic, self._ref_path(size, file_name), digest.encode("ascii"))
+        self._digests[f"{size}/{file_name}"] = digest
+        return digest
+
+    def _account(self, added: int):
+        # Listing the blobs is O(cache size): done once to count them, then only when
+        # the running total says a trim is due, and never on the event loop
+        if self._total_bytes is not None:
+            self._total_bytes += added
+            if self._total_bytes <= self.max_bytes:
+                return
+        if self._trimming is None:
+            self._trimming = asyncio.create_task(self._trim())
+
+    async def _trim(self):
+        try:
+            total, removed = await asyncio.to_thread(self._trim_blobs)
+        except OSError:
+            logger.exception("Image cache could not be trimmed")
+            return
+        finally:
+            self._trimming = None
+        self._total_bytes = total
+        if removed:
+            self._digests = {key: digest for key, digest in self._digests.items() if digest not in removed}
+
+    def _trim_blobs(self) -> tuple[int, set[str]]:
+        # (bytes left, digests deleted); the oldest blobs go until 90% of max_bytes is left
+        blobs = []
+        for path in (self.directory / "blobs").glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            blobs.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in blobs)
+        removed = set()
+        if total <= self.max_bytes:
+            return total, removed
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(blobs):
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed.add(path.name.split(".", 1)[0])
+        return total, removed
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written from worker threads: two variants with the same bytes may share a blob
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
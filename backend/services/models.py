@@ -0,0 +1,107 @@
+from dataclasses import dataclass, fields
+
+from services.settings import settings
+
+# What the frontend gets for a movie (see frontend/src/types.ts). Slotted dataclasses:
+# no per-instance __dict__, and orjson serializes them natively without building
+# an intermediate dict per movie.
+
+# Images go through our proxy (/api/images, see services/images.py). The URLs are
+# absolute because the frontend is served from another origin.
+PUBLIC_BASE_URL = settings.public_base_url.rstrip("/")
+IMAGE_BASE_URL = f"{PUBLIC_BASE_URL}/api/images"
+
+# Cards and the carousel get w342 (the frontend picks smaller/larger ones through
+# srcset), the details modal a bigger poster and a backdrop that isn't the multi-MB original
+CARD_POSTER_SIZE = "w342"
+DETAILS_POSTER_SIZE = "w780"
+BACKDROP_SIZE = "w1280"
+POSTER_PLACEHOLDER = f"{IMAGE_BASE_URL}/placeholder/poster.svg"
+
+
+def poster_url(poster_path: str | None, size: str = CARD_POSTER_SIZE) -> str:
+    return f"{IMAGE_BASE_URL}/{size}{poster_path}" if poster_path else POSTER_PLACEHOLDER
+
+
+def release_year(release_date: str | None) -> str:
+    return release_date[:4] if release_date else ""
+
+
+@dataclass(slots=True)
+class Movie:
+    id: int
+    title: str
+    poster: str
+    year: str
+    vote_average: float
+
+    @classmethod
+    def from_tmdb(cls, m: dict) -> "Movie":
+        return cls(
+            id=m.get("id"),
+            title=m.get("title"),
+            poster=poster_url(m.get("poster_path")),
+            year=release_year(m.get("release_date")),
+            vote_average=m.get("vote_average", 0),
+        )
+
+
+# What ?fields= may ask for (see project())
+MOVIE_FIELDS = tuple(f.name for f in fields(Movie))
+
+
+def project(movies: list[Movie], names: tuple[str, ...] | None) -> list:
+    """The movies as they are, or only the given fields of each (for ?fields=)."""
+    if names is None:
+        return movies
+    return [{name: getattr(m, name) for name in names} for m in movies]
+
+
+@dataclass(slots=True)
+class SequelGroup:
+    title: str
+    movies: list[Movie]
+
+    @classmethod
+    def from_service(cls, group: dict) -> "SequelGroup":
+        return cls(title=group["title"], movies=[Movie.from_tmdb(m) for m in group["movies"]])
+
+
+@dataclass(slots=True)
+class MovieDetails:
+    # Raw fields from get_full_movie_details are kept next to the derived ones,
+    # the modal reads both
+    id: int
+    title: str
+    poster_path: str | None
+    backdrop_path: str | None
+    overview: str | None
+    release_date: str | None
+    runtime: int | None
+    vote_average: float | None
+    genres: list[str]
+    director: str
+    cast: list[str]
+    poster: str
+    backdrop: str | None
+    year: str
+
+    @classmethod
+    def from_service(cls, details: dict) -> "MovieDetails":
+        backdrop_path = details.get("backdrop_path")
+        return cls(
+            id=details.get("id"),
+            title=details.get("title"),
+            poster_path=details.get("poster_path"),
+            backdrop_path=backdrop_path,
+            overview=details.get("overview"),
+            release_date=details.get("release_date"),
+            runtime=details.get("runtime"),
+            vote_average=details.get("vote_average", 0),
+            genres=details.get("genres", []),
+            director=details.get("director"),
+            cast=details.get("cast", []),
+            poster=poster_url(details.get("poster_path"), DETAILS_POSTER_SIZE),
+            backdrop=f"{IMAGE_BASE_URL}/{BACKDROP_SIZE}{backdrop_path}" if backdrop_path else None,
+            year=release_year(details.get("release_date")),
+        )
@@ -0,0 +1,35 @@
+import base64
+import hashlib
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Cursors are opaque to clients: base64url of a tiny JSON object holding the offset
+# into the merged result list and a fingerprint of the query it belongs to, so a
+# cursor replayed against another query is rejected instead of returning nonsense.
+
+def cursor_scope(*parts) -> str:
+    return hashlib.blake2b("\x1f".join(str(p) for p in parts).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def encode_cursor(offset: int, scope: str) -> str:
+    raw = json.dumps({"o": offset, "s": scope}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str | None, scope: str) -> int:
+    """Offset encoded in cursor (0 for no cursor). Raises InvalidCursor."""
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset = data["o"]
+        if data["s"] != scope or not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor(cursor)
+    except (ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursor(cursor) from exc
+    return offset
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import random
+
+import httpx
+
+from services import tmdb_service
+from services.upstream import UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchScheduler:
+    """
+    Keeps the homepage warm: every `interval` seconds (plus jitter) it refreshes the weekly
+    trends and pulls details, credits, recommendations and collections of the top-N
+    trending movies into the response cache, so clicking a carousel card never goes
+    to TMDB cold. At most `concurrency` prefetch requests run at once so the warmer
+    never competes with real traffic for the rate limit.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        interval: float = 1800.0,
+        top_n: int = 20,
+        concurrency: int = 4,
+        jitter: float = 2.0,
+    ):
+        self.client = client
+        self.interval = interval
+        self.top_n = top_n
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self._task = None
+        self.last_run = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Prefetch run failed")
+            # Jittered so several workers don't all refresh at the same moment
+            await asyncio.sleep(self.interval * random.uniform(0.9, 1.1))
+
+    async def run_once(self) -> dict:
+        """Refresh trends and warm the top-N movies. Returns a small summary."""
+        trends = await tmdb_service.get_weekly_trends(self.client, refresh=True)
+        movie_ids = [m["id"] for m in trends[:self.top_n]]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._warm_movie(mid, semaphore) for mid in movie_ids))
+
+        self.last_run = {
+            "movies": len(movie_ids),
+            "warmed": sum(1 for ok in results if ok),
+        }
+        logger.info("Prefetched %(warmed)d/%(movies)d trending movies", self.last_run)
+        return self.last_run
+
+    async def _warm_movie(self, movie_id: int, semaphore: asyncio.Semaphore) -> bool:
+        client = self.client
+
+        async def job(coro_factory):
+            # Spread the requests out a little instead of firing them in one burst
+            await asyncio.sleep(random.uniform(0, self.jitter))
+            async with semaphore:
+                return await coro_factory()
+
+        try:
+            # Details, credits and recommendations come in one request; then the collection
+            # for the sequels section (needs the details, which are cached by now).
+            await job(lambda: tmdb_service.get_full_movie_details(client, movie_id))
+            await job(lambda: tmdb_service.get_movie_sequels(client, movie_id))
+            return True
+        except (UpstreamUnavailable, httpx.HTTPError) as exc:
+            logger.warning("Prefetch of movie %s failed: %s", movie_id, exc)
+            return False
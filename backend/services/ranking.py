@@ -0,0 +1,83 @@
+import time
+
+from services.startup import LazyModule
+
+# Imported on first use, or by the warm-up in the background (see services/startup.py)
+np = LazyModule("numpy")
+
+# Weighted ranking of recommendation candidates, one vectorized pass over the pool:
+#
+#   score = count * w_count + rating * w_rating + votes * w_votes
+#           + popularity * w_popularity + recency * w_recency
+#
+# count is how many selected movies recommend the candidate; the other features are
+# scaled to [0, 1] against fixed references (not the pool), so a movie's score doesn't
+# depend on what else is in the pool and pages stay stable. With the default weights
+# the quality terms add up to less than one co-occurrence: the count still decides,
+# they only order the ties (which used to fall back to TMDB's order).
+FEATURES = ("count", "rating", "votes", "popularity", "recency")
+DEFAULT_WEIGHTS = {"count": 1.0, "rating": 0.15, "votes": 0.1, "popularity": 0.1, "recency": 0.05}
+
+VOTES_REFERENCE = 20000  # vote_count that scores 1.0 (log scale)
+POPULARITY_REFERENCE = 1000.0  # popularity that scores 1.0 (log scale)
+RECENCY_HALF_LIFE = 10.0  # years until the recency term halves
+
+
+def movie_features(movies: list[dict]) -> "np.ndarray":
+    """float64[n, 4] of vote_average, vote_count, popularity and release year (NaN if unknown)."""
+    features = np.empty((len(movies), 4), dtype=np.float64)
+    for i, m in enumerate(movies):
+        date = m.get("release_date")
+        features[i] = (
+            m.get("vote_average") or 0.0,
+            m.get("vote_count") or 0.0,
+            m.get("popularity") or 0.0,
+            float(date[:4]) if date and date[:4].isdigit() else np.nan,
+        )
+    return features
+
+
+def scores(counts, features: "np.ndarray", weights: dict) -> "np.ndarray":
+    counts = np.asarray(counts, dtype=np.float64)
+    if len(counts) == 0:
+        return counts
+    rating, votes, popularity, year = features.T
+    age = np.maximum(time.gmtime().tm_year - year, 0.0)
+    return (
+        weights.get("count", 0.0) * counts
+        + weights.get("rating", 0.0) * np.clip(rating / 10.0, 0.0, 1.0)
+        + weights.get("votes", 0.0) * np.minimum(np.log1p(votes) / np.log1p(VOTES_REFERENCE), 1.0)
+        + weights.get("popularity", 0.0) * np.minimum(np.log1p(popularity) / np.log1p(POPULARITY_REFERENCE), 1.0)
+        + weights.get("recency", 0.0) * np.nan_to_num(0.5 ** (age / RECENCY_HALF_LIFE))
+    )
+
+
+def top_k(values: "np.ndarray", k: int | None) -> "np.ndarray":
+    """
+    Indices of the k highest values, best first; equal values keep their index order.
+    argpartition finds the cut in O(n), so only the k winners get sorted.
+    """
+    n = len(values)
+    negated = -values
+    if k is None or k >= n:
+        return np.lexsort((np.arange(n), negated))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # Everything better than the k-th value, then as many of its ties as fit (lowest index first)
+    threshold = negated[np.argpartition(negated, k - 1)[k - 1]]
+    better = np.flatnonzero(negated < threshold)
+    ties = np.flatnonzero(negated == threshold)[:k - len(better)]
+    chosen = np.concatenate([better, ties])
+    return chosen[np.lexsort((chosen, negated[chosen]))]
+
+
+def rank_movies(movies: list[dict], counts, k: int | None, weights: dict) -> list[dict]:
+    """
+    The k best of `movies` (in first-seen order, counts aligned with them) by weighted
+    score, ties in first-seen order.
+    """
+    if not movies:
+        return []
+    order = top_k(scores(counts, movie_features(movies), weights), k)
+    return [movies[i] for i in order]
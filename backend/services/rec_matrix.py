@@ -0,0 +1,159 @@
+import json
+import threading
+from pathlib import Path
+
+from services.ranking import movie_features, scores, top_k
+from services.startup import LazyModule
+
+np = LazyModule("numpy")
+
+# A matrix directory holds plain .npy files (so they can be np.load'ed with mmap_mode
+# and shared between workers) plus one blob of movie payloads:
+#
+#   ids.npy          int64[n]    every movie id we know, sorted (row/column i <-> ids[i])
+#   harvested.npy    bool[n]     True if we have the recommendation list of that movie
+#   indptr.npy       int64[n+1]  CSR row pointers
+#   indices.npy      int32[nnz]  CSR column indices, each row in TMDB's original order
+#   meta_offsets.npy int64[n+1]  byte ranges of each movie's JSON payload in meta.bin
+#   meta.bin                     compact TMDB-shaped movie dicts, one after another
+#   features.npy     float64[n,4] ranking features of each movie (see services/ranking.py);
+#                                 optional, older matrices read them from meta.bin instead
+FILES = ("ids", "harvested", "indptr", "indices", "meta_offsets")
+
+
+def write_matrix(directory: Path | str, rec_lists: dict[int, list[dict]]):
+    """
+    Build the matrix from harvested /movie/{id}/recommendations results
+    ({source movie id: [TMDB movie dicts in TMDB order]}).
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    movies = {}
+    for source_id, recs in rec_lists.items():
+        movies.setdefault(source_id, None)
+        for rec in recs:
+            movies[rec["id"]] = rec
+
+    ids = np.array(sorted(movies), dtype=np.int64)
+    row_of = {int(mid): i for i, mid in enumerate(ids)}
+
+    harvested = np.zeros(len(ids), dtype=bool)
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    rows = [[] for _ in ids]
+    for source_id, recs in rec_lists.items():
+        row = row_of[source_id]
+        harvested[row] = True
+        rows[row] = [row_of[rec["id"]] for rec in recs]
+    indptr[1:] = np.cumsum([len(r) for r in rows])
+    indices = np.array([col for r in rows for col in r], dtype=np.int32)
+
+    meta = bytearray()
+    meta_offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+    for i, mid in enumerate(ids):
+        movie = movies[int(mid)]
+        if movie is not None:
+            meta += json.dumps(movie, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        meta_offsets[i + 1] = len(meta)
+
+    arrays = {
+        "ids": ids,
+        "harvested": harvested,
+        "indptr": indptr,
+        "indices": indices,
+        "meta_offsets": meta_offsets,
+        "features": movie_features([movies[int(mid)] or {} for mid in ids]),
+    }
+    for name, array in arrays.items():
+        np.save(directory / f"{name}.npy", array)
+    (directory / "meta.bin").write_bytes(bytes(meta))
+
+
+class RecMatrix:
+    """
+    Item-to-item recommendation matrix built offline by build_rec_matrix.py.
+    Loaded (memory-mapped) on first use; without a matrix on disk it covers nothing
+    and get_recommendations keeps using the live TMDB path.
+    """
+
+    def __init__(self, directory: Path | str):
+        self.directory = Path(directory)
+        self._loaded = False
+        # The warm-up loads it in a background thread (see services/startup.py) while
+        # a request may get there first
+        self._load_lock = threading.Lock()
+        self.ids = None
+        self.features = None
+
+    @property
+    def available(self) -> bool:
+        self._load()
+        return self.ids is not None
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                try:
+                    self._open()
+                finally:
+                    self._loaded = True
+
+    def _open(self):
+        if not all((self.directory / f"{name}.npy").exists() for name in FILES):
+            return
+
+        for name in FILES:
+            setattr(self, name, np.load(self.directory / f"{name}.npy", mmap_mode="r"))
+        if (self.directory / "features.npy").exists():
+            self.features = np.load(self.directory / "features.npy", mmap_mode="r")
+        self.meta = np.memmap(self.directory / "meta.bin", dtype=np.uint8, mode="r") \
+            if self.meta_offsets[-1] else np.zeros(0, dtype=np.uint8)
+
+    def rows_for(self, movie_ids: list[int]):
+        """Matrix rows of the given movies, or None if any of them wasn't harvested."""
+        if not movie_ids or not self.available or len(self.ids) == 0:
+            return None
+        wanted = np.asarray(movie_ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, wanted)
+        rows[rows == len(self.ids)] = 0
+        if not np.all(self.ids[rows] == wanted) or not np.all(self.harvested[rows]):
+            return None
+        return rows
+
+    def movie(self, row: int) -> dict:
+        start, end = self.meta_offsets[row], self.meta_offsets[row + 1]
+        return json.loads(self.meta[start:end].tobytes())
+
+    def recommendations_for(self, row: int) -> list[dict]:
+        cols = self.indices[self.indptr[row]:self.indptr[row + 1]]
+        return [self.movie(int(col)) for col in cols]
+
+    def score(self, rows, k: int, weights: dict) -> list[dict]:
+        """
+        Co-occurrence scoring for a multi-movie selection as one vectorized sum over the
+        selected rows: count how many selected movies recommend each candidate, drop the
+        selection itself and keep the top k by the weighted score of services/ranking.py.
+        Ties are broken by first appearance (selection order, then TMDB's order), which
+        is exactly how the live path orders them. Work is proportional to the selected
+        rows only, not to the size of the matrix.
+        """
+        if len(rows) == 0:
+            return []
+        cols = np.concatenate([self.indices[s:e] for s, e in zip(self.indptr[rows], self.indptr[rows + 1])])
+        if len(cols) == 0:
+            return []
+
+        candidates, first_seen, counts = np.unique(cols, return_index=True, return_counts=True)
+        keep = ~np.isin(candidates, rows)
+        candidates, first_seen, counts = candidates[keep], first_seen[keep], counts[keep]
+
+        by_appearance = np.argsort(first_seen, kind="stable")
+        candidates, counts = candidates[by_appearance], counts[by_appearance]
+        if self.features is not None:
+            features = self.features[candidates]
+        else:
+            features = movie_features([self.movie(int(col)) for col in candidates])
+        top = top_k(scores(counts, features, weights), k)
+        return [self.movie(int(col)) for col in candidates[top]]
@@ -0,0 +1,134 @@
+import asyncio
+import secrets
+import time
+from collections import Counter, OrderedDict
+
+
+class RecommendationSession:
+    """
+    Aggregated recommendation state of one selection, so a selection that changes one
+    movie at a time is updated with that movie's delta instead of recomputed:
+
+        movies       movie id -> (recommendation list, genre ids, collection id); list
+                     and genres are None while the movie's details aren't loaded
+        occurrences  candidate id -> [(movie id, position in its list, movie), ...]
+        genres       genre id -> number of selected movies with it
+        groups       collection id -> sequel group
+
+    candidates() gives the same pool as rank_recommendations() builds for the selection.
+    Callers hold `lock` while changing or reading it.
+    """
+
+    __slots__ = ("id", "lock", "movies", "occurrences", "genres", "groups", "size")
+
+    def __init__(self):
+        self.id = secrets.token_urlsafe(12)
+        self.lock = asyncio.Lock()
+        self.movies = {}
+        self.occurrences = {}
+        self.genres = Counter()
+        self.groups = {}
+        self.size = 0  # stored recommendation entries, what the store's memory bound counts
+
+    def add(self, movie_id: int, recommendations: list[dict] | None, genre_ids, collection_id: int | None):
+        if movie_id in self.movies:
+            self.remove(movie_id)
+        genre_ids = None if genre_ids is None else tuple(genre_ids)
+        self.movies[movie_id] = (recommendations, genre_ids, collection_id)
+        for position, rec in enumerate(recommendations or ()):
+            self.occurrences.setdefault(rec["id"], []).append((movie_id, position, rec))
+        self.genres.update(genre_ids or ())
+        self.size += len(recommendations or ())
+
+    def remove(self, movie_id: int):
+        recommendations, genre_ids, collection_id = self.movies.pop(movie_id)
+        recommendations, genre_ids = recommendations or (), genre_ids or ()
+        for rec in recommendations:
+            remaining = [o for o in self.occurrences.get(rec["id"], ()) if o[0] != movie_id]
+            if remaining:
+                self.occurrences[rec["id"]] = remaining
+            else:
+                self.occurrences.pop(rec["id"], None)
+        self.genres.subtract(genre_ids)
+        self.genres += Counter()  # drop genres no selected movie has anymore
+        if collection_id is not None and all(movie[2] != collection_id for movie in self.movies.values()):
+            self.groups.pop(collection_id, None)
+        self.size -= len(recommendations)
+
+    def candidates(self, movie_ids: list[int]):
+        """(movies in the order first seen, how many selected movies recommend each), selection excluded."""
+        order = {mid: i for i, mid in enumerate(movie_ids)}
+        pool = []
+        for rid, occurrences in self.occurrences.items():
+            if rid in order:
+                continue
+            movie_id, position, rec = min(occurrences, key=lambda o: (order[o[0]], o[1]))
+            pool.append((order[movie_id], position, rec, len(occurrences)))
+        pool.sort(key=lambda item: item[:2])
+        return [item[2] for item in pool], [item[3] for item in pool]
+
+    def bare(self, movie_ids: list[int]):
+        """The movies of the selection added without their details."""
+        return [mid for mid in movie_ids if mid in self.movies and self.movies[mid][1] is None]
+
+    def collection_ids(self, movie_ids: list[int]):
+        # Movies missing from the session (not fetched in time) have none yet
+        return [self.movies[mid][2] for mid in movie_ids if mid in self.movies]
+
+
+class SessionStore:
+    """
+    Recommendation sessions by id, least recently used evicted first once there are more
+    than `max_sessions` or they hold more than `max_entries` recommendation entries in
+    total; sessions unused for `ttl` seconds are dropped. Also finds the session whose
+    selection is exactly a given one, for clients that didn't send an id.
+    """
+
+    def __init__(self, max_sessions: int = 1000, ttl: float = 1800.0, max_entries: int = 200_000):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # id -> (last_used, session, selection and size it was stored with)
+        self._sessions = OrderedDict()
+        self._by_selection = {}  # frozenset of movie ids -> session id
+        self._entries = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id: str | None) -> RecommendationSession | None:
+        entry = self._sessions.get(session_id) if session_id else None
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            self._drop(session_id)
+            return None
+        return entry[1]
+
+    def find(self, movie_ids) -> RecommendationSession | None:
+        return self.get(self._by_selection.get(frozenset(movie_ids)))
+
+    def put(self, session: RecommendationSession):
+        """Store (or touch) the session under its current selection."""
+        self._drop(session.id)
+        selection = frozenset(session.movies)
+        self._sessions[session.id] = (time.monotonic(), session, selection, session.size)
+        self._by_selection[selection] = session.id
+        self._entries += session.size
+
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self._entries > self.max_entries):
+            self._drop(next(iter(self._sessions)))
+
+    def clear(self):
+        self._sessions.clear()
+        self._by_selection.clear()
+        self._entries = 0
+
+    def _drop(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return
+        _, _, selection, size = entry
+        if self._by_selection.get(selection) == session_id:
+            del self._by_selection[selection]
+        self._entries -= size
@@ -0,0 +1,55 @@
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+from services.metrics import phase
+from services.models import Movie, MovieDetails, SequelGroup
+
+try:
+    import orjson
+except ImportError:  # plain json works too, just slower
+    orjson = None
+
+
+def _slots_to_dict(obj):
+    if isinstance(obj, (Movie, MovieDetails, SequelGroup)):
+        return {name: getattr(obj, name) for name in obj.__slots__}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    """Compact UTF-8 JSON, straight to bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_slots_to_dict, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_for(body: bytes) -> str:
+    # Strong validator: identical bytes <=> identical tag
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def json_response(request: Request, payload, max_age: int, headers: dict | None = None) -> Response:
+    """
+    Serialize once, tag the bytes and answer 304 when the client already has them.
+    Browsers revalidate with If-None-Match after max_age on their own.
+    """
+    with phase("serialize"):
+        body = dumps(payload)
+        etag = etag_for(body)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
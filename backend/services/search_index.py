@@ -0,0 +1,265 @@
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+from pathlib import Path
+
+# On-disk layout (little endian, every section 8-byte aligned):
+#
+#   magic     8 bytes  b"FPSIDX01"
+#   header    7 x u64  n_docs, n_keys, docs_off, keys_off, ranges_off, postings_off, blob_off
+#   docs      n_docs x 4 u32   folded_off, folded_len, payload_off, payload_len (into blob)
+#   keys      n_keys x u64     sorted trigram / prefix keys
+#   ranges    n_keys x 2 u32   start, count (into postings)
+#   postings  u32 doc numbers, ascending
+#   blob      utf-8 folded titles and compact JSON payloads
+#
+# Docs are numbered by popularity (0 = most popular), so every posting list is
+# already in ranking order and a lookup can stop as soon as it has enough hits.
+# Nothing is decoded up front: the file is mmap'ed and read in place, so several
+# worker processes share one copy through the page cache.
+MAGIC = b"FPSIDX01"
+HEADER = struct.Struct("<7Q")
+
+# Word prefixes shorter than a trigram get their own keys, marked with the top bit
+PREFIX_FLAG = 1 << 63
+
+# Don't verify more than this many candidates for one query
+MAX_SCAN = 20000
+
+_TURKISH_I = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def fold(text: str) -> str:
+    """
+    Case/diacritic folding for matching: "İstanbul", "ISTANBUL" and "istanbul" all become
+    "istanbul", "Şeytanın Gözü" becomes "seytanin gozu". Punctuation turns into single spaces.
+    """
+    # Turkish I/İ/ı don't round-trip through str.lower(), so settle them first
+    text = text.translate(_TURKISH_I).lower()
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def _gram_key(gram: str) -> int:
+    key = 0
+    for ch in gram:
+        key = (key << 21) | ord(ch)
+    return key
+
+
+def trigram_keys(folded: str) -> set[int]:
+    return {_gram_key(folded[i:i + 3]) for i in range(len(folded) - 2)}
+
+
+def prefix_key(prefix: str) -> int:
+    return PREFIX_FLAG | _gram_key(prefix)
+
+
+def _align(buffer: bytearray):
+    buffer.extend(b"\0" * (-len(buffer) % 8))
+
+
+def write_index(path: Path | str, movies: list[dict]):
+    """
+    Build an index file from TMDB-shaped movie dicts (id, title, original_title,
+    popularity, poster_path, release_date, vote_average). Written to a temp file
+    and renamed, so running workers never see a half-written index.
+    """
+    movies = sorted(movies, key=lambda m: (-(m.get("popularity") or 0), m["id"]))
+
+    blob = bytearray()
+    docs = []
+    postings = {}
+    for doc, movie in enumerate(movies):
+        names = [movie.get("title") or "", movie.get("original_title") or ""]
+        folded_names = list(dict.fromkeys(fold(n) for n in names if n))
+        folded = "\n".join(folded_names)
+
+        keys = trigram_keys(folded)
+        for word in folded.split():
+            keys.add(prefix_key(word[:1]))
+            if len(word) >= 2:
+                keys.add(prefix_key(word[:2]))
+        for key in keys:
+            postings.setdefault(key, []).append(doc)
+
+        folded_bytes = folded.encode("utf-8")
+        payload = json.dumps(
+            {k: movie.get(k) for k in ("id", "title", "original_title", "poster_path",
+                                       "release_date", "vote_average", "popularity")},
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode("utf-8")
+        docs.append((len(blob), len(folded_bytes), len(blob) + len(folded_bytes), len(payload)))
+        blob += folded_bytes + payload
+
+    sorted_keys = sorted(postings)
+
+    out = bytearray(MAGIC)
+    out += b"\0" * HEADER.size
+    _align(out)
+
+    docs_off = len(out)
+    for entry in docs:
+        out += struct.pack("<4I", *entry)
+    _align(out)
+
+    keys_off = len(out)
+    out += struct.pack(f"<{len(sorted_keys)}Q", *sorted_keys)
+    _align(out)
+
+    ranges_off = len(out)
+    start = 0
+    for key in sorted_keys:
+        out += struct.pack("<2I", start, len(postings[key]))
+        start += len(postings[key])
+    _align(out)
+
+    postings_off = len(out)
+    for key in sorted_keys:
+        out += struct.pack(f"<{len(postings[key])}I", *postings[key])
+    _align(out)
+
+    blob_off = len(out)
+    out += blob
+
+    out[len(MAGIC):len(MAGIC) + HEADER.size] = HEADER.pack(
+        len(docs), len(sorted_keys), docs_off, keys_off, ranges_off, postings_off, blob_off
+    )
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(out)
+    os.replace(tmp_path, path)
+
+
+class SearchIndex:
+    """
+    Read side of the index. Opens (mmaps) the file on first use; if the file
+    doesn't exist every search simply returns [] and callers go upstream.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._mmap = None
+        self._loaded = False
+        self._load_lock = threading.Lock()  # the warm-up opens it from a background thread
+
+    @property
+    def available(self) -> bool:
+        self._load()
+        return self._mmap is not None
+
+    def __len__(self) -> int:
+        return self._n_docs if self.available else 0
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                try:
+                    self._open()
+                finally:
+                    self._loaded = True
+
+    def _open(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            mm.close()
+            raise ValueError(f"{self.path} is not a search index file")
+
+        n_docs, n_keys, docs_off, keys_off, ranges_off, postings_off, blob_off = HEADER.unpack_from(mm, len(MAGIC))
+        view = memoryview(mm)
+        self._n_docs = n_docs
+        self._docs = view[docs_off:docs_off + n_docs * 16].cast("I")
+        self._keys = view[keys_off:keys_off + n_keys * 8].cast("Q")
+        self._ranges = view[ranges_off:ranges_off + n_keys * 8].cast("I")
+        self._postings = view[postings_off:blob_off].cast("I")
+        self._blob = view[blob_off:]
+        self._view = view
+        self._mmap = mm
+
+    def reload(self):
+        self.close()
+        self._loaded = False
+
+    def close(self):
+        if self._mmap is not None:
+            for name in ("_docs", "_keys", "_ranges", "_postings", "_blob", "_view"):
+                getattr(self, name).release()
+            self._mmap.close()
+            self._mmap = None
+
+    def _posting_list(self, key: int):
+        i = bisect.bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return None
+        start, count = self._ranges[2 * i], self._ranges[2 * i + 1]
+        return self._postings[start:start + count]
+
+    def _folded(self, doc: int) -> str:
+        off, length = self._docs[4 * doc], self._docs[4 * doc + 1]
+        return str(self._blob[off:off + length], "utf-8")
+
+    def _payload(self, doc: int) -> dict:
+        off, length = self._docs[4 * doc + 2], self._docs[4 * doc + 3]
+        return json.loads(bytes(self._blob[off:off + length]))
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """
+        Movies whose title (localized or original) contains the query, most relevant
+        first: titles starting with it, then titles with a word starting with it,
+        then any other match; each group by popularity.
+        """
+        if not self.available:
+            return []
+
+        q = fold(query)
+        if not q:
+            return []
+
+        if len(q) < 3:
+            # Too short for trigrams: use the word prefix keys instead
+            keys = [prefix_key(q)]
+        else:
+            keys = trigram_keys(q)
+
+        lists = []
+        for key in keys:
+            postings = self._posting_list(key)
+            if postings is None:
+                return []
+            lists.append(postings)
+        candidates = min(lists, key=len)
+
+        # Posting lists are in popularity order, so the first matches are the best ones
+        matches = []
+        padded_q = " " + q
+        for scanned, doc in enumerate(candidates):
+            if len(matches) >= limit * 3 or scanned >= MAX_SCAN:
+                break
+            folded = self._folded(doc)
+            if len(q) < 3 or q in folded:
+                if folded.startswith(q):
+                    rank = 0
+                elif padded_q in folded or ("\n" + q) in folded:
+                    rank = 1
+                else:
+                    rank = 2
+                matches.append((rank, doc))
+
+        matches.sort()  # (rank, doc): doc number doubles as the popularity order
+        return [self._payload(doc) for _, doc in matches[:limit]]
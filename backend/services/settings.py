@@ -0,0 +1,191 @@
+import math
+import os
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from services.ranking import DEFAULT_WEIGHTS
+
+# Every setting of the service, read once from the environment (and backend/.env,
+# which never overrides variables that are already set) when this module is first
+# imported. A setting's variable is its field name in upper case, e.g.
+# TMDB_RATE_LIMIT=20; the per-lane and per-weight ones are listed below.
+# Invalid values stop the process at startup with all of them listed, instead of
+# surfacing as a ValueError deep inside whichever module read them first.
+BASE_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = BASE_DIR / ".cache"
+
+# Admission control lanes (see services/admission.py and main.py):
+# priority, concurrent requests, queue length, seconds a request may wait in it.
+# Overridable per lane, e.g. ADMISSION_RECOMMENDATIONS_LIMIT=8 or ADMISSION_DETAILS_TIMEOUT=1.5.
+ADMISSION_LANES = {
+    "details": (0, 48, 256, 2.0),  # /api/movies/{id}, /api/movies/batch
+    "search": (1, 32, 128, 1.0),  # search and typeahead
+    "trends": (1, 16, 128, 1.0),
+    "recommendations": (2, 16, 32, 1.0),  # plain and streamed: one request fans out per selected movie
+}
+
+# Time budget of a request per lane in seconds, e.g. DEADLINE_RECOMMENDATIONS=5
+DEADLINES = {"details": 4.0, "search": 3.0, "trends": 3.0, "recommendations": 8.0}
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off", "")
+
+
+class SettingsError(ValueError):
+    pass
+
+
+def setting(default, positive: bool = False):
+    # Numbers are never negative; positive ones can't be 0 either
+    return field(default=default, metadata={"positive": positive})
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    # TMDB client
+    tmdb_api_key: str | None = None
+    tmdb_base_url: str = "https://api.themoviedb.org/3"  # or a local fake TMDB server
+    tmdb_image_base_url: str = "https://image.tmdb.org/t/p"
+    tmdb_max_connections: int = setting(100, positive=True)
+    tmdb_max_keepalive_connections: int = setting(20)
+    tmdb_keepalive_expiry: float = setting(30.0)
+    tmdb_http2: bool = False
+    tmdb_connect_timeout: float = setting(5.0, positive=True)
+    tmdb_read_timeout: float = setting(10.0, positive=True)
+    tmdb_write_timeout: float = setting(10.0, positive=True)
+    tmdb_pool_timeout: float = setting(5.0, positive=True)
+    tmdb_fanout_concurrency: int = setting(8, positive=True)
+    tmdb_page_prefetch: int = setting(2)
+    tmdb_serve_stale: bool = True
+
+    # Upstream scheduler
+    tmdb_rate_limit: float = setting(40.0, positive=True)
+    tmdb_rate_burst: float = setting(40.0, positive=True)
+    tmdb_max_retries: int = setting(3)
+    tmdb_breaker_threshold: int = setting(5, positive=True)
+    tmdb_breaker_reset: float = setting(30.0)
+
+    # Caches and local data
+    tmdb_cache_enabled: bool = True
+    tmdb_cache_path: str = str(CACHE_DIR / "tmdb_cache.sqlite3")
+    tmdb_cache_memory_entries: int = setting(5000)
+    tmdb_cache_memory_mb: int = setting(64)
+    tmdb_cache_disk_mb: int = setting(512)
+    search_index_path: str = str(CACHE_DIR / "search_index.bin")
+    rec_matrix_path: str = str(CACHE_DIR / "rec_matrix")
+    collection_index_path: str = str(CACHE_DIR / "collections.sqlite3")
+    image_cache_dir: str = str(CACHE_DIR / "images")
+    image_cache_mb: int = setting(1024)
+    typeahead_cache_entries: int = setting(2000)
+
+    # Recommendations
+    recommendation_top_k: int = setting(100, positive=True)
+    rec_session_max: int = setting(1000, positive=True)
+    rec_session_ttl: float = setting(1800.0, positive=True)
+    rec_session_max_entries: int = setting(200_000)
+    rank_weights: dict = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))  # RANK_WEIGHT_<NAME>
+
+    # API
+    public_base_url: str = "http://localhost:8000"
+    api_page_size: int = setting(20, positive=True)
+    typeahead_debounce_ms: float = setting(150.0)
+    server_timing: bool = False
+    prefetch_enabled: bool = True
+    prefetch_interval: float = setting(1800.0, positive=True)
+    prefetch_top_n: int = setting(20)
+    prefetch_concurrency: int = setting(4, positive=True)
+    admission_enabled: bool = True
+    admission_capacity: int = setting(64, positive=True)
+    admission_lanes: dict = field(default_factory=lambda: dict(ADMISSION_LANES))  # ADMISSION_<LANE>_*
+    deadlines: dict = field(default_factory=lambda: dict(DEADLINES))  # DEADLINE_<LANE>
+
+    # Startup: load the indexes and caches in the background right away (see
+    # services/startup.py), and warn when importing the app takes longer than this
+    warmup_enabled: bool = True
+    startup_import_budget: float = setting(0.8, positive=True)
+
+
+class _Reader:
+    def __init__(self, environ):
+        self.environ = environ
+        self.errors = []
+
+    def read(self, name: str, default, positive: bool = False, signed: bool = False):
+        raw = self.environ.get(name)
+        if raw is None:
+            return default
+        try:
+            return _parse(raw, default, positive, signed)
+        except ValueError as exc:
+            self.errors.append(f"{name}={raw!r}: {exc}")
+            return default
+
+
+def _parse(raw: str, default, positive: bool, signed: bool):
+    if default is None or isinstance(default, str):
+        return raw
+    if isinstance(default, bool):
+        value = raw.strip().lower()
+        if value not in _TRUE + _FALSE:
+            raise ValueError("expected true or false")
+        return value in _TRUE
+
+    kind = type(default)
+    try:
+        value = kind(raw)
+    except ValueError:
+        raise ValueError("expected an integer" if kind is int else "expected a number") from None
+    if not math.isfinite(value):
+        raise ValueError("expected a finite number")
+    if positive and value <= 0:
+        raise ValueError("must be greater than 0")
+    if not signed and value < 0:
+        raise ValueError("can't be negative")
+    return value
+
+
+def load_settings(environ=None) -> Settings:
+    """Settings from `environ` (the process environment plus backend/.env by default); SettingsError if any is invalid."""
+    if environ is None:
+        load_dotenv(BASE_DIR / ".env")
+        environ = os.environ
+    reader = _Reader(environ)
+    values = {}
+    for spec in fields(Settings):
+        if spec.name in ("rank_weights", "admission_lanes", "deadlines"):
+            continue
+        values[spec.name] = reader.read(spec.name.upper(), spec.default, spec.metadata.get("positive", False))
+
+    values["rank_weights"] = {
+        name: reader.read(f"RANK_WEIGHT_{name.upper()}", default, signed=True)
+        for name, default in DEFAULT_WEIGHTS.items()
+    }
+    values["admission_lanes"] = {
+        lane: (
+            priority,
+            reader.read(f"ADMISSION_{lane.upper()}_LIMIT", limit, positive=True),
+            reader.read(f"ADMISSION_{lane.upper()}_QUEUE", max_queue),
+            reader.read(f"ADMISSION_{lane.upper()}_TIMEOUT", timeout, positive=True),
+        )
+        for lane, (priority, limit, max_queue, timeout) in ADMISSION_LANES.items()
+    }
+    values["deadlines"] = {
+        lane: reader.read(f"DEADLINE_{lane.upper()}", default, positive=True) for lane, default in DEADLINES.items()
+    }
+
+    # Misspelled names would otherwise be ignored without a word
+    for prefix, known in (("RANK_WEIGHT_", DEFAULT_WEIGHTS), ("DEADLINE_", DEADLINES)):
+        for name in environ:
+            if name.startswith(prefix) and name[len(prefix):].lower() not in known:
+                reader.errors.append(f"{name}: unknown, expected one of {', '.join(prefix + k.upper() for k in known)}")
+    if values["tmdb_max_keepalive_connections"] > values["tmdb_max_connections"]:
+        reader.errors.append("TMDB_MAX_KEEPALIVE_CONNECTIONS: can't be more than TMDB_MAX_CONNECTIONS")
+
+    if reader.errors:
+        raise SettingsError("Invalid settings:\n  " + "\n  ".join(reader.errors))
+    return Settings(**values)
+
+
+settings = load_settings()
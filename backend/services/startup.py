@@ -0,0 +1,126 @@
+import asyncio
+import importlib
+import logging
+import threading
+import time
+
+from services.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Optional warm-up steps wait for a readiness probe to see the app ready (or this many
+# seconds after it is, when nothing probes it): started any earlier, they'd compete with
+# the startup itself for the CPU and the GIL, and readiness would come later
+OPTIONAL_STEPS_DELAY = 2.0
+
+
+class LazyModule:
+    """
+    Stands in for a module that is imported on first attribute access, e.g.
+    `np = LazyModule("numpy")`: a heavy dependency stays off the import path of the
+    app until something uses it or the warm-up below imports it in the background.
+    The import itself is a plain import_module, so a request and the warm-up racing
+    for it is fine.
+    """
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+
+class Warmup:
+    """
+    Loads what would otherwise be loaded by the first request that needs it (mmap'ed
+    indexes, the collection index, the SQLite caches, numpy) in a background thread,
+    one step after the other, right after startup. Requests are served meanwhile:
+    every step is a lazy loader that a request may also trigger (they're guarded by
+    locks), so warming up only moves the cost out of the request path.
+
+    The app counts as ready once the required steps are done, failed ones included
+    (they're logged, and the parts they load all have a fallback); the others are
+    warmed after that (see OPTIONAL_STEPS_DELAY). probe() is what /ready shows.
+    """
+
+    def __init__(self):
+        self.steps = []  # (name, load, required), in the order they run
+        self.state = {}  # name -> pending, loading, ready or failed
+        self.seconds = {}  # name -> how long loading it took
+        self.started_at = time.monotonic()
+        self.ready_after = None  # seconds from started_at until the required steps were done
+        self._task = None
+        self._probed = threading.Event()
+        self._stopping = False
+
+        Gauge("app_ready", "1 once the required warm-up steps are done (see /ready)",
+              function=lambda: {(): int(self.ready)})
+        Gauge("app_warmup_seconds", "Time each warm-up step took to load", ("step",),
+              function=lambda: {(name,): seconds for name, seconds in self.seconds.items()})
+
+    def add(self, name: str, load, required: bool = True):
+        self.steps.append((name, load, required))
+        self.state[name] = "pending"
+
+    @property
+    def ready(self) -> bool:
+        return all(self.state[name] in ("ready", "failed") for name, _, required in self.steps if required)
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._task = asyncio.ensure_future(asyncio.to_thread(self._run))
+
+    async def stop(self):
+        # A thread can't be cancelled: wait for the step in progress, so nothing is
+        # still loading what shutdown is about to close
+        self._stopping = True
+        self._probed.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def probe(self) -> dict:
+        """status() for the readiness probe; the optional steps start once it has seen the app ready."""
+        status = self.status()
+        if status["ready"]:
+            self._probed.set()
+        return status
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "ready_after": self.ready_after,
+            "steps": {
+                name: {"state": self.state[name], "required": required, "seconds": self.seconds.get(name)}
+                for name, _, required in self.steps
+            },
+        }
+
+    def _run(self):
+        for name, load, required in self.steps:
+            if required:
+                self._load(name, load)
+        self.ready_after = round(time.monotonic() - self.started_at, 4)
+        self._probed.wait(OPTIONAL_STEPS_DELAY)
+        for name, load, required in self.steps:
+            if self._stopping:
+                return
+            if not required:
+                self._load(name, load)
+
+    def _load(self, name: str, load):
+        self.state[name] = "loading"
+        started = time.perf_counter()
+        try:
+            load()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+            self.state[name] = "failed"
+        else:
+            self.state[name] = "ready"
+        self.seconds[name] = round(time.perf_counter() - started, 4)
@@ -1,54 +1,564 @@
+import asyncio
 import httpx
-import os
-from dotenv import load_dotenv
+import importlib.util
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 
-from pathlib import Path
+from services.cache import MISS, TieredCache
+from services.collection_index import UNKNOWN, CollectionIndex
+from services.deadline import current_deadline, missed as deadline_missed, no_deadline
+from services.extract import COLLECTION, MOVIE_BUNDLE, RESULTS_PAGE, read_json
+from services.images import ImageCache
+from services.metrics import Counter, Gauge, Histogram, current_trace, phase
+from services.ranking import rank_movies
+from services.rec_matrix import RecMatrix
+from services.rec_sessions import RecommendationSession, SessionStore
+from services.search_index import SearchIndex
+from services.settings import settings
+from services.typeahead import TypeaheadCache
+from services.upstream import UpstreamScheduler, UpstreamUnavailable
 
-# Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(BASE_DIR / ".env")
+# Configuration comes from services/settings.py (environment and backend/.env)
+TMDB_API_KEY = settings.tmdb_api_key
+# Overridable so the service can be pointed at a local fake TMDB server
+BASE_URL = settings.tmdb_base_url
 
-TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-BASE_URL = "https://api.themoviedb.org/3"
+logger = logging.getLogger(__name__)
 
-async def search_movies(query: str):
-    if not TMDB_API_KEY:
-        return []
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{BASE_URL}/search/movie",
-            params={"api_key": TMDB_API_KEY, "query": query, "language": "tr-TR"}
-        )
-        return response.json().get("results", [])
-
-async def get_collection_details(client: httpx.AsyncClient, collection_id: int):
-    response = await client.get(
-        f"{BASE_URL}/collection/{collection_id}",
-        params={"api_key": TMDB_API_KEY, "language": "tr-TR"}
+# Connection pool / timeout settings for the shared TMDB client.
+# All of them can be overridden from the environment (.env).
+TMDB_MAX_CONNECTIONS = settings.tmdb_max_connections
+TMDB_MAX_KEEPALIVE_CONNECTIONS = settings.tmdb_max_keepalive_connections
+TMDB_KEEPALIVE_EXPIRY = settings.tmdb_keepalive_expiry
+TMDB_HTTP2 = settings.tmdb_http2
+TMDB_CONNECT_TIMEOUT = settings.tmdb_connect_timeout
+TMDB_READ_TIMEOUT = settings.tmdb_read_timeout
+TMDB_WRITE_TIMEOUT = settings.tmdb_write_timeout
+TMDB_POOL_TIMEOUT = settings.tmdb_pool_timeout
+
+# Upper bound on concurrent upstream calls a single multi-movie request may make
+TMDB_FANOUT_CONCURRENCY = settings.tmdb_fanout_concurrency
+
+LANGUAGE = "tr-TR"
+
+# Everything we need about one movie comes back from a single /movie/{id} request
+MOVIE_APPEND = "credits,recommendations"
+DETAILS_PARAMS = {"language": LANGUAGE, "append_to_response": MOVIE_APPEND}
+
+# How long (seconds) each kind of TMDB payload stays cached, based on how often it changes
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+CACHE_TTLS = {
+    "movie": DAY,  # details with credits and recommendations appended
+    "collection": 7 * DAY,
+    "discover": 6 * HOUR,
+    "trending": 3 * HOUR,
+    "search": 10 * MINUTE,
+}
+
+# What we keep of each kind of payload (see services/extract.py). Bodies are parsed
+# as they download and only these fields are built, cached and handed to callers;
+# a details bundle keeps the first five cast members and the directors of its credits.
+PAYLOAD_SPECS = {
+    "movie": MOVIE_BUNDLE,
+    "collection": COLLECTION,
+    "discover": RESULTS_PAGE,
+    "trending": RESULTS_PAGE,
+    "search": RESULTS_PAGE,
+}
+
+TMDB_CACHE_ENABLED = settings.tmdb_cache_enabled
+TMDB_CACHE_PATH = settings.tmdb_cache_path
+
+response_cache = TieredCache(
+    TMDB_CACHE_PATH,
+    max_memory_entries=settings.tmdb_cache_memory_entries,
+    max_memory_bytes=settings.tmdb_cache_memory_mb * 1024 * 1024,
+    max_disk_bytes=settings.tmdb_cache_disk_mb * 1024 * 1024,
+)
+
+# Local search index built by build_search_index.py (optional: searches go upstream without it)
+SEARCH_INDEX_PATH = settings.search_index_path
+search_index = SearchIndex(SEARCH_INDEX_PATH)
+
+# Precomputed item-to-item recommendation matrix built by build_rec_matrix.py (optional)
+REC_MATRIX_PATH = settings.rec_matrix_path
+rec_matrix = RecMatrix(REC_MATRIX_PATH)
+
+# Movie -> collection index for sequel groups (filled as we go, or by build_collection_index.py);
+# entries older than the collection TTL are served and refreshed in the background
+COLLECTION_INDEX_PATH = settings.collection_index_path
+collection_index = CollectionIndex(COLLECTION_INDEX_PATH, max_age=CACHE_TTLS["collection"])
+
+# Poster/backdrop proxy cache (served under /api/images)
+TMDB_IMAGE_BASE_URL = settings.tmdb_image_base_url
+IMAGE_CACHE_DIR = settings.image_cache_dir
+image_cache = ImageCache(IMAGE_CACHE_DIR, TMDB_IMAGE_BASE_URL, max_bytes=settings.image_cache_mb * 1024 * 1024)
+
+# Most recommendations a multi-movie query returns
+RECOMMENDATION_TOP_K = settings.recommendation_top_k
+
+# Weights of the recommendation score (see services/ranking.py), e.g. RANK_WEIGHT_POPULARITY=0.3
+RANKING_WEIGHTS = settings.rank_weights
+
+# Recommendation sessions: the aggregated state of recent selections, so adding or
+# removing one movie only costs that movie's work (see services/rec_sessions.py)
+rec_sessions = SessionStore(
+    max_sessions=settings.rec_session_max,
+    ttl=settings.rec_session_ttl,
+    max_entries=settings.rec_session_max_entries,
+)
+
+# Paging: TMDB serves 20 results per page and refuses anything past page 500.
+# A page of ours may need several upstream pages (duplicates are dropped when merging);
+# the ones still missing are fetched in parallel, and the next TMDB_PAGE_PREFETCH pages
+# are pulled into the cache in the background so the following page is instant
+# (not for pages that are themselves speculative, see speculate()).
+TMDB_PAGE_SIZE = 20
+TMDB_MAX_PAGES = 500
+TMDB_PAGE_PREFETCH = settings.tmdb_page_prefetch
+
+# Local search hits are ranked within this many best matches, so pages stay stable
+LOCAL_SEARCH_MAX_RESULTS = 100
+# What a search result card shows besides the title. Index entries of movies whose
+# details weren't cached at build time have none of them (nor a localized title):
+# they're filled in from details cached since, and while any hit of a query still
+# lacks them the query is answered by TMDB instead (it would render as blank cards)
+LOCAL_DISPLAY_FIELDS = ("poster_path", "release_date", "vote_average")
+
+# Search-as-you-type: suggestions per keystroke, and the recent query -> results sets
+# that longer queries are refined from (same lifetime as cached search responses)
+TYPEAHEAD_LIMIT = 10
+typeahead_cache = TypeaheadCache(
+    max_entries=settings.typeahead_cache_entries,
+    ttl=CACHE_TTLS["search"],
+    min_results=TYPEAHEAD_LIMIT,
+)
+
+# Serve the last good (expired) payload when TMDB is unavailable instead of failing
+TMDB_SERVE_STALE = settings.tmdb_serve_stale
+
+# Every upstream call goes through this: rate limiting (TMDB allows roughly 40-50
+# requests/second per client), Retry-After handling, retries and a circuit breaker.
+upstream = UpstreamScheduler(
+    rate=settings.tmdb_rate_limit,
+    burst=settings.tmdb_rate_burst,
+    max_retries=settings.tmdb_max_retries,
+    failure_threshold=settings.tmdb_breaker_threshold,
+    reset_timeout=settings.tmdb_breaker_reset,
+)
+
+# Metrics (see /metrics). Upstream endpoints are labelled by their cache kind:
+# movie (details bundle), collection (sequels), discover, trending, search.
+UPSTREAM_LATENCY = Histogram(
+    "tmdb_upstream_request_duration_seconds",
+    "Time to get an answer from TMDB, retries and rate limiting included",
+    ("endpoint",),
+)
+UPSTREAM_RESPONSES = Counter(
+    "tmdb_upstream_responses_total",
+    "TMDB answers by status code (\"unavailable\" when retries ran out or the breaker was open)",
+    ("endpoint", "status"),
+)
+Counter(
+    "tmdb_cache_lookups_total",
+    "Response cache lookups by outcome",
+    ("result",),
+    function=lambda: {(name,): response_cache.stats[name] for name in ("memory_hits", "disk_hits", "misses", "stale_hits")},
+)
+TYPEAHEAD_ANSWERS = Counter(
+    "tmdb_typeahead_answers_total",
+    "Typeahead requests by where the answer came from (superseded ones got none)",
+    ("source",),
+)
+Gauge("tmdb_cache_hit_ratio", "Share of response cache lookups answered from memory or disk",
+      function=lambda: {(): response_cache.hit_ratio()})
+Gauge("tmdb_upstream_in_flight", "Distinct TMDB requests currently in flight (after single-flight coalescing)",
+      function=lambda: {(): len(_in_flight)})
+Gauge("tmdb_circuit_breaker_state", "1 for the current state of the TMDB circuit breaker", ("state",),
+      function=lambda: {(state,): int(upstream.breaker.state == state) for state in ("closed", "open", "half_open")})
+
+
+def create_tmdb_client() -> httpx.AsyncClient:
+    """
+    Create the long-lived, pooled client used for all TMDB traffic.
+    The caller owns it and must close it (main.py does this in the app lifespan).
+    """
+    http2 = TMDB_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        # HTTP/2 needs the optional 'h2' package (pip install httpx[http2])
+        logger.warning("TMDB_HTTP2 is enabled but 'h2' is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=TMDB_MAX_CONNECTIONS,
+            max_keepalive_connections=TMDB_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=TMDB_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=TMDB_CONNECT_TIMEOUT,
+            read=TMDB_READ_TIMEOUT,
+            write=TMDB_WRITE_TIMEOUT,
+            pool=TMDB_POOL_TIMEOUT,
+        ),
     )
-    if response.status_code == 200:
-        return response.json()
-    return None
 
-async def get_movie_sequels(client: httpx.AsyncClient, movie_id: int):
-    details = await get_movie_details(client, movie_id)
-    if not details:
+def warmup_steps() -> list[tuple]:
+    """
+    (name, load, required) of everything here that is loaded on first use, for the
+    startup warm-up (see services/startup.py). Without a matrix on disk numpy is
+    only needed once a multi-movie selection is ranked, so readiness doesn't wait for it.
+    """
+    steps = [
+        ("collection_index", lambda: len(collection_index), True),
+        ("search_index", lambda: search_index.available, True),
+        ("rec_matrix", lambda: rec_matrix.available, True),
+        ("numpy", lambda: importlib.import_module("numpy"), False),
+    ]
+    if TMDB_CACHE_ENABLED:
+        steps.insert(0, ("response_cache", response_cache.open, True))
+    return steps
+
+def cache_key(path: str, params: dict) -> str:
+    # api_key is the same for every call; everything else (language included) is part of the key
+    query = "&".join(f"{k}={params[k]}" for k in sorted(params) if k != "api_key")
+    return f"{path}?{query}"
+
+# Upstream requests currently in flight, by cache key. Concurrent callers asking for
+# the same resource share one request instead of each hitting TMDB (single-flight).
+_in_flight: dict[str, asyncio.Task] = {}
+# How many callers are waiting for each of them. When the last one gives up (its
+# deadline passed, its client went away) a request that hasn't been sent yet is
+# cancelled; one already on the wire finishes and fills the cache for the next
+# caller, without retries (see UpstreamScheduler.abandon)
+_waiters: dict[asyncio.Task, int] = {}
+
+# Set while a request is answered from the cache alone (load shedding, see main.py):
+# tmdb_get serves whatever is stored, expired entries included, and never goes upstream
+_cache_only = ContextVar("tmdb_cache_only", default=False)
+
+@contextmanager
+def cache_only():
+    """Service calls inside this block only read the response cache; misses look like 404s."""
+    token = _cache_only.set(True)
+    try:
+        yield
+    finally:
+        _cache_only.reset(token)
+
+async def tmdb_get(client: httpx.AsyncClient, path: str, params: dict, ttl_kind: str, refresh: bool = False):
+    """
+    GET a TMDB endpoint through the response cache (refresh=True skips the cached copy
+    and re-downloads it, e.g. for the background warmer).
+    Returns the decoded JSON on 200 (trimmed to PAYLOAD_SPECS), None for other answers
+    such as 404 (never cached).
+    Raises UpstreamUnavailable when TMDB can't be reached and there is no stale copy to serve.
+    Inside cache_only() it returns the stored copy, however old, or None; so it does once
+    the request's deadline (services/deadline.py) has passed, and marks the request partial.
+    """
+    # Waiting time per kind goes into the request's Server-Timing breakdown
+    with phase(ttl_kind):
+        key = cache_key(path, params)
+        if _cache_only.get():
+            return await _stored(key)
+
+        if TMDB_CACHE_ENABLED and not refresh:
+            cached = await response_cache.aget(key)
+            if cached is not MISS:
+                return cached
+
+            # Breaker is open: don't even queue up, answer from the last good payload if we have one
+            if TMDB_SERVE_STALE and upstream.breaker.is_open():
+                stale = await response_cache.aget_stale(key)
+                if stale is not MISS:
+                    return stale
+
+        budget = current_deadline.get()
+        if budget is not None and budget.expired():
+            budget.missed = True
+            return await _stored(key)
+
+        task = _in_flight.get(key)
+        if task is None:
+            # The shared request doesn't inherit this caller's deadline: it lives as long
+            # as anyone waits for it
+            with no_deadline():
+                task = asyncio.create_task(_fetch_and_cache(client, key, path, params, ttl_kind))
+            task.add_done_callback(_consume_exception)
+            _in_flight[key] = task
+        elif task not in _waiters:
+            upstream.resume(task)
+        _waiters[task] = _waiters.get(task, 0) + 1
+
+        try:
+            # shield: a caller that gets cancelled must not cancel the request for everyone else
+            return await asyncio.wait_for(asyncio.shield(task), budget.remaining() if budget else None)
+        except asyncio.TimeoutError:
+            # Out of time: the last good copy if there is one, else leave it out
+            budget.missed = True
+            return await _stored(key)
+        except UpstreamUnavailable:
+            if TMDB_CACHE_ENABLED and TMDB_SERVE_STALE:
+                stale = await response_cache.aget_stale(key)
+                if stale is not MISS:
+                    return stale
+            raise
+        finally:
+            _stop_waiting(key, task)
+
+def _stop_waiting(key: str, task: asyncio.Task):
+    waiting = _waiters.pop(task) - 1
+    if waiting:
+        _waiters[task] = waiting
+    elif not task.done() and upstream.abandon(task):
+        if _in_flight.get(key) is task:
+            del _in_flight[key]
+
+async def _stored(key: str):
+    # Whatever the cache has for key, expired or not (None if nothing)
+    if not TMDB_CACHE_ENABLED:
         return None
-        
-    collection_info = details.get("belongs_to_collection")
-    if not collection_info:
+    cached = await response_cache.aget(key)
+    if cached is MISS:
+        cached = await response_cache.aget_stale(key)
+    return None if cached is MISS else cached
+
+async def _fetch_and_cache(client: httpx.AsyncClient, key: str, path: str, params: dict, ttl_kind: str):
+    trace = current_trace.get()
+    if trace is not None:
+        trace.upstream_calls += 1
+    started = time.perf_counter()
+    spec = PAYLOAD_SPECS[ttl_kind]
+    try:
+        try:
+            response, data = await upstream.get_parsed(
+                client, f"{BASE_URL}{path}", {"api_key": TMDB_API_KEY, **params}, lambda r: read_json(r, spec)
+            )
+        except UpstreamUnavailable:
+            UPSTREAM_RESPONSES.inc(ttl_kind, "unavailable")
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, ttl_kind)
+        UPSTREAM_RESPONSES.inc(ttl_kind, str(response.status_code))
+
+        if response.status_code != 200:
+            return None
+
+        if TMDB_CACHE_ENABLED:
+            response_cache.set(key, data, CACHE_TTLS[ttl_kind])
+        return data
+    finally:
+        # Drop the entry as soon as we're done so errors are not "cached" for later callers
+        if _in_flight.get(key) is asyncio.current_task():
+            del _in_flight[key]
+
+def _consume_exception(task: asyncio.Task):
+    # Every waiter gets the exception through shield(); this only avoids
+    # "exception was never retrieved" warnings when all of them went away.
+    if not task.cancelled():
+        task.exception()
+
+# Speculative work started on behalf of a request but not awaited by it (held here
+# so the tasks aren't garbage collected half way)
+_background: set[asyncio.Task] = set()
+# Set inside speculative work: it doesn't start more of its own (a speculated page
+# would otherwise prefetch the TMDB pages after it, and so on)
+_speculative = ContextVar("tmdb_speculative", default=False)
+
+def speculate(coro):
+    """Run coro in the background; its result only matters for the cache it warms."""
+    if _cache_only.get() or _speculative.get():
+        # Answering from cache because we're overloaded, or already speculating: no extra work
+        coro.close()
         return None
-        
-    collection_id = collection_info.get("id")
-    collection_details = await get_collection_details(client, collection_id)
-    
+    # Not bound by the request's deadline: the point is to have it cached for the next one
+    token = _speculative.set(True)
+    try:
+        with no_deadline():
+            task = asyncio.create_task(coro)
+    finally:
+        _speculative.reset(token)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    task.add_done_callback(_consume_exception)
+    return task
+
+def _page_params(params: dict, page: int) -> dict:
+    # Page 1 keeps the caller's params as they are, so its cache key doesn't change
+    return {**params, "page": page} if page > 1 else params
+
+async def get_results_page(
+    client: httpx.AsyncClient,
+    path: str,
+    params: dict,
+    ttl_kind: str,
+    offset: int,
+    limit: int,
+    exclude: set[int] = frozenset(),
+):
+    """
+    Results [offset, offset + limit) of a paged TMDB endpoint. Upstream pages are merged
+    in order and movies seen before (or listed in `exclude`) are dropped, so a given
+    offset always maps to the same movies while the pages are cached.
+    Returns (results, has_more).
+    """
+    merged = []
+    seen = set(exclude)
+    wanted = offset + limit
+    next_page, last_page = 1, TMDB_MAX_PAGES
+
+    def fetch(page):
+        return tmdb_get(client, path, _page_params(params, page), ttl_kind)
+
+    while len(merged) < wanted and next_page <= last_page:
+        # All pages still needed in one parallel round (more rounds only if duplicates ate into them)
+        count = -(-(wanted - len(merged)) // TMDB_PAGE_SIZE)
+        pages = range(next_page, min(next_page + count, last_page + 1))
+        for page, data in zip(pages, await gather_bounded(fetch, pages)):
+            if not data:
+                last_page = page - 1
+                break
+            last_page = min(last_page, data.get("total_pages") or 1)
+            for m in data.get("results", []):
+                if m["id"] not in seen:
+                    seen.add(m["id"])
+                    merged.append(m)
+        next_page = pages[-1] + 1 if pages else next_page
+
+    if next_page <= last_page and TMDB_PAGE_PREFETCH > 0:
+        ahead = range(next_page, min(next_page + TMDB_PAGE_PREFETCH, last_page + 1))
+        speculate(gather_bounded(fetch, ahead))
+
+    return merged[offset:wanted], len(merged) > wanted or next_page <= last_page
+
+async def search_movies(client: httpx.AsyncClient, query: str):
+    results, _ = await search_movies_page(client, query, 0, TMDB_PAGE_SIZE)
+    return results
+
+async def _local_hits(query: str, limit: int):
+    """Hits of the local index with their display fields (see LOCAL_DISPLAY_FIELDS), or None."""
+    results = search_index.search(query, limit=limit)
+    if not results:
+        return None
+    hits = []
+    for movie in results:
+        if not any(movie.get(field) for field in LOCAL_DISPLAY_FIELDS):
+            details = MISS
+            if TMDB_CACHE_ENABLED:
+                details = await response_cache.aget(cache_key(f"/movie/{movie['id']}", DETAILS_PARAMS))
+            if details is MISS or not details or not any(details.get(field) for field in LOCAL_DISPLAY_FIELDS):
+                return None
+            fields = ("title", *LOCAL_DISPLAY_FIELDS)
+            movie = {**movie, **{field: details[field] for field in fields if details.get(field)}}
+        hits.append(movie)
+    return hits
+
+async def search_movies_page(client: httpx.AsyncClient, query: str, offset: int, limit: int):
+    # Answer from the local index when we can; TMDB is only asked about queries it doesn't
+    # know, or whose hits in the index lack display fields (see LOCAL_DISPLAY_FIELDS)
+    # (all pages of a query come from the same source, so its cursors stay valid)
+    local_results = await _local_hits(query, LOCAL_SEARCH_MAX_RESULTS)
+    if local_results is not None:
+        return local_results[offset:offset + limit], offset + limit < len(local_results)
+
+    if not TMDB_API_KEY:
+        return [], False
+
+    return await get_results_page(
+        client, "/search/movie", {"query": query, "language": LANGUAGE}, "search", offset, limit
+    )
+
+async def typeahead_local(query: str, limit: int = TYPEAHEAD_LIMIT):
+    """
+    Suggestions that don't need TMDB: from the local index (when its hits have display
+    fields, as for search_movies_page), else refined from the cached results of the
+    longest cached prefix of the query. None when only TMDB can answer.
+    """
+    local_results = await _local_hits(query, limit)
+    if local_results is not None:
+        TYPEAHEAD_ANSWERS.inc("local")
+        return local_results
+
+    cached = typeahead_cache.lookup(query)
+    if cached is not None:
+        TYPEAHEAD_ANSWERS.inc("refined")
+        return cached[:limit]
+    return None
+
+async def typeahead_search(client: httpx.AsyncClient, query: str, limit: int = TYPEAHEAD_LIMIT):
+    """
+    Suggestions for a query that is still being typed: typeahead_local, and only then
+    TMDB (whose results are cached for refining the longer queries that follow).
+    """
+    results = await typeahead_local(query, limit)
+    if results is not None:
+        return results
+
+    if not TMDB_API_KEY:
+        return []
+
+    TYPEAHEAD_ANSWERS.inc("upstream")
+    data = await tmdb_get(client, "/search/movie", {"query": query, "language": LANGUAGE}, "search")
+    if not data:
+        return []
+    results = data.get("results", [])
+    typeahead_cache.put(query, results, complete=(data.get("total_results") or 0) <= len(results))
+    return results[:limit]
+
+async def get_collection_details(client: httpx.AsyncClient, collection_id: int, refresh: bool = False):
+    return await tmdb_get(client, f"/collection/{collection_id}", {"language": LANGUAGE}, "collection", refresh=refresh)
+
+async def get_sequel_group(client: httpx.AsyncClient, collection_id: int):
+    """
+    Sequel group of a collection (see build_sequel_group), from the collection index when
+    it has it; stale entries are served as they are and refreshed in the background.
+    """
+    group = collection_index.group(collection_id)
+    if group is None:
+        return await fetch_sequel_group(client, collection_id)
+    if collection_index.stale(collection_id):
+        speculate(fetch_sequel_group(client, collection_id, refresh=True))
+    return group
+
+async def fetch_sequel_group(client: httpx.AsyncClient, collection_id: int, refresh: bool = False):
+    # Download the collection and (re)index it
+    collection_details = await get_collection_details(client, collection_id, refresh=refresh)
     if not collection_details:
         return None
-        
-    parts = collection_details.get("parts", [])
-    # Sort by release date
-    parts.sort(key=lambda x: x.get("release_date") or "9999-12-31")
+    collection_index.record_collection(build_sequel_group(collection_details))
+    return collection_index.group(collection_id)
+
+async def get_movie_sequels(client: httpx.AsyncClient, movie_id: int, details: dict | None = None):
+    # Callers that already have the movie details (e.g. the recommendation fan-out)
+    # pass them in; otherwise the index answers and /movie/{id} is only downloaded
+    # for movies it hasn't seen yet.
+    collection_id = collection_index.collection_of(movie_id) if details is None else UNKNOWN
+    if collection_id is UNKNOWN:
+        if details is None:
+            details = await get_movie_details(client, movie_id)
+        if not details:
+            return None
+        collection_id = _collection_id(details)
+
+    if collection_id is None:
+        return None
+    return await get_sequel_group(client, collection_id)
+
+def _collection_id(details: dict) -> int | None:
+    collection_info = details.get("belongs_to_collection")
+    return collection_info.get("id") if collection_info else None
+
+def build_sequel_group(collection_details: dict):
+    # Sort by release date (into a new list: the payload may be shared through the cache)
+    parts = sorted(
+        collection_details.get("parts", []),
+        key=lambda x: x.get("release_date") or "9999-12-31"
+    )
     
     # Clean up collection name
     raw_name = collection_details.get("name", "")
@@ -76,97 +586,172 @@ async def get_movie_sequels(client: httpx.AsyncClient, movie_id: int):
     }
 
 async def get_movie_details(client: httpx.AsyncClient, movie_id: int):
-    response = await client.get(
-        f"{BASE_URL}/movie/{movie_id}",
-        params={"api_key": TMDB_API_KEY, "language": "tr-TR"}
+    """
+    /movie/{id} with credits and recommendations folded in (append_to_response), so
+    details, credits and recommendations of a movie cost one upstream request together.
+    The extra "credits" / "recommendations" keys are ignored by callers that don't need them.
+    """
+    details = await tmdb_get(
+        client,
+        f"/movie/{movie_id}",
+        DETAILS_PARAMS,
+        "movie",
     )
-    if response.status_code == 200:
-        return response.json()
-    return None
+    if details:
+        # Keeps the collection index up to date with every movie we see
+        collection_index.record_movie(movie_id, _collection_id(details))
+    return details
+
+def bundled_recommendations(details: dict | None):
+    if not details:
+        return []
+    return (details.get("recommendations") or {}).get("results", [])
 
 async def get_movie_recommendations(client: httpx.AsyncClient, movie_id: int):
     """
-    Get native recommendations from TMDB for a specific movie.
+    Get native recommendations from TMDB for a specific movie (first page, from the details bundle).
+    """
+    return bundled_recommendations(await get_movie_details(client, movie_id))
+
+async def get_recommendation_lists(client: httpx.AsyncClient, movie_ids: list[int], semaphore: asyncio.Semaphore | None = None):
+    """
+    Per-movie recommendation lists (same order as movie_ids): read from the
+    precomputed matrix when it has the movie, fetched live from TMDB otherwise.
     """
-    response = await client.get(
-        f"{BASE_URL}/movie/{movie_id}/recommendations",
-        params={"api_key": TMDB_API_KEY, "language": "tr-TR", "page": 1}
+    async def recommendations_for(movie_id):
+        rows = rec_matrix.rows_for([movie_id])
+        if rows is not None:
+            return rec_matrix.recommendations_for(int(rows[0]))
+        return await get_movie_recommendations(client, movie_id)
+
+    return await gather_bounded(recommendations_for, movie_ids, semaphore)
+
+async def gather_bounded(func, items, semaphore: asyncio.Semaphore | None = None):
+    """
+    Run func(item) for every item concurrently, at most TMDB_FANOUT_CONCURRENCY at a time.
+    Results come back in the same order as `items`, so callers stay deterministic.
+    Pass a shared semaphore to put several fan-outs under one budget.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(TMDB_FANOUT_CONCURRENCY)
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+def rank_recommendations(movie_ids: list[int], rec_lists: list[list[dict]], k: int | None = None):
+    """
+    Merge the per-movie recommendation lists (same order as movie_ids) and return the
+    k best candidates by weighted score: mostly how many of the selected movies
+    recommended them, then rating, votes, popularity and recency (RANKING_WEIGHTS).
+    """
+    seen_ids = set(movie_ids) # Don't recommend the movies themselves
+    
+    # We'll use a dictionary to count how many times a movie is recommended
+    # { movie_id: { 'count': int, 'movie': dict } }
+    rec_counts = {}
+
+    for recs in rec_lists:
+        for rec in recs:
+            rid = rec["id"]
+            if rid in seen_ids:
+                continue
+            
+            if rid not in rec_counts:
+                rec_counts[rid] = {'count': 1, 'movie': rec}
+            else:
+                rec_counts[rid]['count'] += 1
+
+    # Dicts keep insertion order, so the pool is in first-seen order (the final tie-break)
+    return rank_movies(
+        [item['movie'] for item in rec_counts.values()],
+        [item['count'] for item in rec_counts.values()],
+        k,
+        RANKING_WEIGHTS,
     )
-    if response.status_code == 200:
-        return response.json().get("results", [])
-    return []
 
-async def get_recommendations(movie_ids: list[int]):
+def _genre_ids(details: dict | None) -> list[int]:
+    return [g["id"] for g in details["genres"]] if details and "genres" in details else []
+
+def _discover_params(genre_ids):
+    if not genre_ids:
+        return None
+
+    # Sorted so the same selection always produces the same upstream query
+    joined_genres = "|".join(str(gid) for gid in sorted(genre_ids))
+    return {
+        "language": LANGUAGE,
+        "sort_by": "popularity.desc",
+        "with_genres": joined_genres,
+        "page": 1
+    }
+
+async def discover_by_genres(client: httpx.AsyncClient, details_list: list[dict | None]):
+    return await discover_by_genre_ids(client, {gid for details in details_list for gid in _genre_ids(details)})
+
+async def discover_by_genre_ids(client: httpx.AsyncClient, genre_ids):
+    params = _discover_params(genre_ids)
+    if params is None:
+        return []
+
+    data = await tmdb_get(client, "/discover/movie", params, "discover")
+    return data.get("results", []) if data else []
+
+def _append_new(results: list[dict], extra: list[dict], movie_ids: list[int]):
+    # Append the movies of `extra` that aren't in results (or the selection) yet, ranked
+    # among themselves: none of the selected movies recommends them (count 0)
+    existing_ids = set(r['id'] for r in results) | set(movie_ids)
+    extra = [m for m in extra if m['id'] not in existing_ids]
+    results.extend(rank_movies(extra, [0] * len(extra), None, RANKING_WEIGHTS))
+
+async def get_recommendations(
+    client: httpx.AsyncClient,
+    movie_ids: list[int],
+    details_list: list[dict | None] | None = None,
+    rec_lists: list[list[dict]] | None = None,
+):
+    """
+    details_list / rec_lists can be passed in (same order as movie_ids) when the caller
+    already fetched them for this request, so nothing is downloaded twice.
+    """
     if not TMDB_API_KEY or not movie_ids:
         return []
 
-    async with httpx.AsyncClient() as client:
-        # Strategy 1: If only one movie, use TMDB's native recommendations
-        if len(movie_ids) == 1:
-            return await get_movie_recommendations(client, movie_ids[0])
+    # Strategy 1: If only one movie, use TMDB's native recommendations
+    if len(movie_ids) == 1:
+        if rec_lists is None:
+            rec_lists = await get_recommendation_lists(client, movie_ids)
+        return rec_lists[0]
 
-        # Strategy 2: If multiple movies, get recommendations for each and find common ones
-        all_recommendations = []
-        seen_ids = set(movie_ids) # Don't recommend the movies themselves
-        
-        # We'll use a dictionary to count how many times a movie is recommended
-        # { movie_id: { 'count': int, 'movie': dict } }
-        rec_counts = {}
-
-        for mid in movie_ids:
-            recs = await get_movie_recommendations(client, mid)
-            for rec in recs:
-                rid = rec["id"]
-                if rid in seen_ids:
-                    continue
-                
-                if rid not in rec_counts:
-                    rec_counts[rid] = {'count': 1, 'movie': rec}
-                else:
-                    rec_counts[rid]['count'] += 1
-
-        # Sort by count (descending) to prioritize common recommendations
-        sorted_recs = sorted(
-            rec_counts.values(), 
-            key=lambda x: x['count'], 
-            reverse=True
-        )
-        
-        results = [item['movie'] for item in sorted_recs]
-
-        # Strategy 3: Fallback/Supplement with Genre Discovery if we have too few results
-        if len(results) < 5:
-             # 1. Get genres for all selected movies
-            genre_ids = set()
-            for mid in movie_ids:
-                details = await get_movie_details(client, mid)
-                if details and "genres" in details:
-                    for g in details["genres"]:
-                        genre_ids.add(str(g["id"]))
-            
-            if genre_ids:
-                joined_genres = "|".join(genre_ids)
-                response = await client.get(
-                    f"{BASE_URL}/discover/movie",
-                    params={
-                        "api_key": TMDB_API_KEY, 
-                        "language": "tr-TR",
-                        "sort_by": "popularity.desc",
-                        "with_genres": joined_genres,
-                        "page": 1
-                    }
-                )
-                genre_results = response.json().get("results", [])
-                
-                # Append genre results that aren't already in the list
-                existing_ids = set(r['id'] for r in results) | seen_ids
-                for m in genre_results:
-                    if m['id'] not in existing_ids:
-                        results.append(m)
+    # Strategy 2: If multiple movies, get recommendations for each and find common ones.
+    # When the precomputed matrix knows every selected movie this is a single vectorized
+    # row sum with no upstream calls; otherwise the lists are fetched (concurrently).
+    rows = rec_matrix.rows_for(movie_ids) if rec_lists is None else None
+    if rows is not None:
+        with phase("rank"):
+            results = rec_matrix.score(rows, RECOMMENDATION_TOP_K, RANKING_WEIGHTS)
+    else:
+        if rec_lists is None:
+            rec_lists = await get_recommendation_lists(client, movie_ids)
+        with phase("rank"):
+            results = rank_recommendations(movie_ids, rec_lists, RECOMMENDATION_TOP_K)
 
-        return results
+    # Strategy 3: Fallback/Supplement with Genre Discovery if we have too few results
+    if len(results) < 5:
+        # 1. Get genres for all selected movies
+        if details_list is None:
+            details_list = await gather_bounded(lambda mid: get_movie_details(client, mid), movie_ids)
+
+        genre_results = await discover_by_genres(client, details_list)
 
-async def get_recommendations_with_sequels(movie_ids: list[int]):
+        # Append genre results that aren't already in the list
+        _append_new(results, genre_results, movie_ids)
+
+    return results
+
+async def get_recommendations_with_sequels(client: httpx.AsyncClient, movie_ids: list[int]):
     """
     Fetches both sequels (if any) and regular recommendations.
     Returns:
@@ -175,109 +760,396 @@ async def get_recommendations_with_sequels(movie_ids: list[int]):
         "recommendations": [...]
     }
     """
+    # Same work as the streaming version; we just wait for its final result
+    async for event in stream_recommendations_with_sequels(client, movie_ids):
+        if event["type"] == "done":
+            return {"sequels": event["sequels"], "recommendations": event["recommendations"]}
+
+async def get_session_recommendations(client: httpx.AsyncClient, movie_ids: list[int], session_id: str | None = None):
+    """
+    get_recommendations_with_sequels through a recommendation session: the session with
+    this id (or, failing that, one for exactly this selection) is brought up to date
+    with the movies added and removed since, so only the added movies are fetched.
+    When the precomputed matrix covers the selection and the collection index knows a
+    movie's collection, not even its details are: it joins the session bare.
+    Returns (session id to send next time, result).
+    """
+    movie_ids = list(dict.fromkeys(movie_ids))
     if not TMDB_API_KEY or not movie_ids:
-        return {"sequels": [], "recommendations": []}
+        return None, {"sequels": [], "recommendations": []}
 
-    async with httpx.AsyncClient() as client:
-        # 1. Fetch sequels for each movie
-        sequels_list = []
-        seen_collection_ids = set()
-        
-        for mid in movie_ids:
-            sequel_data = await get_movie_sequels(client, mid)
-            if sequel_data:
-                cid = sequel_data["id"]
-                if cid not in seen_collection_ids:
-                    seen_collection_ids.add(cid)
-                    sequels_list.append({
-                        "id": cid,
-                        "title": sequel_data["name"],
-                        "movies": sequel_data["parts"]
-                    })
-        
-        # 2. Get regular recommendations (reusing existing logic)
-        # We can call the existing function, but we need to pass a client or refactor.
-        # Since get_recommendations creates its own client, we'll just call it.
-        # Optimization: Refactor get_recommendations to accept an optional client? 
-        # For now, calling it directly is fine, it just creates another connection.
-        
-        recommendations = await get_recommendations(movie_ids)
-        
-        # Filter out movies that are already in sequels
-        sequel_movie_ids = set()
-        for group in sequels_list:
-            for m in group["movies"]:
-                sequel_movie_ids.add(m["id"])
-                
-        filtered_recommendations = [
-            m for m in recommendations 
-            if m["id"] not in sequel_movie_ids
-        ]
-        
-        return {
-            "sequels": sequels_list,
-            "recommendations": filtered_recommendations
-        }
+    use_matrix = rec_matrix.rows_for(movie_ids) is not None
+    session = rec_sessions.get(session_id) or rec_sessions.find(movie_ids) or RecommendationSession()
+    async with session.lock:
+        wanted = set(movie_ids)
+        for mid in [mid for mid in session.movies if mid not in wanted]:
+            session.remove(mid)
+        added = [mid for mid in movie_ids if mid not in session.movies]
+        bare = [mid for mid in added if use_matrix and collection_index.collection_of(mid) is not UNKNOWN]
+        for mid in bare:
+            session.add(mid, None, None, collection_index.collection_of(mid))
+        # Without the matrix the ranking needs every movie's list, bare ones' included
+        fetch = [mid for mid in added if mid not in bare] + ([] if use_matrix else session.bare(movie_ids))
 
-async def get_movie_credits(client: httpx.AsyncClient, movie_id: int):
-    response = await client.get(
-        f"{BASE_URL}/movie/{movie_id}/credits",
-        params={"api_key": TMDB_API_KEY, "language": "tr-TR"}
+        async def sequel_group(cid):
+            return await get_sequel_group(client, cid) if cid is not None and cid not in session.groups else None
+
+        async def fetch_details(mid):
+            # The movie's sequel group is looked up as soon as its collection is known (at
+            # once if the index knows it, else when the details are in), so a slow movie
+            # doesn't hold the others' groups past the deadline
+            cid = collection_index.collection_of(mid)
+            if cid is not UNKNOWN:
+                return await asyncio.gather(get_movie_details(client, mid), sequel_group(cid))
+            details = await get_movie_details(client, mid)
+            return details, await sequel_group(_collection_id(details) if details else None)
+
+        for mid, (details, group) in zip(fetch, await gather_bounded(fetch_details, fetch)):
+            _add_to_session(session, mid, details)
+            if group:
+                session.groups[group["id"]] = group
+        await _load_session_groups(client, session)
+
+        result = await _session_result(client, session, movie_ids)
+        rec_sessions.put(session)
+    return session.id, result
+
+def _add_to_session(session: RecommendationSession, movie_id: int, details: dict | None):
+    if details is None and deadline_missed():
+        # Probably just late, not missing: left out (or left bare), so the next request
+        # fetches it again
+        return
+    if details:
+        collection_id = _collection_id(details)
+    else:
+        collection_id = collection_index.collection_of(movie_id)
+        collection_id = None if collection_id is UNKNOWN else collection_id
+    session.add(movie_id, bundled_recommendations(details), _genre_ids(details), collection_id)
+
+async def _load_session_groups(client: httpx.AsyncClient, session: RecommendationSession):
+    missing = {cid for _, _, cid in session.movies.values() if cid is not None and cid not in session.groups}
+    for cid, group in zip(missing, await gather_bounded(lambda cid: get_sequel_group(client, cid), missing)):
+        if group:
+            session.groups[cid] = group
+
+async def _session_result(client: httpx.AsyncClient, session: RecommendationSession, movie_ids: list[int]):
+    # Same strategies as get_recommendations, on the session's aggregates
+    rows = rec_matrix.rows_for(movie_ids)
+    with phase("rank"):
+        if rows is not None and len(movie_ids) == 1:
+            results = rec_matrix.recommendations_for(int(rows[0]))
+        elif rows is not None:
+            results = rec_matrix.score(rows, RECOMMENDATION_TOP_K, RANKING_WEIGHTS)
+        elif len(movie_ids) == 1:
+            results = (session.movies[movie_ids[0]][0] or []) if movie_ids[0] in session.movies else []
+        else:
+            candidates, counts = session.candidates(movie_ids)
+            results = rank_movies(candidates, counts, RECOMMENDATION_TOP_K, RANKING_WEIGHTS)
+
+    if len(movie_ids) > 1 and len(results) < 5:
+        # The genre fallback is the one thing bare movies need their details for
+        bare = session.bare(movie_ids)
+        for mid, details in zip(bare, await gather_bounded(lambda mid: get_movie_details(client, mid), bare)):
+            if details:
+                session.add(mid, bundled_recommendations(details), _genre_ids(details), session.movies[mid][2])
+        _append_new(results, await discover_by_genre_ids(client, set(session.genres)), movie_ids)
+
+    sequels_list = []
+    seen_collection_ids = set()
+    for cid in session.collection_ids(movie_ids):
+        group = session.groups.get(cid)
+        if not group or cid in seen_collection_ids:
+            continue
+        seen_collection_ids.add(cid)
+        sequels_list.append(_sequel_entry(group))
+
+    return {"sequels": sequels_list, "recommendations": _without_sequel_movies(results, sequels_list)}
+
+async def get_recommendations_page(
+    client: httpx.AsyncClient, movie_ids: list[int], offset: int, limit: int, session_id: str | None = None
+):
+    """
+    Recommendations [offset, offset + limit) past the first page. The list continues
+    after the ranked recommendations with genre discovery for the whole selection
+    (deduped against everything before it). Returns (results, has_more).
+    """
+    _, data = await get_session_recommendations(client, movie_ids, session_id)
+    ranked = data["recommendations"]
+    page = ranked[offset:offset + limit]
+    if offset + limit < len(ranked) or not TMDB_API_KEY:
+        return page, offset + limit < len(ranked)
+
+    details_list = await gather_bounded(lambda mid: get_movie_details(client, mid), movie_ids)
+    params = _discover_params({gid for details in details_list for gid in _genre_ids(details)})
+    if params is None:
+        return page, False
+
+    exclude = set(movie_ids) | {m["id"] for m in ranked}
+    exclude |= {m["id"] for group in data["sequels"] for m in group["movies"]}
+    more, has_more = await get_results_page(
+        client, "/discover/movie", params, "discover",
+        max(0, offset - len(ranked)), limit - len(page), exclude,
     )
-    if response.status_code == 200:
-        return response.json()
-    return None
+    return page + more, has_more
+
+def recommendations_continue(movie_ids: list[int], data: dict, offset: int, limit: int):
+    """
+    (has_more, prefetch) for the page of `limit` recommendations at `offset` of `data`,
+    what get_session_recommendations returned for the selection: the list goes on with
+    the rest of the ranking, then with genre discovery when the selection has genres
+    (see get_recommendations_page). `prefetch` says whether getting that page going
+    early is worth it: only discovery costs upstream calls, and it's a single
+    /discover/movie call only when the session knows every selected movie's genres.
+    """
+    ranked = len(data["recommendations"])
+    if offset + limit < ranked or not TMDB_API_KEY or not movie_ids:
+        return offset < ranked, False
+    session = rec_sessions.find(movie_ids)
+    if session is None or session.bare(movie_ids):
+        return True, False  # genres unknown: the page itself tells
+    return offset < ranked or bool(session.genres), bool(session.genres)
+
+def _sequel_entry(group: dict):
+    return {
+        "id": group["id"],
+        "title": group["name"],
+        "movies": group["parts"]
+    }
+
+def _without_sequel_movies(recommendations: list[dict], sequels_list: list[dict]):
+    # Filter out movies that are already in sequels
+    sequel_movie_ids = set()
+    for group in sequels_list:
+        for m in group["movies"]:
+            sequel_movie_ids.add(m["id"])
+
+    return [
+        m for m in recommendations
+        if m["id"] not in sequel_movie_ids
+    ]
+
+async def stream_session_recommendations(client: httpx.AsyncClient, movie_ids: list[int], session_id: str | None = None):
+    """
+    stream_recommendations_with_sequels through a recommendation session. When there is
+    one to update (see get_session_recommendations) only the delta is fetched, and the
+    result comes right away as "sequel" events and "done"; otherwise the full stream
+    runs and fills a new session. "done" carries the session id to send next time.
+    """
+    if rec_sessions.get(session_id) or rec_sessions.find(movie_ids):
+        session_id, data = await get_session_recommendations(client, movie_ids, session_id)
+        for group in data["sequels"]:
+            yield {"type": "sequel", "group": group}
+        yield {"type": "done", "session": session_id, **data}
+        return
+
+    async for event in stream_recommendations_with_sequels(client, movie_ids, RecommendationSession()):
+        yield event
+
+async def stream_recommendations_with_sequels(
+    client: httpx.AsyncClient, movie_ids: list[int], session: RecommendationSession | None = None
+):
+    """
+    Async generator version of get_recommendations_with_sequels that reports progress
+    as upstream calls finish:
+
+        {"type": "sequel", "group": {...}}                 a collection resolved
+        {"type": "recommendations", "recommendations": [...]}  ranking so far, after each movie
+        {"type": "done", "sequels": [...], "recommendations": [...]}  final result
+
+    The "done" event is exactly what get_recommendations_with_sequels returns (plus the
+    id of `session`, which is filled with the selection and stored, when one is given).
+    Closing the generator early cancels the upstream calls not sent yet (those on the
+    wire finish in the background and fill the cache).
+    """
+    if not TMDB_API_KEY or not movie_ids:
+        yield {"type": "done", "sequels": [], "recommendations": []}
+        return
+
+    # One budget for every upstream call this request makes
+    semaphore = asyncio.Semaphore(TMDB_FANOUT_CONCURRENCY)
+
+    async def bounded(func, *args):
+        async with semaphore:
+            return await func(*args)
+
+    # One request per movie brings its details (needed for collections and the genre
+    # fallback) together with its recommendation list. If the precomputed matrix covers
+    # the whole selection, get_recommendations scores it from there instead, and the
+    # movies whose collection the index knows aren't fetched at all (the genre
+    # fallback fetches their details itself, if it runs).
+    use_matrix = rec_matrix.rows_for(movie_ids) is not None
+    details_list = [None] * len(movie_ids)
+    rec_lists = [[] for _ in movie_ids]
+    # Collection of every movie: the index's answer until the movie's details say otherwise
+    movie_collections = [collection_index.collection_of(mid) for mid in movie_ids]
+    fetched = [i for i, cid in enumerate(movie_collections) if not use_matrix or cid is UNKNOWN]
+    collections = {}  # collection id -> sequel group (None while loading or missing)
+    sequels_so_far = []
+
+    # Sequel groups the index already has go out before anything is fetched
+    for cid in movie_collections:
+        if cid is UNKNOWN or cid is None or cid in collections or collection_index.group(cid) is None:
+            continue
+        collections[cid] = await get_sequel_group(client, cid)
+        entry = _sequel_entry(collections[cid])
+        sequels_so_far.append(entry)
+        yield {"type": "sequel", "group": entry}
+
+    if use_matrix:
+        yield {"type": "recommendations", "recommendations": rec_matrix.score(
+            rec_matrix.rows_for(movie_ids), RECOMMENDATION_TOP_K, RANKING_WEIGHTS
+        )}
+
+    def rank():
+        return asyncio.create_task(get_recommendations(
+            client, movie_ids,
+            details_list=details_list if len(fetched) == len(movie_ids) else None,
+            rec_lists=None if use_matrix else rec_lists,
+        ))
+
+    # task -> (kind, index or collection id)
+    pending = {asyncio.create_task(bounded(get_movie_details, client, movie_ids[i])): ("movie", i) for i in fetched}
+    # The other collections the index knows load right away, not after the movie's details
+    for cid in movie_collections:
+        if cid is not UNKNOWN and cid is not None and cid not in collections:
+            collections[cid] = None
+            pending[asyncio.create_task(bounded(get_sequel_group, client, cid))] = ("collection", cid)
+    movies_left = len(fetched)
+    final_task = None
+    if movies_left == 0:
+        final_task = rank()
+        pending[final_task] = ("final", 0)
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Handle finished tasks in a fixed order so the events don't depend on timing ties
+            for task in sorted(done, key=lambda t: (pending[t][0], pending[t][1])):
+                kind, ref = pending.pop(task)
+                result = task.result()
 
-async def get_full_movie_details(movie_id: int):
+                if kind == "movie":
+                    details_list[ref] = result
+                    movies_left -= 1
+
+                    if result:
+                        movie_collections[ref] = _collection_id(result)
+                    cid = movie_collections[ref]
+                    if cid is not UNKNOWN and cid is not None and cid not in collections:
+                        collections[cid] = None
+                        pending[asyncio.create_task(bounded(get_sequel_group, client, cid))] = ("collection", cid)
+
+                    if not use_matrix:
+                        rec_lists[ref] = bundled_recommendations(result)
+                        with phase("rank"):
+                            ranked = rank_recommendations(movie_ids, rec_lists, RECOMMENDATION_TOP_K)
+                        yield {"type": "recommendations", "recommendations": _without_sequel_movies(ranked, sequels_so_far)}
+
+                    if movies_left == 0:
+                        # Everything the ranking (and its genre fallback) needs is here;
+                        # let it run alongside the collections that are still loading.
+                        final_task = rank()
+                        pending[final_task] = ("final", 0)
+
+                elif kind == "collection":
+                    collections[ref] = result
+                    if result:
+                        entry = _sequel_entry(result)
+                        sequels_so_far.append(entry)
+                        yield {"type": "sequel", "group": entry}
+    finally:
+        for task in pending:
+            task.cancel()
+
+    # Sequel groups in the order the movies were selected (not the order they arrived in),
+    # each collection once
+    sequels_list = []
+    seen_collection_ids = set()
+    for cid in movie_collections:
+        group = collections.get(cid)
+        if not group or cid in seen_collection_ids:
+            continue
+        seen_collection_ids.add(cid)
+        sequels_list.append(_sequel_entry(group))
+
+    done = {
+        "type": "done",
+        "sequels": sequels_list,
+        "recommendations": _without_sequel_movies(final_task.result(), sequels_list),
+    }
+    if session is not None:
+        async with session.lock:
+            for i, (mid, details) in enumerate(zip(movie_ids, details_list)):
+                if i in fetched:
+                    _add_to_session(session, mid, details)
+                else:
+                    session.add(mid, None, None, movie_collections[i])
+            session.groups.update((cid, group) for cid, group in collections.items() if group)
+            rec_sessions.put(session)
+        done["session"] = session.id
+    yield done
+
+async def get_movie_credits(client: httpx.AsyncClient, movie_id: int):
+    # Trimmed like the rest of the bundle: the first five cast members and the directors
+    details = await get_movie_details(client, movie_id)
+    return details.get("credits") if details else None
+
+async def get_full_movie_details(client: httpx.AsyncClient, movie_id: int):
     if not TMDB_API_KEY:
         return None
 
-    # Use a single client for concurrent requests if needed, but sequential is fine for a single detail view
-    async with httpx.AsyncClient() as client:
-        details_resp = await get_movie_details(client, movie_id)
-        credits_resp = await get_movie_credits(client, movie_id)
-
-        if not details_resp:
-            return None
+    # Credits come folded into the details response, no second request
+    details_resp = await get_movie_details(client, movie_id)
+    if not details_resp:
+        return None
+    credits_resp = details_resp.get("credits")
 
-        # Process data
-        director = "Bilinmiyor"
-        cast = []
+    # Process data
+    director = "Bilinmiyor"
+    cast = []
+    
+    if credits_resp:
+        # Find director
+        crew = credits_resp.get("crew", [])
+        directors = [member["name"] for member in crew if member.get("job") == "Director"]
+        if directors:
+            director = ", ".join(directors)
         
-        if credits_resp:
-            # Find director
-            crew = credits_resp.get("crew", [])
-            directors = [member["name"] for member in crew if member.get("job") == "Director"]
-            if directors:
-                director = ", ".join(directors)
-            
-            # Get top 5 cast
-            cast_members = credits_resp.get("cast", [])
-            cast = [member["name"] for member in cast_members[:5]]
-
-        return {
-            "id": details_resp.get("id"),
-            "title": details_resp.get("title"),
-            "poster_path": details_resp.get("poster_path"),
-            "backdrop_path": details_resp.get("backdrop_path"),
-            "overview": details_resp.get("overview"),
-            "release_date": details_resp.get("release_date"),
-            "runtime": details_resp.get("runtime"), # in minutes
-            "vote_average": details_resp.get("vote_average"),
-            "genres": [g["name"] for g in details_resp.get("genres", [])],
-            "director": director,
-            "cast": cast
-        }
-
-async def get_weekly_trends():
+        # Get top 5 cast
+        cast_members = credits_resp.get("cast", [])
+        cast = [member["name"] for member in cast_members[:5]]
+
+    return {
+        "id": details_resp.get("id"),
+        "title": details_resp.get("title"),
+        "poster_path": details_resp.get("poster_path"),
+        "backdrop_path": details_resp.get("backdrop_path"),
+        "overview": details_resp.get("overview"),
+        "release_date": details_resp.get("release_date"),
+        "runtime": details_resp.get("runtime"), # in minutes
+        "vote_average": details_resp.get("vote_average"),
+        "genres": [g["name"] for g in details_resp.get("genres", [])],
+        "director": director,
+        "cast": cast
+    }
+
+async def get_weekly_trends(client: httpx.AsyncClient, refresh: bool = False):
     if not TMDB_API_KEY:
         return []
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{BASE_URL}/trending/movie/week",
-            params={"api_key": TMDB_API_KEY, "language": "tr-TR"}
-        )
-        if response.status_code == 200:
-            return response.json().get("results", [])
-        return []
+    data = await tmdb_get(client, "/trending/movie/week", {"language": LANGUAGE}, "trending", refresh=refresh)
+    return data.get("results", []) if data else []
+
+async def get_weekly_trends_page(client: httpx.AsyncClient, offset: int, limit: int):
+    if not TMDB_API_KEY:
+        return [], False
+
+    return await get_results_page(client, "/trending/movie/week", {"language": LANGUAGE}, "trending", offset, limit)
+
+async def get_full_movie_details_batch(client: httpx.AsyncClient, movie_ids: list[int]):
+    """
+    get_full_movie_details for many movies at once: duplicates are dropped,
+    the rest fetched concurrently. Missing movies are left out; order follows movie_ids.
+    """
+    unique_ids = list(dict.fromkeys(movie_ids))
+    results = await gather_bounded(lambda mid: get_full_movie_details(client, mid), unique_ids)
+    return [details for details in results if details]
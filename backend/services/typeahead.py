@@ -0,0 +1,109 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from services.search_index import fold
+
+
+def _rank(movie: dict, q: str):
+    """None if the movie doesn't match q, else its group: title starts with q, a word does, anything else."""
+    best = None
+    for name in (movie.get("title"), movie.get("original_title")):
+        if not name:
+            continue
+        folded = fold(name)
+        if folded.startswith(q):
+            return 0
+        if (" " + q) in folded:
+            best = 1
+        elif q in folded and best is None:
+            best = 2
+    return best
+
+
+def refine(results: list[dict], query: str) -> list[dict]:
+    """
+    The movies of `results` whose title (localized or original) contains `query`,
+    titles starting with it first, then word prefixes, then the rest; upstream
+    order is kept inside each group.
+    """
+    q = fold(query)
+    ranked = []
+    for position, movie in enumerate(results):
+        rank = _rank(movie, q)
+        if rank is not None:
+            ranked.append((rank, position, movie))
+    ranked.sort(key=lambda item: item[:2])
+    return [movie for _, _, movie in ranked]
+
+
+class TypeaheadCache:
+    """
+    Recent query -> result sets, for search-as-you-type. A longer query is answered by
+    filtering the result set of its longest cached prefix ("matr" from "mat") when
+    that set is fresh and either complete (TMDB had nothing more for the prefix) or
+    still holds at least `min_results` matches after filtering.
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl: float = 600.0, min_query: int = 3, min_results: int = 10):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_query = min_query
+        self.min_results = min_results
+        # folded query -> (stored_at, complete, results)
+        self._entries = OrderedDict()
+
+    def put(self, query: str, results: list[dict], complete: bool):
+        key = fold(query)
+        self._entries[key] = (time.monotonic(), complete, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, query: str) -> list[dict] | None:
+        q = fold(query)
+        now = time.monotonic()
+        for end in range(len(q), self.min_query - 1, -1):
+            entry = self._entries.get(q[:end])
+            if entry is None:
+                continue
+            stored_at, complete, results = entry
+            if now - stored_at > self.ttl:
+                del self._entries[q[:end]]
+                continue
+
+            self._entries.move_to_end(q[:end])
+            refined = results if end == len(q) else refine(results, q)
+            if end == len(q) or complete or len(refined) >= self.min_results:
+                return refined
+            # Longest prefix is too thin to refine from; a shorter one won't be better
+            return None
+        return None
+
+    def clear(self):
+        self._entries.clear()
+
+
+class Debouncer:
+    """
+    Per-session debounce for inbound keystrokes: wait() sleeps `delay` seconds and
+    returns False if a newer call for the same session arrived meanwhile, so a
+    superseded keystroke never takes an upstream slot.
+    """
+
+    def __init__(self, delay: float = 0.15, max_sessions: int = 10000):
+        self.delay = delay
+        self.max_sessions = max_sessions
+        self._latest = OrderedDict()  # session -> generation
+        self._generation = 0
+
+    async def wait(self, session: str) -> bool:
+        self._generation += 1
+        mine = self._generation
+        self._latest[session] = mine
+        self._latest.move_to_end(session)
+        while len(self._latest) > self.max_sessions:
+            self._latest.popitem(last=False)
+
+        await asyncio.sleep(self.delay)
+        return self._latest.get(session) == mine
@@ -0,0 +1,253 @@
+import asyncio
+import email.utils
+import random
+import time
+
+import httpx
+
+
+class UpstreamUnavailable(Exception):
+    """
+    Raised when TMDB can't give us an answer right now: the circuit breaker is open,
+    or the request still failed (429 / 5xx / network error) after all retries.
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` requests per second on average, bursts of up to `capacity`.
+    pause() stops handing out tokens for a while (used when TMDB answers 429).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed requests. While open every call
+    is refused; after `reset_timeout` seconds a single probe is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def is_open(self) -> bool:
+        # True while calls would be refused (used to decide whether to serve stale data)
+        state = self.state
+        return state == "open" or (state == "half_open" and self._probe_in_flight)
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probe_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        # The probe ended without an outcome (its caller went away): let the next call probe
+        self._probe_in_flight = False
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class UpstreamScheduler:
+    """
+    Sends every TMDB GET through a token bucket and a circuit breaker, and retries
+    429 / 5xx / network errors / undecodable bodies with jittered exponential backoff (GETs are idempotent).
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        rate: float = 40.0,
+        burst: float = 40.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 4.0,
+        max_retry_after: float = 10.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self._sending = set()  # tasks with a request on the wire right now
+        self._abandoned = set()  # tasks nobody waits for anymore: no more retries
+
+    def abandon(self, task: asyncio.Task) -> bool:
+        """
+        Nobody waits for the request `task` is making anymore. Unless it's on the wire
+        (its answer is worth caching) it's cancelled, wherever it waits: in the token
+        bucket, or backing off before a retry. One on the wire finishes, but isn't
+        retried. True if it was cancelled.
+        """
+        if task in self._sending:
+            self._abandoned.add(task)
+            return False
+        task.cancel()
+        return True
+
+    def resume(self, task: asyncio.Task):
+        # Someone waits for it again after all
+        self._abandoned.discard(task)
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads the retries of many concurrent requests apart
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def get(self, client: httpx.AsyncClient, url: str, params: dict) -> httpx.Response:
+        response, _ = await self._request(client, url, params, None)
+        return response
+
+    async def get_parsed(self, client: httpx.AsyncClient, url: str, params: dict, parse):
+        """
+        Like get(), but a 200's body is handed to `parse` (an async function of the
+        streamed response) while it downloads; returns (response, what parse returned),
+        None for other answers. A body cut off half way, or one `parse` can't decode
+        (httpx.DecodingError), is retried like any network error.
+        """
+        return await self._request(client, url, params, parse)
+
+    async def _request(self, client: httpx.AsyncClient, url: str, params: dict, parse):
+        probe = self.breaker.state == "half_open"
+        if not self.breaker.allow_request():
+            raise UpstreamUnavailable("TMDB circuit breaker is open", self.breaker.retry_after())
+
+        # Every way out has to settle the breaker, or a half-open probe that never
+        # returns leaves it refusing every call until the process restarts
+        try:
+            return await self._send(client, url, params, parse)
+        except UpstreamUnavailable:
+            raise  # recorded already
+        except asyncio.CancelledError:
+            if probe:
+                self.breaker.release_probe()
+            raise
+        except BaseException:
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._abandoned.discard(asyncio.current_task())
+
+    async def _send(self, client: httpx.AsyncClient, url: str, params: dict, parse):
+        retry_after = None
+        attempt = 0
+        task = asyncio.current_task()
+        while True:
+            await self.bucket.acquire()
+            parsed = None
+            self._sending.add(task)
+            try:
+                if parse is None:
+                    response = await client.get(url, params=params)
+                else:
+                    response = await client.send(client.build_request("GET", url, params=params), stream=True)
+                    try:
+                        if response.status_code == 200:
+                            parsed = await parse(response)
+                        else:
+                            await response.aread()
+                    finally:
+                        await response.aclose()
+            except (httpx.TransportError, httpx.DecodingError) as exc:
+                response = None
+                error = exc
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    # Anything else (200, 404, 401, ...) is an answer, not an outage
+                    self.breaker.record_success()
+                    return response, parsed
+                error = None
+            finally:
+                self._sending.discard(task)
+
+            delay = self._backoff(attempt)
+            if response is not None and response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    # TMDB limits per client, so every request has to back off, not just this one
+                    self.bucket.pause(min(retry_after, self.max_retry_after))
+                    delay = max(delay, retry_after)
+
+            if attempt >= self.max_retries or delay > self.max_retry_after or task in self._abandoned:
+                self.breaker.record_failure()
+                reason = f"HTTP {response.status_code}" if response is not None else repr(error)
+                raise UpstreamUnavailable(f"TMDB request failed: {reason}", retry_after)
+
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -6,7 +6,7 @@ from pathlib import Path
 # Add backend directory to python path
 sys.path.append(str(Path(__file__).resolve().parent))
 
-from services.tmdb_service import get_weekly_trends, search_movies
+from services.tmdb_service import create_tmdb_client, get_weekly_trends, search_movies
 from dotenv import load_dotenv
 
 async def main():
@@ -29,10 +29,14 @@ async def main():
         print("[FAIL] API Key NOT loaded")
         return
 
+    async with create_tmdb_client() as client:
+        await run_checks(client)
+
+async def run_checks(client):
     # Test Trends
     print("\nTesting Weekly Trends...")
     try:
-        trends = await get_weekly_trends()
+        trends = await get_weekly_trends(client)
         if trends:
             print(f"[OK] Success! Found {len(trends)} trending movies.")
             print(f"   Sample: {trends[0].get('title', 'Unknown')}")
@@ -44,7 +48,7 @@ async def main():
     # Test Search
     print("\nTesting Search (Query: 'Matrix')...")
     try:
-        results = await search_movies("Matrix")
+        results = await search_movies(client, "Matrix")
         if results:
             print(f"[OK] Success! Found {len(results)} movies matching 'Matrix'.")
             print(f"   Sample: {results[0].get('title', 'Unknown')}")
@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+
+# The services are imported the way main.py imports them, from the backend directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read once, on first import: point every cache and index at a scratch
+# directory (none of the indexes exist there) and TMDB at a host no test reaches
+_scratch = tempfile.mkdtemp(prefix="tmdb-tests-")
+os.environ.update({
+    "TMDB_API_KEY": "test",
+    "TMDB_BASE_URL": "https://tmdb.test/3",
+    "TMDB_CACHE_PATH": os.path.join(_scratch, "tmdb_cache.sqlite3"),
+    "SEARCH_INDEX_PATH": os.path.join(_scratch, "search_index.bin"),
+    "REC_MATRIX_PATH": os.path.join(_scratch, "rec_matrix"),
+    "COLLECTION_INDEX_PATH": os.path.join(_scratch, "collections.sqlite3"),
+    "IMAGE_CACHE_DIR": os.path.join(_scratch, "images"),
+    "PREFETCH_ENABLED": "false",
+    "WARMUP_ENABLED": "false",
+})
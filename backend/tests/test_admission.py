@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from services.admission import AdmissionController, Overloaded
+
+
+def controller(capacity: int = 4, limit: int = 1, max_queue: int = 1, timeout: float = 0.05) -> AdmissionController:
+    admission = AdmissionController(capacity)
+    admission.add_lane("cheap", 0, limit, max_queue, timeout)
+    admission.add_lane("expensive", 1, limit, max_queue, timeout)
+    return admission
+
+
+def test_full_queue_is_rejected_and_slow_queue_times_out():
+    async def run():
+        admission = controller()
+        await admission.acquire("cheap")
+        waiting = asyncio.create_task(admission.acquire("cheap"))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await admission.acquire("cheap")  # queue full
+        with pytest.raises(Overloaded):
+            await waiting  # waited longer than the lane allows
+        admission.release("cheap")
+        assert admission.active == 0 and not admission.lanes["cheap"].queue
+
+    asyncio.run(run())
+
+
+def test_freed_slot_goes_to_the_most_important_lane():
+    async def run():
+        admission = controller(capacity=1, timeout=1.0)
+        await admission.acquire("expensive")
+        expensive = asyncio.create_task(admission.acquire("expensive"))
+        cheap = asyncio.create_task(admission.acquire("cheap"))
+        await asyncio.sleep(0)
+        admission.release("expensive")
+        await cheap
+        assert not expensive.done()
+        admission.release("cheap")
+        await expensive
+        admission.release("expensive")
+        assert admission.active == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        admission = controller(timeout=1.0)
+        await admission.acquire("cheap")
+        waiting = asyncio.create_task(admission.acquire("cheap"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert not admission.lanes["cheap"].queue
+        admission.release("cheap")
+        assert admission.active == 0
+
+    asyncio.run(run())
@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from services import tmdb_service
+from services.tmdb_service import response_cache
+from services.upstream import UpstreamScheduler
+
+
+def fake_tmdb(calls: list, status: int = 200):
+    async def handler(request):
+        path = request.url.path.removeprefix("/3")
+        calls.append(path)
+        if status != 200:
+            return httpx.Response(status)
+        if path.startswith("/movie/"):
+            mid = int(path.rsplit("/", 1)[1])
+            if mid == 404:
+                return httpx.Response(404)
+            return httpx.Response(200, json={
+                "id": mid, "title": f"Movie {mid}", "genres": [{"id": 28, "name": "Aksiyon"}],
+                "credits": {"cast": [{"name": "Actor"}], "crew": [{"name": "Director", "job": "Director"}]},
+            })
+        return httpx.Response(200, json={"results": [{"id": 1, "title": "Movie 1"}], "total_pages": 1})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://tmdb.test/3")
+
+
+@pytest.fixture(autouse=True)
+def fresh_upstream(monkeypatch):
+    monkeypatch.setattr(tmdb_service, "upstream", UpstreamScheduler(max_retries=0))
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+def call(method: str, url: str, status: int = 200, **kwargs):
+    """(response, upstream paths requested) of one request to the app against a fake TMDB."""
+    async def run():
+        calls = []
+        async with fake_tmdb(calls, status) as tmdb:
+            main.app.state.tmdb_client = tmdb
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+                response = await client.request(method, url, **kwargs)
+        return response, calls
+
+    return asyncio.run(run())
+
+
+def test_batch_fetches_each_movie_once_in_request_order():
+    response, calls = call("POST", "/api/movies/batch", json={"ids": [3, 1, 3, 1, 2]})
+    assert response.status_code == 200
+    assert [movie["id"] for movie in response.json()] == [3, 1, 2]
+    assert sorted(calls) == ["/movie/1", "/movie/2", "/movie/3"]
+    assert response.json()[0]["director"] == "Director"
+
+
+def test_batch_leaves_unknown_movies_out():
+    response, _ = call("POST", "/api/movies/batch", json={"ids": [404, 1]})
+    assert response.status_code == 200
+    assert [movie["id"] for movie in response.json()] == [1]
+
+
+def test_batch_of_nothing_is_empty():
+    response, calls = call("POST", "/api/movies/batch", json={"ids": []})
+    assert response.status_code == 200 and response.json() == [] and calls == []
+
+
+@pytest.mark.parametrize("body", [{"ids": list(range(101))}, {"ids": ["x"]}, {}])
+def test_batch_rejects_bad_bodies(body):
+    response, calls = call("POST", "/api/movies/batch", json=body)
+    assert response.status_code == 422 and calls == []
+
+
+def test_batch_says_when_tmdb_is_down():
+    response, _ = call("POST", "/api/movies/batch", status=503, json={"ids": [1, 2]})
+    assert response.status_code == 503
+    assert response.json() == {"error": "TMDB is temporarily unavailable"}
+
+
+def test_unchanged_response_is_not_modified():
+    first, _ = call("GET", "/api/movies/trends")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('"')
+    assert first.headers["Cache-Control"] == f"public, max-age={main.HTTP_MAX_AGE['trends']}"
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        again, _ = call("GET", "/api/movies/trends", headers={"If-None-Match": if_none_match})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["ETag"] == etag
+
+
+def test_changed_response_is_sent_in_full():
+    first, _ = call("GET", "/api/movies/trends")
+    response, _ = call("GET", "/api/movies/trends", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200 and response.content == first.content
+
+
+def test_etag_depends_on_the_body():
+    full, _ = call("GET", "/api/movies/trends")
+    ids_only, _ = call("GET", "/api/movies/trends", params={"fields": "id"})
+    assert full.headers["ETag"] != ids_only.headers["ETag"]
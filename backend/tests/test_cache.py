@@ -0,0 +1,80 @@
+import asyncio
+import sqlite3
+import time
+
+from services.cache import MISS, TieredCache
+
+
+def rows(path) -> dict:
+    with sqlite3.connect(path) as db:
+        return dict(db.execute("SELECT key, value FROM entries"))
+
+
+def test_expired_entries_are_misses_but_served_stale(tmp_path):
+    cache = TieredCache(tmp_path / "cache.sqlite3")
+    cache.set("movie", {"id": 1}, ttl=0.05)
+    assert cache.get("movie") == {"id": 1}
+    time.sleep(0.06)
+    assert cache.get("movie") is MISS
+    assert cache.get_stale("movie") == {"id": 1}
+    assert cache.get_stale("other") is MISS
+    cache.close()
+
+
+def test_disk_tier_outlives_the_memory_tier_and_the_process(tmp_path):
+    cache = TieredCache(tmp_path / "cache.sqlite3", max_memory_entries=1)
+    cache.set("a", [1], ttl=60)
+    cache.set("b", [2], ttl=60)  # evicts a from memory
+    assert cache.get("a") == [1] and cache.stats["disk_hits"] == 1
+    cache.close()
+
+    reopened = TieredCache(tmp_path / "cache.sqlite3")
+    assert reopened.get("b") == [2]
+    reopened.close()
+
+
+def test_disk_is_trimmed_soonest_expiring_first(tmp_path):
+    cache = TieredCache(tmp_path / "cache.sqlite3", max_disk_bytes=1000)
+    for i in range(20):
+        cache.set(f"k{i}", "x" * 90, ttl=100 + i)  # 92 bytes each
+    assert cache._disk_bytes <= 1000
+    kept = rows(tmp_path / "cache.sqlite3")
+    assert "k19" in kept and "k0" not in kept
+    cache.close()
+
+
+def test_writes_on_the_event_loop_are_batched_in_the_background(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+
+    async def run():
+        cache = TieredCache(path, max_memory_entries=1)
+        for i in range(5):
+            cache.set(f"k{i}", i, ttl=60)
+        assert not path.exists() or rows(path) == {}  # queued, nothing written yet
+        # Evicted from memory and not on disk yet: still found
+        assert await cache.aget("k0") == 0
+        assert await cache.aget_stale("k1") == 1
+        await cache._flushing
+        assert rows(path) == {f"k{i}": str(i) for i in range(5)}
+        cache.set("late", True, ttl=60)
+        return cache
+
+    cache = asyncio.run(run())
+    cache.close()  # writes what's still queued
+    assert rows(path)["late"] == "true"
+
+
+def test_clear_drops_queued_writes(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+
+    async def run():
+        cache = TieredCache(path)
+        cache.open()
+        cache.set("a", 1, ttl=60)
+        cache.clear()
+        await asyncio.sleep(0.05)
+        assert await cache.aget("a") is MISS
+        cache.close()
+
+    asyncio.run(run())
+    assert rows(path) == {}
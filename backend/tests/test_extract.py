@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services.extract import KEEP, MOVIE_BUNDLE, RESULTS_PAGE, Items, project, read_json
+
+MOVIE = {
+    "id": 603, "title": "The Matrix", "poster_path": "/p.jpg", "adult": False, "genres": [{"id": 28, "name": "Action"}],
+    "credits": {
+        "cast": [{"name": f"Actor {i}", "character": "x"} for i in range(8)],
+        "crew": [{"name": "Lana", "job": "Director"}, {"name": "Bill", "job": "Editor"}],
+    },
+    "recommendations": {"page": 1, "total_pages": 3, "results": [{"id": 604, "title": "Reloaded", "video": False}]},
+}
+
+
+def streamed(body: bytes, chunk_size: int = 7) -> httpx.Response:
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    return httpx.Response(200, stream=_Stream(chunks), request=httpx.Request("GET", "https://tmdb.test/3/movie/603"))
+
+
+class _Stream(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def read(body: bytes, spec):
+    return asyncio.run(read_json(streamed(body), spec))
+
+
+def test_streamed_parse_matches_project():
+    body = json.dumps(MOVIE).encode()
+    assert read(body, MOVIE_BUNDLE) == project(MOVIE_BUNDLE, MOVIE)
+
+
+def test_items_limit_and_filter():
+    result = read(json.dumps(MOVIE).encode(), MOVIE_BUNDLE)
+    assert [member["name"] for member in result["credits"]["cast"]] == [f"Actor {i}" for i in range(5)]
+    assert result["credits"]["crew"] == [{"name": "Lana", "job": "Director"}]
+    assert "adult" not in result and result["genres"] == MOVIE["genres"]
+
+
+def test_unexpected_shape_is_kept_as_is():
+    spec = {"results": Items(("id",)), "page": KEEP}
+    document = {"results": {"id": 1}, "page": 2}
+    assert read(json.dumps(document).encode(), spec) == project(spec, document)
+
+
+@pytest.mark.parametrize("body", [b'{"page": 1, "results": [{"id": 1', b"<html>Bad gateway</html>", b"\xff\xfe"])
+def test_invalid_body_raises_decoding_error(body):
+    with pytest.raises(httpx.DecodingError):
+        read(body, RESULTS_PAGE)
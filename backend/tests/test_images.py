@@ -0,0 +1,65 @@
+import asyncio
+import os
+
+import httpx
+
+from services.images import ImageCache, valid_image
+
+
+def tmdb_images(calls: list):
+    def handler(request):
+        calls.append(request.url.path)
+        # Distinct bytes per variant, 1000 of them
+        return httpx.Response(200, content=request.url.path.encode().ljust(1000, b"."),
+                              headers={"content-type": "image/jpeg"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def settle(cache: ImageCache):
+    while cache._trimming is not None:
+        await asyncio.sleep(0.01)
+
+
+def test_blobs_are_listed_only_to_count_and_trim(tmp_path, monkeypatch):
+    async def run():
+        cache = ImageCache(tmp_path, "https://images.test/t/p", max_bytes=5000)
+        scans = []
+        trim_blobs = cache._trim_blobs
+        monkeypatch.setattr(cache, "_trim_blobs", lambda: scans.append(1) or trim_blobs())
+
+        async with tmdb_images([]) as client:
+            for i in range(4):
+                await cache.get(client, "w92", f"p{i}.jpg")
+                await settle(cache)
+            assert len(scans) == 1 and cache._total_bytes == 4000  # counted once, then kept up to date
+
+            for i in range(4, 6):
+                await cache.get(client, "w92", f"p{i}.jpg")
+                await settle(cache)
+        assert len(scans) == 2  # over 5000: trimmed down to 4500
+        assert cache._total_bytes == 4000
+        assert sum(len(files) for _, _, files in os.walk(tmp_path / "blobs")) == 4
+
+    asyncio.run(run())
+
+
+def test_blob_trimmed_after_lookup_is_fetched_again(tmp_path):
+    async def run():
+        cache = ImageCache(tmp_path, "https://images.test/t/p")
+        calls = []
+        async with tmdb_images(calls) as client:
+            digest = await cache.get(client, "w342", "poster.jpg")
+            cache.blob_path(digest, "poster.jpg").unlink()
+            assert await cache.read(digest, "poster.jpg") is None
+            digest = await cache.get(client, "w342", "poster.jpg")
+            assert (await cache.read(digest, "poster.jpg")).startswith(b"/t/p/w342/poster.jpg")
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_only_raster_images_are_proxied():
+    assert valid_image("w342", "kqjL17yufvn9OVLyXYpvtyrFfak.jpg")
+    assert not valid_image("w342", "logo.svg")
+    assert not valid_image("w13", "poster.jpg")
@@ -0,0 +1,29 @@
+import base64
+
+import pytest
+
+from services.pagination import InvalidCursor, cursor_scope, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_within_its_scope():
+    scope = cursor_scope("search", "matrix")
+    assert decode_cursor(encode_cursor(40, scope), scope) == 40
+    assert decode_cursor(None, scope) == 0
+
+
+def test_cursor_of_another_query_is_rejected():
+    cursor = encode_cursor(40, cursor_scope("search", "matrix"))
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, cursor_scope("search", "alien"))
+
+
+@pytest.mark.parametrize("raw", [b"not json", b'{"o": -1, "s": "x"}', b'{"o": "20", "s": "x"}', b'{"s": "x"}', b"[1]"])
+def test_malformed_cursors_are_rejected(raw):
+    cursor = base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "x")
+
+
+def test_garbage_is_rejected():
+    with pytest.raises(InvalidCursor):
+        decode_cursor("%%%", "x")
@@ -0,0 +1,35 @@
+import numpy as np
+
+from services.ranking import DEFAULT_WEIGHTS, rank_movies, top_k
+
+
+def movie(movie_id: int, **fields) -> dict:
+    return {"id": movie_id, **fields}
+
+
+def test_count_decides_and_quality_breaks_ties():
+    movies = [
+        movie(1, vote_average=9.0, vote_count=20000, popularity=900.0, release_date="2024-01-01"),
+        movie(2, vote_average=2.0, vote_count=10, popularity=1.0, release_date="1950-01-01"),
+        movie(3, vote_average=8.0, vote_count=5000, popularity=50.0, release_date="2010-01-01"),
+    ]
+    ranked = rank_movies(movies, [1, 2, 1], None, DEFAULT_WEIGHTS)
+    assert [m["id"] for m in ranked] == [2, 1, 3]
+
+
+def test_equal_scores_keep_first_seen_order():
+    movies = [movie(i) for i in range(6)]
+    assert [m["id"] for m in rank_movies(movies, [1] * 6, 4, DEFAULT_WEIGHTS)] == [0, 1, 2, 3]
+
+
+def test_top_k_matches_a_full_sort():
+    values = np.random.default_rng(7).integers(0, 5, 200).astype(np.float64)
+    full = sorted(range(len(values)), key=lambda i: (-values[i], i))
+    for k in (0, 1, 17, 199, 200, None):
+        assert list(top_k(values, k)) == full[:k if k is not None else None]
+
+
+def test_missing_fields_and_empty_pools():
+    assert rank_movies([], [], 5, DEFAULT_WEIGHTS) == []
+    ranked = rank_movies([movie(1, release_date="n/a"), movie(2, vote_average=None)], [1, 1], None, DEFAULT_WEIGHTS)
+    assert [m["id"] for m in ranked] == [1, 2]
@@ -0,0 +1,47 @@
+import pytest
+
+from services.rec_matrix import RecMatrix, write_matrix
+from services.tmdb_service import RANKING_WEIGHTS, rank_recommendations
+
+MOVIES = {
+    mid: {"id": mid, "title": f"Movie {mid}", "vote_average": 6.0 + mid % 4, "vote_count": 100 * mid}
+    for mid in range(1, 15)
+}
+REC_LISTS = {
+    1: [MOVIES[10], MOVIES[11], MOVIES[2], MOVIES[12]],
+    2: [MOVIES[11], MOVIES[13], MOVIES[1], MOVIES[10]],
+    3: [MOVIES[13], MOVIES[14], MOVIES[10]],
+    4: [],
+}
+
+
+@pytest.fixture(scope="module")
+def matrix(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("matrix")
+    write_matrix(directory, REC_LISTS)
+    return RecMatrix(directory)
+
+
+def ids(movies: list[dict]) -> list[int]:
+    return [m["id"] for m in movies]
+
+
+@pytest.mark.parametrize("selection", [[1, 2], [2, 1], [1, 2, 3], [3, 4], [1, 4, 2]])
+@pytest.mark.parametrize("k", [1, 3, None])
+def test_score_ranks_like_the_live_path(matrix, selection, k):
+    expected = rank_recommendations(selection, [REC_LISTS[mid] for mid in selection], k)
+    assert matrix.score(matrix.rows_for(selection), k, RANKING_WEIGHTS) == expected
+
+
+def test_score_leaves_the_selection_out(matrix):
+    assert not {1, 2} & set(ids(matrix.score(matrix.rows_for([1, 2]), None, RANKING_WEIGHTS)))
+
+
+def test_movies_recommending_nothing_score_nothing(matrix):
+    assert matrix.score(matrix.rows_for([4]), 5, RANKING_WEIGHTS) == []
+
+
+def test_only_harvested_movies_have_rows(matrix):
+    assert matrix.rows_for([1, 10]) is None  # 10 was only ever recommended
+    assert matrix.rows_for([1, 99]) is None
+    assert list(matrix.rows_for([1, 2])) != []
@@ -0,0 +1,222 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import tmdb_service
+from services.collection_index import CollectionIndex
+from services.rec_matrix import RecMatrix, write_matrix
+from services.rec_sessions import RecommendationSession, SessionStore
+from services.tmdb_service import (
+    get_session_recommendations, recommendations_continue, response_cache, stream_recommendations_with_sequels,
+)
+from services.upstream import UpstreamScheduler
+
+GROUP = {"id": 100, "name": "Saga", "parts": [{"id": 1, "title": "Saga"}, {"id": 9, "title": "Saga II"}]}
+
+
+def movie(movie_id: int) -> dict:
+    return {"id": movie_id, "title": f"Movie {movie_id}", "vote_average": 7.0, "vote_count": 100}
+
+
+# Selected movie -> its recommendation list; 10 and 11 are recommended by both
+RECS = {
+    1: [movie(i) for i in (10, 11, 12, 13)],
+    2: [movie(i) for i in (11, 10, 14, 15)],
+    3: [movie(i) for i in (14, 16, 1)],
+    4: [],
+}
+GENRES = {1: [28], 2: [12], 3: [28, 35], 4: [18]}
+COLLECTIONS = {1: 100}
+
+
+def fake_tmdb(calls: list, details_delay: float = 0.0):
+    async def handler(request):
+        path = request.url.path.removeprefix("/3")
+        calls.append(path)
+        kind, key = path.split("/")[1:3]
+        if kind == "movie":
+            mid = int(key)
+            await asyncio.sleep(details_delay)
+            calls.append(f"{path} done")
+            cid = COLLECTIONS.get(mid)
+            return httpx.Response(200, json={
+                **movie(mid),
+                "genres": [{"id": gid} for gid in GENRES[mid]],
+                "belongs_to_collection": {"id": cid} if cid else None,
+                "recommendations": {"results": RECS[mid]},
+            })
+        if kind == "collection":
+            return httpx.Response(200, json={"id": GROUP["id"], "name": GROUP["name"], "parts": GROUP["parts"]})
+        return httpx.Response(200, json={"results": [movie(90), movie(91)], "total_pages": 1})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://tmdb.test/3")
+
+
+@pytest.fixture(autouse=True)
+def world(monkeypatch, tmp_path):
+    write_matrix(tmp_path / "matrix", {1: RECS[1], 2: RECS[2]})
+    index = CollectionIndex(None)
+    monkeypatch.setattr(tmdb_service, "rec_matrix", RecMatrix(tmp_path / "matrix"))
+    monkeypatch.setattr(tmdb_service, "collection_index", index)
+    monkeypatch.setattr(tmdb_service, "rec_sessions", SessionStore())
+    monkeypatch.setattr(tmdb_service, "upstream", UpstreamScheduler(max_retries=0))
+    response_cache.clear()
+    yield index
+    response_cache.clear()
+
+
+def know_collections(index: CollectionIndex):
+    index.record_collection(GROUP)
+    index.record_movie(2, None)
+
+
+def ids(movies: list[dict]) -> list[int]:
+    return [m["id"] for m in movies]
+
+
+def test_matrix_and_collection_index_answer_without_movie_details(world):
+    know_collections(world)
+
+    async def run():
+        calls = []
+        async with fake_tmdb(calls) as client:
+            _, result = await get_session_recommendations(client, [1, 2])
+        assert calls == []
+        assert [group["id"] for group in result["sequels"]] == [100]
+        assert ids(result["recommendations"])[:2] == [10, 11]
+
+    asyncio.run(run())
+
+
+def test_stream_skips_details_the_matrix_and_index_make_unneeded(world):
+    know_collections(world)
+
+    async def run():
+        calls = []
+        async with fake_tmdb(calls) as client:
+            events = [event async for event in stream_recommendations_with_sequels(client, [1, 2])]
+        assert calls == []
+        assert [event["group"]["id"] for event in events if event["type"] == "sequel"] == [100]
+        assert ids(events[-1]["recommendations"])[:2] == [10, 11]
+
+    asyncio.run(run())
+
+
+def test_only_movies_the_index_does_not_know_are_fetched():
+    async def run():
+        calls = []
+        async with fake_tmdb(calls) as client:
+            tmdb_service.collection_index.record_movie(2, None)
+            _, result = await get_session_recommendations(client, [1, 2])
+        assert sorted(calls) == ["/collection/100", "/movie/1", "/movie/1 done"]
+        assert [group["id"] for group in result["sequels"]] == [100]
+
+    asyncio.run(run())
+
+
+def test_genre_fallback_fetches_the_skipped_details(monkeypatch, world):
+    know_collections(world)
+    monkeypatch.setattr(tmdb_service, "RECOMMENDATION_TOP_K", 2)
+
+    async def run():
+        calls = []
+        async with fake_tmdb(calls) as client:
+            _, result = await get_session_recommendations(client, [1, 2])
+        assert sorted(calls) == ["/discover/movie", "/movie/1", "/movie/1 done", "/movie/2", "/movie/2 done"]
+        assert ids(result["recommendations"]) == [10, 11, 90, 91]
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_sequel_group_of_an_indexed_movie_loads_alongside_its_details(monkeypatch, tmp_path, streamed):
+    # Without the matrix the details are needed for the lists, but not for the collection
+    monkeypatch.setattr(tmdb_service, "rec_matrix", RecMatrix(tmp_path / "no-matrix"))
+    tmdb_service.collection_index.record_movie(1, 100)
+
+    async def run():
+        calls = []
+        async with fake_tmdb(calls, details_delay=0.05) as client:
+            if streamed:
+                result = [event async for event in stream_recommendations_with_sequels(client, [1, 2])][-1]
+            else:
+                _, result = await get_session_recommendations(client, [1, 2])
+        assert calls.index("/collection/100") < calls.index("/movie/1 done")
+        assert calls.count("/collection/100") == 1
+        assert [group["id"] for group in result["sequels"]] == [100]
+        assert ids(result["recommendations"])[:2] == [10, 11]
+
+    asyncio.run(run())
+
+
+def stored_session(*movies) -> RecommendationSession:
+    session = RecommendationSession()
+    for mid, genres in movies:
+        session.add(mid, None if genres is None else [], genres, None)
+    tmdb_service.rec_sessions.put(session)
+    return session
+
+
+def test_list_ends_with_the_ranking_when_the_selection_has_no_genres():
+    stored_session((1, []), (2, []))
+    data = {"recommendations": [movie(i) for i in range(5)]}
+    assert recommendations_continue([1, 2], data, 0, 3) == (True, False)
+    assert recommendations_continue([1, 2], data, 3, 3) == (True, False)
+    assert recommendations_continue([1, 2], data, 5, 3) == (False, False)
+
+
+def test_discovery_continues_the_list_and_is_prefetched_when_the_genres_are_known():
+    stored_session((1, [28]), (2, []))
+    data = {"recommendations": [movie(i) for i in range(5)]}
+    assert recommendations_continue([1, 2], data, 0, 3) == (True, False)  # still in the ranking
+    assert recommendations_continue([1, 2], data, 3, 3) == (True, True)
+    assert recommendations_continue([1, 2], data, 5, 3) == (True, True)
+
+
+def test_unknown_genres_promise_more_without_prefetching():
+    data = {"recommendations": []}
+    assert recommendations_continue([1, 2], data, 0, 3) == (True, False)  # no session
+    stored_session((1, [28]), (2, None))
+    assert recommendations_continue([1, 2], data, 0, 3) == (True, False)  # 2 is bare
+    assert recommendations_continue([], data, 0, 3) == (False, False)
+
+
+@pytest.mark.parametrize("steps", [
+    [[1], [1, 2], [1, 2, 3]],
+    [[1, 2, 3], [2, 3], [3, 2, 4]],
+    [[4], [4, 3], [3]],
+    [[1, 2], [3], [3, 1, 2]],
+])
+def test_session_updated_by_deltas_matches_a_fresh_one(monkeypatch, tmp_path, steps):
+    # Without the matrix the session's own aggregates are ranked
+    monkeypatch.setattr(tmdb_service, "rec_matrix", RecMatrix(tmp_path / "no-matrix"))
+
+    async def run():
+        async with fake_tmdb([]) as client:
+            session_id = None
+            for selection in steps:
+                session_id, updated = await get_session_recommendations(client, selection, session_id)
+            tmdb_service.rec_sessions.clear()
+            fresh_id, fresh = await get_session_recommendations(client, steps[-1])
+        assert fresh_id != session_id
+        assert updated == fresh
+
+    asyncio.run(run())
+
+
+def test_bare_session_movies_catch_up_when_the_selection_leaves_the_matrix(world):
+    know_collections(world)
+    kept = SessionStore()
+
+    async def run():
+        async with fake_tmdb([]) as client:
+            session_id = None
+            for selection in ([1, 2], [1, 2, 3], [2, 1]):
+                tmdb_service.rec_sessions = kept
+                session_id, updated = await get_session_recommendations(client, selection, session_id)
+                tmdb_service.rec_sessions = SessionStore()
+                _, fresh = await get_session_recommendations(client, selection)
+                assert updated == fresh
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import tmdb_service
+from services.search_index import SearchIndex, write_index
+from services.tmdb_service import DETAILS_PARAMS, cache_key, search_movies_page, typeahead_search
+
+MATRIX = {"id": 603, "title": "Matrix", "original_title": "The Matrix", "popularity": 80.0,
+          "poster_path": "/matrix.jpg", "release_date": "1999-03-31", "vote_average": 8.2}
+# A row of the daily ID export whose details were never fetched
+MATRIX_BARE = {"id": 604, "title": "The Matrix Reloaded", "original_title": "The Matrix Reloaded", "popularity": 40.0}
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    def build(movies):
+        path = tmp_path / "search_index.bin"
+        write_index(path, movies)
+        monkeypatch.setattr(tmdb_service, "search_index", SearchIndex(path))
+
+    monkeypatch.setattr(tmdb_service, "typeahead_cache", tmdb_service.TypeaheadCache(max_entries=10, ttl=60))
+    tmdb_service.response_cache.clear()
+    return build
+
+
+def tmdb(calls: list):
+    def handler(request):
+        calls.append(request.url.params["query"])
+        return httpx.Response(200, json={"page": 1, "total_pages": 1, "total_results": 1,
+                                         "results": [dict(MATRIX, id=605, title="Upstream")]})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def search(query: str, calls: list):
+    async def run():
+        async with tmdb(calls) as client:
+            return await search_movies_page(client, query, 0, 20), await typeahead_search(client, query)
+
+    return asyncio.run(run())
+
+
+def test_local_hits_with_display_fields_are_served_from_the_index(index):
+    index([MATRIX])
+    calls = []
+    (results, has_more), suggestions = search("matrix", calls)
+    assert [m["id"] for m in results] == [603] and not has_more
+    assert [m["id"] for m in suggestions] == [603]
+    assert calls == []
+
+
+def test_hits_without_display_fields_go_to_tmdb(index):
+    index([MATRIX, MATRIX_BARE])
+    calls = []
+    (results, _), suggestions = search("matrix", calls)
+    assert [m["id"] for m in results] == [605]
+    assert [m["id"] for m in suggestions] == [605]
+    assert calls == ["matrix"]
+
+
+def test_hits_without_display_fields_are_filled_from_cached_details(index):
+    index([MATRIX, MATRIX_BARE])
+    details = {"id": 604, "title": "Matrix Reloaded", "poster_path": "/reloaded.jpg", "release_date": "2003-05-15",
+               "vote_average": 7.1, "overview": "..."}
+    tmdb_service.response_cache.set(cache_key("/movie/604", DETAILS_PARAMS), details, 60)
+    calls = []
+    (results, _), suggestions = search("matrix", calls)
+    assert [m["id"] for m in results] == [603, 604]
+    assert results[1]["title"] == "Matrix Reloaded" and results[1]["poster_path"] == "/reloaded.jpg"
+    assert "overview" not in results[1]
+    assert [m["id"] for m in suggestions] == [603, 604]
+    assert calls == []
@@ -0,0 +1,60 @@
+import pytest
+
+from services.ranking import DEFAULT_WEIGHTS
+from services.settings import ADMISSION_LANES, DEADLINES, Settings, SettingsError, load_settings
+
+
+def test_defaults_without_any_variables():
+    settings = load_settings({})
+    assert settings == Settings()
+    assert settings.rank_weights == DEFAULT_WEIGHTS
+    assert settings.admission_lanes == ADMISSION_LANES and settings.deadlines == DEADLINES
+
+
+def test_values_are_parsed_to_the_defaults_types():
+    settings = load_settings({
+        "TMDB_API_KEY": "key",
+        "TMDB_RATE_LIMIT": "20",
+        "TMDB_MAX_RETRIES": "0",
+        "TMDB_HTTP2": "Yes",
+        "TMDB_SERVE_STALE": "off",
+        "RANK_WEIGHT_COUNT": "-2.5",
+        "ADMISSION_SEARCH_LIMIT": "4",
+        "DEADLINE_RECOMMENDATIONS": "5",
+    })
+    assert settings.tmdb_api_key == "key"
+    assert settings.tmdb_rate_limit == 20.0 and isinstance(settings.tmdb_rate_limit, float)
+    assert settings.tmdb_max_retries == 0
+    assert settings.tmdb_http2 is True and settings.tmdb_serve_stale is False
+    assert settings.rank_weights["count"] == -2.5
+    assert settings.admission_lanes["search"] == (1, 4, *ADMISSION_LANES["search"][2:])
+    assert settings.deadlines["recommendations"] == 5.0
+
+
+@pytest.mark.parametrize("name, raw, message", [
+    ("TMDB_MAX_CONNECTIONS", "many", "expected an integer"),
+    ("TMDB_RATE_LIMIT", "fast", "expected a number"),
+    ("TMDB_RATE_LIMIT", "inf", "expected a finite number"),
+    ("TMDB_RATE_LIMIT", "0", "must be greater than 0"),
+    ("TMDB_MAX_RETRIES", "-1", "can't be negative"),
+    ("TMDB_HTTP2", "maybe", "expected true or false"),
+    ("ADMISSION_DETAILS_LIMIT", "0", "must be greater than 0"),
+    ("DEADLINE_SEARCH", "-3", "must be greater than 0"),
+    ("DEADLINE_SEARHC", "3", "unknown, expected one of"),
+    ("RANK_WEIGHT_POPULARTY", "1", "unknown, expected one of"),
+])
+def test_invalid_values_are_refused(name, raw, message):
+    with pytest.raises(SettingsError, match=f"{name}.*{message}"):
+        load_settings({name: raw})
+
+
+def test_keepalive_connections_are_bounded_by_the_pool():
+    with pytest.raises(SettingsError, match="TMDB_MAX_KEEPALIVE_CONNECTIONS"):
+        load_settings({"TMDB_MAX_CONNECTIONS": "10", "TMDB_MAX_KEEPALIVE_CONNECTIONS": "20"})
+
+
+def test_every_invalid_value_is_listed_at_once():
+    with pytest.raises(SettingsError) as error:
+        load_settings({"TMDB_RATE_LIMIT": "0", "API_PAGE_SIZE": "x", "PREFETCH_ENABLED": "2"})
+    message = str(error.value)
+    assert all(name in message for name in ("TMDB_RATE_LIMIT", "API_PAGE_SIZE", "PREFETCH_ENABLED"))
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services import tmdb_service
+from services.deadline import deadline
+from services.tmdb_service import cache_key, get_results_page, response_cache, speculate, tmdb_get
+from services.upstream import UpstreamScheduler
+
+
+@pytest.fixture(autouse=True)
+def fresh_upstream(monkeypatch):
+    monkeypatch.setattr(tmdb_service, "upstream", UpstreamScheduler(max_retries=0, failure_threshold=1))
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+def slow_tmdb(calls: list, delay: float = 0.05):
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"id": int(request.url.path.rsplit("/", 1)[1]), "title": "Movie"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_concurrent_callers_share_one_request():
+    async def run():
+        calls = []
+        async with slow_tmdb(calls) as client:
+            results = await asyncio.gather(*(tmdb_get(client, "/movie/1", {}, "movie") for _ in range(5)))
+        assert calls == ["/3/movie/1"]
+        assert all(result["id"] == 1 for result in results)
+
+    asyncio.run(run())
+
+
+def test_fetch_outlives_a_caller_whose_deadline_passed():
+    async def run():
+        calls = []
+        async with slow_tmdb(calls, delay=0.2) as client:
+            with deadline(0.1) as budget:
+                assert await tmdb_get(client, "/movie/2", {}, "movie") is None
+            assert budget.missed
+            await asyncio.sleep(0.2)
+            assert response_cache.get(cache_key("/movie/2", {}))["id"] == 2
+            assert await tmdb_get(client, "/movie/2", {}, "movie") is not None
+        assert calls == ["/3/movie/2"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_wedge_a_half_open_probe():
+    async def run():
+        breaker = tmdb_service.upstream.breaker
+        breaker.record_failure()
+        breaker.opened_at = time.monotonic() - breaker.reset_timeout
+        calls = []
+        async with slow_tmdb(calls) as client:
+            caller = asyncio.create_task(tmdb_get(client, "/movie/3", {}, "movie"))
+            while not calls:  # on the wire: finishes even with nobody waiting
+                await asyncio.sleep(0.001)
+            caller.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+            await asyncio.sleep(0.1)
+        assert breaker.state == "closed"
+        assert response_cache.get(cache_key("/movie/3", {}))["id"] == 3
+
+    asyncio.run(run())
+
+
+def discover_tmdb(calls: list):
+    def handler(request):
+        page = int(request.url.params.get("page", 1))
+        calls.append(page)
+        results = [{"id": page * 100 + i, "title": f"Movie {i}"} for i in range(20)]
+        return httpx.Response(200, json={"page": page, "total_pages": 10, "results": results})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_requested_pages_prefetch_the_next_ones():
+    async def run():
+        calls = []
+        async with discover_tmdb(calls) as client:
+            results, has_more = await get_results_page(client, "/discover/movie", {}, "discover", 0, 20)
+            await asyncio.gather(*tmdb_service._background)
+        assert len(results) == 20 and has_more
+        assert sorted(calls) == [1, 2, 3]
+
+    asyncio.run(run())
+
+
+def test_speculative_pages_dont_prefetch_more():
+    async def run():
+        calls = []
+        async with discover_tmdb(calls) as client:
+            await speculate(get_results_page(client, "/discover/movie", {}, "discover", 0, 20))
+            await asyncio.gather(*tmdb_service._background)
+        assert calls == [1]
+
+    asyncio.run(run())
+
+
+def test_abandoned_request_still_in_the_token_bucket_is_never_sent():
+    async def run():
+        tmdb_service.upstream = UpstreamScheduler(rate=2.0, burst=1.0, max_retries=0)
+        await tmdb_service.upstream.bucket.acquire()  # next token in 0.5s
+        calls = []
+        async with slow_tmdb(calls) as client:
+            with deadline(0.05):
+                assert await tmdb_get(client, "/movie/4", {}, "movie") is None
+            await asyncio.sleep(0.6)
+        assert calls == []
+        assert cache_key("/movie/4", {}) not in tmdb_service._in_flight
+
+    asyncio.run(run())
+
+
+def flaky_tmdb(calls: list, delay: float = 0.0):
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(delay)
+        return httpx.Response(503)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_abandoned_request_backing_off_is_not_retried(monkeypatch):
+    async def run():
+        monkeypatch.setattr(tmdb_service.upstream, "max_retries", 3)
+        monkeypatch.setattr(tmdb_service.upstream, "_backoff", lambda attempt: 0.5)
+        calls = []
+        async with flaky_tmdb(calls) as client:
+            with deadline(0.15):
+                assert await tmdb_get(client, "/movie/5", {}, "movie") is None
+            await asyncio.sleep(0.6)
+        assert calls == ["/3/movie/5"]
+
+    asyncio.run(run())
+
+
+def test_abandoned_request_on_the_wire_finishes_without_retries(monkeypatch):
+    async def run():
+        monkeypatch.setattr(tmdb_service.upstream, "max_retries", 3)
+        monkeypatch.setattr(tmdb_service.upstream, "_backoff", lambda attempt: 0.0)
+        calls = []
+        async with flaky_tmdb(calls, delay=0.3) as client:
+            with deadline(0.15):
+                assert await tmdb_get(client, "/movie/6", {}, "movie") is None
+            await asyncio.sleep(0.3)
+        assert calls == ["/3/movie/6"]
+        assert tmdb_service.upstream.breaker.failures == 1
+        assert not tmdb_service.upstream._abandoned and not tmdb_service.upstream._sending
+
+    asyncio.run(run())
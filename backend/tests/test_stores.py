@@ -0,0 +1,36 @@
+from services.collection_index import UNKNOWN, CollectionIndex
+from services.rec_sessions import RecommendationSession, SessionStore
+from services.typeahead import TypeaheadCache
+
+GROUP = {"id": 2344, "name": "Matrix", "parts": [{"id": 603, "title": "Matrix"}, {"id": 604, "title": "Reloaded"}]}
+
+
+def test_collection_index_clear_forgets_memory_and_disk(tmp_path):
+    index = CollectionIndex(tmp_path / "collections.sqlite3")
+    index.record_collection(GROUP)
+    index.record_movie(605, None)
+    index.clear()
+    assert index.collection_of(603) is UNKNOWN and index.group(2344) is None
+    index.close()
+
+    reopened = CollectionIndex(tmp_path / "collections.sqlite3")
+    assert len(reopened) == 0 and reopened.collection_of(605) is UNKNOWN
+    reopened.close()
+
+
+def test_session_store_clear():
+    store = SessionStore()
+    session = RecommendationSession()
+    session.add(603, [{"id": 604}], [28], None)
+    store.put(session)
+    assert store.find([603]) is session
+    store.clear()
+    assert len(store) == 0 and store.get(session.id) is None and store.find([603]) is None
+
+
+def test_typeahead_cache_clear():
+    cache = TypeaheadCache()
+    cache.put("matrix", [{"id": 603, "title": "Matrix"}], complete=True)
+    assert cache.lookup("matrix")
+    cache.clear()
+    assert cache.lookup("matrix") is None
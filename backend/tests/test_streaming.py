@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from main import AdmittedStream, admission
+
+SCOPE = {"type": "http", "asgi": {"spec_version": "2.4"}, "method": "GET", "path": "/api/recommendations/stream",
+         "headers": []}
+
+
+def lane_active() -> int:
+    return admission.lanes["recommendations"].active
+
+
+async def receive():
+    return {"type": "http.disconnect"}
+
+
+def stream(events: list):
+    async def body():
+        try:
+            for event in events:
+                yield event
+        finally:
+            events.append("closed")
+
+    return body()
+
+
+def test_slot_is_released_when_the_response_never_starts():
+    async def run():
+        await admission.acquire("recommendations")
+        events = [b"{}\n"]
+
+        async def send(message):
+            raise OSError("client went away")
+
+        with pytest.raises(Exception):
+            await AdmittedStream(stream(events), "recommendations")(SCOPE, receive, send)
+        assert lane_active() == 0
+
+    asyncio.run(run())
+
+
+def test_slot_is_released_and_body_closed_when_sending_fails_half_way():
+    async def run():
+        await admission.acquire("recommendations")
+        events = [b"{}\n", b"{}\n"]
+        sent = []
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                raise OSError("client went away")
+            sent.append(message)
+
+        with pytest.raises(Exception):
+            await AdmittedStream(stream(events), "recommendations")(SCOPE, receive, send)
+        assert lane_active() == 0
+        assert events[-1] == "closed"
+
+    asyncio.run(run())
+
+
+def test_slot_is_released_after_a_full_response():
+    async def run():
+        await admission.acquire("recommendations")
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await AdmittedStream(stream([b"{}\n"]), "recommendations")(SCOPE, receive, send)
+        assert lane_active() == 0
+        assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+    asyncio.run(run())
+
+
+def test_endpoint_releases_the_slot_when_the_client_is_gone_before_the_response_starts():
+    async def run():
+        main.app.state.tmdb_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+        scope = {**SCOPE, "asgi": {"version": "3.0", "spec_version": "2.4"}, "scheme": "http", "http_version": "1.1",
+                 "query_string": b"movie_ids=1,2", "root_path": "", "raw_path": b"/api/recommendations/stream",
+                 "server": ("test", 80), "client": ("127.0.0.1", 1234), "app": main.app}
+
+        async def send(message):
+            raise OSError("client went away")
+
+        try:
+            await main.app(scope, receive, send)
+        except Exception:
+            pass
+        assert lane_active() == 0
+        await main.app.state.tmdb_client.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from services import tmdb_service
+
+
+@pytest.fixture
+def app(monkeypatch):
+    calls = []
+    slots_while_debouncing = []
+
+    def tmdb(request):
+        calls.append(request.url.params["query"])
+        return httpx.Response(200, json={"page": 1, "total_pages": 1, "total_results": 1,
+                                         "results": [{"id": len(calls), "title": request.url.params["query"]}]})
+
+    wait = main.typeahead_debouncer.wait
+
+    async def watched_wait(session):
+        slots_while_debouncing.append(main.admission.lanes["search"].active)
+        return await wait(session)
+
+    monkeypatch.setattr(main.typeahead_debouncer, "wait", watched_wait)
+    monkeypatch.setattr(tmdb_service, "typeahead_cache", tmdb_service.TypeaheadCache(max_entries=10, ttl=60))
+    tmdb_service.response_cache.clear()
+    main.app.state.tmdb_client = httpx.AsyncClient(transport=httpx.MockTransport(tmdb))
+    yield calls, slots_while_debouncing
+    asyncio.run(main.app.state.tmdb_client.aclose())
+
+
+def typeahead(*params: dict) -> list[httpx.Response]:
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/api/movies/typeahead", params=p) for p in params))
+
+    return asyncio.run(run())
+
+
+def test_superseded_keystroke_gets_204_without_holding_a_slot(app):
+    calls, slots_while_debouncing = app
+    first, second = typeahead({"query": "ma", "session": "tab"}, {"query": "mat", "session": "tab"})
+    assert first.status_code == 204
+    assert second.status_code == 200 and second.json()[0]["title"] == "mat"
+    assert calls == ["mat"]
+    assert slots_while_debouncing == [0, 0]
+
+
+def test_requests_without_a_session_are_not_debounced(app):
+    calls, slots_while_debouncing = app
+    first, second = typeahead({"query": "ma"}, {"query": "mat"})
+    assert first.status_code == second.status_code == 200
+    assert sorted(calls) == ["ma", "mat"]
+    assert slots_while_debouncing == []
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.extract import RESULTS_PAGE, read_json
+from services.upstream import UpstreamScheduler, UpstreamUnavailable
+
+URL = "https://tmdb.test/3/movie/1"
+
+
+def scheduler(**kwargs) -> UpstreamScheduler:
+    kwargs.setdefault("max_retries", 0)
+    kwargs.setdefault("failure_threshold", 1)
+    kwargs.setdefault("reset_timeout", 30.0)
+    return UpstreamScheduler(**kwargs)
+
+
+def half_open(upstream: UpstreamScheduler):
+    upstream.breaker.record_failure()
+    upstream.breaker.opened_at = time.monotonic() - upstream.breaker.reset_timeout
+    assert upstream.breaker.state == "half_open"
+
+
+def client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_open_breaker_refuses_calls():
+    async def run():
+        upstream = scheduler()
+        upstream.breaker.record_failure()
+        async with client(lambda request: httpx.Response(200, json={})) as http:
+            with pytest.raises(UpstreamUnavailable):
+                await upstream.get(http, URL, {})
+
+    asyncio.run(run())
+
+
+def test_cancelled_probe_lets_the_next_call_probe():
+    async def run():
+        upstream = scheduler()
+        half_open(upstream)
+        started = asyncio.Event()
+
+        async def hang(request):
+            started.set()
+            await asyncio.sleep(60)
+
+        async with client(hang) as http:
+            probe = asyncio.create_task(upstream.get(http, URL, {}))
+            await started.wait()
+            assert upstream.breaker.is_open()
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+
+        assert not upstream.breaker.is_open()
+        async with client(lambda request: httpx.Response(200, json={"id": 1})) as http:
+            response = await upstream.get(http, URL, {})
+        assert response.status_code == 200
+        assert upstream.breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_probe_failing_with_an_unexpected_error_reopens_the_breaker():
+    async def run():
+        upstream = scheduler()
+        half_open(upstream)
+
+        async def parse(response):
+            raise RuntimeError("parser bug")
+
+        async with client(lambda request: httpx.Response(200, json={})) as http:
+            with pytest.raises(RuntimeError):
+                await upstream.get_parsed(http, URL, {}, parse)
+
+        assert upstream.breaker.state == "open"
+        assert not upstream.breaker._probe_in_flight
+
+    asyncio.run(run())
+
+
+def test_probe_success_closes_the_breaker():
+    async def run():
+        upstream = scheduler()
+        half_open(upstream)
+        async with client(lambda request: httpx.Response(404)) as http:
+            response = await upstream.get(http, URL, {})
+        assert response.status_code == 404
+        assert upstream.breaker.state == "closed"
+
+    asyncio.run(run())
+
+
+def test_retries_exhausted_open_the_breaker():
+    async def run():
+        upstream = scheduler(max_retries=1, backoff_base=0.0, failure_threshold=1)
+        calls = []
+
+        def fail(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        async with client(fail) as http:
+            with pytest.raises(UpstreamUnavailable):
+                await upstream.get(http, URL, {})
+        assert len(calls) == 2
+        assert upstream.breaker.state == "open"
+
+    asyncio.run(run())
+
+
+def test_undecodable_body_is_retried_then_counted_as_a_failure():
+    async def run():
+        upstream = scheduler(max_retries=1, backoff_base=0.0)
+        half_open(upstream)
+        calls = []
+
+        def truncated(request):
+            calls.append(request)
+            return httpx.Response(200, content=b'{"page": 1, "results": [')
+
+        async with client(truncated) as http:
+            with pytest.raises(UpstreamUnavailable):
+                await upstream.get_parsed(http, URL, {}, lambda response: read_json(response, RESULTS_PAGE))
+        assert len(calls) == 2
+        assert upstream.breaker.state == "open"
+        assert not upstream.breaker._probe_in_flight
+
+    asyncio.run(run())
@@ -1,16 +1,16 @@
 import asyncio
 import os
 import sys
-import httpx
 
 # Add project root to python path to allow imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from services.tmdb_service import get_recommendations_with_sequels
+from services.tmdb_service import create_tmdb_client, get_recommendations_with_sequels
 
 async def test_api_logic():
     print("--- Test: Matrix (603) + Inception (27205) ---")
-    data = await get_recommendations_with_sequels([603, 27205])
+    async with create_tmdb_client() as client:
+        data = await get_recommendations_with_sequels(client, [603, 27205])
     
     print(f"Sequels Groups: {len(data['sequels'])}")
     for group in data['sequels']:
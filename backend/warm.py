@@ -0,0 +1,46 @@
+"""
+Deploy-time cache warmup: refresh the weekly trends and pull details, credits,
+recommendations and collections of the top trending movies into the TMDB response
+cache, then exit. Run it before switching traffic to a new deployment.
+
+Usage:
+    python warm.py [--top-n 20] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add project root to python path to allow imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.prefetch import PrefetchScheduler
+from services.settings import settings
+from services.tmdb_service import create_tmdb_client, response_cache
+
+
+async def warm(top_n, concurrency):
+    async with create_tmdb_client() as client:
+        prefetcher = PrefetchScheduler(client, top_n=top_n, concurrency=concurrency, jitter=0.2)
+        return await prefetcher.run_once()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the TMDB response cache")
+    parser.add_argument("--top-n", type=int, default=settings.prefetch_top_n)
+    parser.add_argument("--concurrency", type=int, default=settings.prefetch_concurrency)
+    args = parser.parse_args()
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    started = time.perf_counter()
+    summary = asyncio.run(warm(args.top_n, args.concurrency))
+    response_cache.close()
+    print(f"Warmed {summary['warmed']}/{summary['movies']} trending movies "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
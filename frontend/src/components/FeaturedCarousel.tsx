@@ -1,6 +1,7 @@
 import { useRef, useEffect, useState } from 'react';
 import { type Movie } from '../types';
 import { Plus, Check } from 'lucide-react';
+import { posterSrcSet } from '../services/images';
 
 interface FeaturedCarouselProps {
     movies: Movie[];
@@ -121,6 +122,8 @@ export const FeaturedCarousel = ({ movies, selectedMovies = [], onToggleSelect,
                                 <div className="aspect-[2/3] rounded-xl overflow-hidden shadow-lg mb-2 relative group">
                                     <img
                                         src={movie.poster}
+                                        srcSet={posterSrcSet(movie.poster)}
+                                        sizes="192px"
                                         alt={movie.title}
                                         className="w-full h-full object-cover pointer-events-none"
                                         loading="lazy"
@@ -0,0 +1,26 @@
+import { useEffect, useRef } from 'react';
+
+interface LoadMoreSentinelProps {
+    onVisible: () => void;
+    disabled?: boolean;
+}
+
+// Last item of a grid: calls onVisible when it scrolls into view (a bit early,
+// so the next page is usually there before the user reaches the end).
+export const LoadMoreSentinel = ({ onVisible, disabled }: LoadMoreSentinelProps) => {
+    const ref = useRef<HTMLDivElement>(null);
+
+    useEffect(() => {
+        if (disabled || !ref.current) return;
+        const observer = new IntersectionObserver(
+            (entries) => {
+                if (entries.some(entry => entry.isIntersecting)) onVisible();
+            },
+            { rootMargin: '600px 0px' }
+        );
+        observer.observe(ref.current);
+        return () => observer.disconnect();
+    }, [onVisible, disabled]);
+
+    return <div ref={ref} className="col-span-full h-1" />;
+};
@@ -1,6 +1,7 @@
 import { Plus, Check, Star } from 'lucide-react';
 import { type Movie } from '../types';
 import { Button } from './Button';
+import { posterSrcSet } from '../services/images';
 
 interface MovieCardProps {
     movie: Movie;
@@ -16,6 +17,8 @@ export const MovieCard = ({ movie, isSelected, onToggleSelect, onDetailsClick }:
             <div className="aspect-[2/3] w-full bg-gray-100 dark:bg-gray-800 relative overflow-hidden">
                 <img
                     src={movie.poster}
+                    srcSet={posterSrcSet(movie.poster)}
+                    sizes="(min-width: 1024px) 25vw, (min-width: 768px) 33vw, 50vw"
                     alt={movie.title}
                     className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-110"
                     loading="lazy"
@@ -1,6 +1,7 @@
 import { X, Clock, Star, Calendar, User, Users } from 'lucide-react';
 import { type MovieDetails } from '../types';
 import { useEffect, useRef } from 'react';
+import { posterSrcSet } from '../services/images';
 
 interface MovieDetailsModalProps {
     movie: MovieDetails | null;
@@ -59,6 +60,8 @@ export const MovieDetailsModal = ({ movie, isOpen, onClose }: MovieDetailsModalP
                     <div className="aspect-[2/3] w-full bg-gray-100 dark:bg-gray-700">
                         <img
                             src={movie.poster}
+                            srcSet={posterSrcSet(movie.poster, [342, 500, 780])}
+                            sizes="(min-width: 768px) 40vw, 100vw"
                             alt={movie.title}
                             className="w-full h-full object-cover"
                         />
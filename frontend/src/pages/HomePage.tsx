@@ -1,10 +1,11 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
 import { Search } from 'lucide-react';
 import { MovieCard } from '../components/MovieCard';
 import { type Movie, type MovieDetails } from '../types';
-import { searchMovies, getMovieDetails, getWeeklyTrends } from '../services/api';
+import { searchMovies, typeaheadSearch, getMovieDetails, getWeeklyTrends, TYPEAHEAD_LIMIT } from '../services/api';
 import { MovieDetailsModal } from '../components/MovieDetailsModal';
 import { FeaturedCarousel } from '../components/FeaturedCarousel';
+import { LoadMoreSentinel } from '../components/LoadMoreSentinel';
 
 interface HomePageProps {
     selectedMovies: Movie[];
@@ -16,6 +17,10 @@ export const HomePage = ({ selectedMovies, onToggleSelect }: HomePageProps) => {
     const [movies, setMovies] = useState<Movie[]>([]);
     const [trends, setTrends] = useState<Movie[]>([]);
     const [loading, setLoading] = useState(false);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    // The suggestions on screen may not be all: the full search brings the rest on scroll
+    const [moreToSearch, setMoreToSearch] = useState(false);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [selectedDetailMovie, setSelectedDetailMovie] = useState<MovieDetails | null>(null);
     const [isModalOpen, setIsModalOpen] = useState(false);
 
@@ -37,21 +42,67 @@ export const HomePage = ({ selectedMovies, onToggleSelect }: HomePageProps) => {
     }, []);
 
     useEffect(() => {
-        const fetchMovies = async () => {
-            if (searchTerm.length > 2) {
-                setLoading(true);
-                const results = await searchMovies(searchTerm);
+        setMoreToSearch(false);
+        if (searchTerm.length <= 2) {
+            setMovies([]);
+            setNextCursor(null);
+            return;
+        }
+
+        // Every keystroke asks for suggestions right away; the next keystroke aborts it
+        // (the server also drops superseded keystrokes before they reach TMDB)
+        const controller = new AbortController();
+        let gotSuggestions = false;
+        const suggestions = typeaheadSearch(searchTerm, controller.signal).then((results) => {
+            if (results && !controller.signal.aborted) {
+                gotSuggestions = true;
                 setMovies(results);
+                setNextCursor(null);
                 setLoading(false);
-            } else {
-                setMovies([]);
             }
+            return results;
+        });
+
+        // Once typing pauses the suggestions are the first page; a full list of them may
+        // have more behind it, which loadMore brings when scrolled to. The full search
+        // only runs now when no suggestions came (superseded or failed).
+        const fetchMovies = async () => {
+            if (!gotSuggestions) setLoading(true);
+            const results = await suggestions;
+            if (controller.signal.aborted) return;
+            if (results) {
+                setMoreToSearch(results.length >= TYPEAHEAD_LIMIT);
+                return;
+            }
+            const page = await searchMovies(searchTerm, undefined, controller.signal);
+            if (controller.signal.aborted) return;
+            setMovies(page.items);
+            setNextCursor(page.nextCursor);
+            setLoading(false);
         };
 
         const timeoutId = setTimeout(fetchMovies, 500);
-        return () => clearTimeout(timeoutId);
+        return () => {
+            controller.abort();
+            clearTimeout(timeoutId);
+            setLoading(false);
+        };
     }, [searchTerm]);
 
+    const loadMore = useCallback(async () => {
+        if ((!nextCursor && !moreToSearch) || loadingMore) return;
+        setLoadingMore(true);
+        // After suggestions the full search starts at its first page (deduped against them)
+        const page = await searchMovies(searchTerm, nextCursor ?? undefined);
+        setMovies(prev => {
+            const seen = new Set(prev.map(m => m.id));
+            return [...prev, ...page.items.filter(m => !seen.has(m.id))];
+        });
+        setNextCursor(page.nextCursor);
+        setMoreToSearch(false);
+        setLoadingMore(false);
+    }, [searchTerm, nextCursor, moreToSearch, loadingMore]);
+
     return (
         <div className="space-y-8 animate-fade-in">
             {/* Hero / Search Section */}
@@ -118,6 +169,7 @@ export const HomePage = ({ selectedMovies, onToggleSelect }: HomePageProps) => {
                                 />
                             );
                         })}
+                        <LoadMoreSentinel onVisible={loadMore} disabled={!(nextCursor || moreToSearch) || loadingMore} />
                     </div>
                 ) : (
                     <div className="text-center py-20 bg-gray-50 dark:bg-gray-800/50 rounded-xl border-2 border-dashed border-gray-200 dark:border-gray-700">
@@ -4,8 +4,9 @@ import { type Movie, type MovieDetails, type SequelGroup } from '../types';
 import { MovieCard } from '../components/MovieCard';
 import { Button } from '../components/Button';
 import { MovieDetailsModal } from '../components/MovieDetailsModal';
-import { useState, useEffect } from 'react';
-import { getRecommendations, getMovieDetails } from '../services/api';
+import { useState, useEffect, useCallback } from 'react';
+import { getRecommendations, getMoreRecommendations, getMovieDetails, streamRecommendations } from '../services/api';
+import { LoadMoreSentinel } from '../components/LoadMoreSentinel';
 
 export const RecommendationsPage = () => {
     const navigate = useNavigate();
@@ -13,6 +14,8 @@ export const RecommendationsPage = () => {
     const [loading, setLoading] = useState(true);
     const [recommendations, setRecommendations] = useState<Movie[]>([]);
     const [sequels, setSequels] = useState<SequelGroup[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [selectedDetailMovie, setSelectedDetailMovie] = useState<MovieDetails | null>(null);
     const [isModalOpen, setIsModalOpen] = useState(false);
 
@@ -31,15 +34,42 @@ export const RecommendationsPage = () => {
     };
 
     useEffect(() => {
+        // Leaving the page (or changing the selection) aborts the requests still running,
+        // so the server stops fetching for a result nobody will see
+        const controller = new AbortController();
         const fetchRecommendations = async () => {
             setLoading(true);
+            setRecommendations([]);
+            setSequels([]);
+            setNextCursor(null);
             try {
                 const state = location.state as { selectedMovies: Movie[] } | null;
                 if (state && state.selectedMovies && state.selectedMovies.length > 0) {
                     const ids = state.selectedMovies.map(m => m.id);
-                    const data = await getRecommendations(ids);
-                    setRecommendations(data.recommendations);
-                    setSequels(data.sequels);
+                    try {
+                        // Show results as soon as the first of them arrive
+                        await streamRecommendations(ids, (event) => {
+                            if (event.type === 'sequel') {
+                                setSequels(prev => [...prev, event.group]);
+                            } else if (event.type === 'recommendations') {
+                                setRecommendations(event.recommendations);
+                            } else if (event.type === 'done') {
+                                setRecommendations(event.recommendations);
+                                setSequels(event.sequels);
+                                setNextCursor(event.next_cursor);
+                            } else {
+                                console.error("Recommendation stream error:", event.error);
+                            }
+                            setLoading(false);
+                        }, controller.signal);
+                    } catch (error) {
+                        if (controller.signal.aborted) return;
+                        console.error("Recommendation stream failed, falling back", error);
+                        const data = await getRecommendations(ids, controller.signal);
+                        if (controller.signal.aborted) return;
+                        setRecommendations(data.recommendations);
+                        setSequels(data.sequels);
+                    }
                 } else {
                     setRecommendations([]);
                     setSequels([]);
@@ -47,13 +77,27 @@ export const RecommendationsPage = () => {
             } catch (error) {
                 console.error("Failed to load recommendations", error);
             } finally {
-                setLoading(false);
+                if (!controller.signal.aborted) setLoading(false);
             }
         };
 
         fetchRecommendations();
+        return () => controller.abort();
     }, [location.state]);
 
+    const loadMore = useCallback(async () => {
+        const state = location.state as { selectedMovies: Movie[] } | null;
+        if (!nextCursor || loadingMore || !state?.selectedMovies) return;
+        setLoadingMore(true);
+        const page = await getMoreRecommendations(state.selectedMovies.map(m => m.id), nextCursor);
+        setRecommendations(prev => {
+            const seen = new Set(prev.map(m => m.id));
+            return [...prev, ...page.items.filter(m => !seen.has(m.id))];
+        });
+        setNextCursor(page.nextCursor);
+        setLoadingMore(false);
+    }, [location.state, nextCursor, loadingMore]);
+
     if (loading) {
         return (
             <div className="min-h-[60vh] flex flex-col items-center justify-center space-y-4">
@@ -130,6 +174,7 @@ export const RecommendationsPage = () => {
                                 onDetailsClick={handleMovieClick}
                             />
                         ))}
+                        <LoadMoreSentinel onVisible={loadMore} disabled={!nextCursor || loadingMore} />
                     </div>
                 ) : (
                     <div className="text-center text-gray-500 py-12 bg-gray-50 dark:bg-gray-800/30 rounded-lg border border-dashed border-gray-300 dark:border-gray-700">
@@ -4,8 +4,8 @@ import { type Movie, type MovieDetails } from '../types';
 import { Button } from '../components/Button';
 import { MovieCard } from '../components/MovieCard';
 import { MovieDetailsModal } from '../components/MovieDetailsModal';
-import { useState } from 'react';
-import { getMovieDetails } from '../services/api';
+import { useEffect, useState } from 'react';
+import { getMovieDetails, getMoviesBatch } from '../services/api';
 
 interface SelectedMoviesPageProps {
     selectedMovies: Movie[];
@@ -16,9 +16,24 @@ interface SelectedMoviesPageProps {
 export const SelectedMoviesPage = ({ selectedMovies, onToggleSelect, onClearSelection }: SelectedMoviesPageProps) => {
     const [selectedDetailMovie, setSelectedDetailMovie] = useState<MovieDetails | null>(null);
     const [isModalOpen, setIsModalOpen] = useState(false);
+    const [detailsById, setDetailsById] = useState<Record<number, MovieDetails>>({});
+
+    // Hydrate details for the whole grid in one request so the modal opens instantly
+    useEffect(() => {
+        const missingIds = selectedMovies.map(m => m.id).filter(id => !detailsById[id]);
+        if (missingIds.length === 0) return;
+        getMoviesBatch(missingIds).then(results => {
+            setDetailsById(prev => {
+                const next = { ...prev };
+                results.forEach(details => { next[details.id] = details; });
+                return next;
+            });
+        });
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [selectedMovies]);
 
     const handleDetailsClick = async (movie: Movie) => {
-        const details = await getMovieDetails(movie.id);
+        const details = detailsById[movie.id] ?? await getMovieDetails(movie.id);
         if (details) {
             setSelectedDetailMovie(details);
             setIsModalOpen(true);
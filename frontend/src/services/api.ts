@@ -1,34 +1,121 @@
 import axios from 'axios';
-import type { Movie, MovieDetails, RecommendationsResponse } from '../types';
+import type { Movie, MovieDetails, Page, RecommendationsResponse, RecommendationsStreamEvent } from '../types';
 
 const API_Base_URL = 'http://localhost:8000/api';
 
-export const searchMovies = async (query: string): Promise<Movie[]> => {
-    if (!query) return [];
+// Paginated endpoints return the cursor of the next page in this header
+const nextCursorOf = (headers: Record<string, unknown>): string | null =>
+    (headers['x-next-cursor'] as string | undefined) ?? null;
+
+export const searchMovies = async (query: string, cursor?: string, signal?: AbortSignal): Promise<Page<Movie>> => {
+    if (!query) return { items: [], nextCursor: null };
     try {
         const response = await axios.get(`${API_Base_URL}/movies/search`, {
-            params: { query }
+            params: { query, cursor },
+            signal
         });
-        return response.data;
+        return { items: response.data, nextCursor: nextCursorOf(response.headers) };
     } catch (error) {
         console.error("Search error:", error);
-        return [];
+        return { items: [], nextCursor: null };
     }
 };
 
-export const getRecommendations = async (selectedMovieIds: number[]): Promise<RecommendationsResponse> => {
+// Server-side state of the last selection we got recommendations for; sending it back
+// lets the server fetch only the movies that were added since
+let recommendationSession: string | null = null;
+
+const sessionParams = (selectedMovieIds: number[]) => ({
+    movie_ids: selectedMovieIds.join(','),
+    ...(recommendationSession ? { session: recommendationSession } : {})
+});
+
+export const getRecommendations = async (selectedMovieIds: number[], signal?: AbortSignal): Promise<RecommendationsResponse> => {
     if (selectedMovieIds.length === 0) return { sequels: [], recommendations: [] };
     try {
         const response = await axios.get(`${API_Base_URL}/recommendations`, {
-            params: { movie_ids: selectedMovieIds.join(',') }
+            params: sessionParams(selectedMovieIds),
+            signal
         });
+        recommendationSession = response.headers['x-recommendation-session'] ?? recommendationSession;
         return response.data;
     } catch (error) {
-        console.error("Recommendation error:", error);
+        if (!axios.isCancel(error)) console.error("Recommendation error:", error);
         return { sequels: [], recommendations: [] };
     }
 };
 
+// Identifies this tab to the typeahead endpoint, which only lets the latest keystroke
+// of a session go upstream
+const TYPEAHEAD_SESSION = Math.random().toString(36).slice(2);
+
+// Most suggestions the typeahead endpoint returns (its default, and maximum, limit)
+export const TYPEAHEAD_LIMIT = 10;
+
+// Suggestions while typing; null when the request was superseded (204) or aborted
+export const typeaheadSearch = async (query: string, signal: AbortSignal): Promise<Movie[] | null> => {
+    try {
+        const response = await axios.get(`${API_Base_URL}/movies/typeahead`, {
+            params: { query, session: TYPEAHEAD_SESSION, limit: TYPEAHEAD_LIMIT },
+            signal
+        });
+        return response.status === 204 ? null : response.data;
+    } catch (error) {
+        if (!axios.isCancel(error)) console.error("Typeahead error:", error);
+        return null;
+    }
+};
+
+// Pages after the first one (cursor from the first response or the stream's "done" event)
+export const getMoreRecommendations = async (selectedMovieIds: number[], cursor: string): Promise<Page<Movie>> => {
+    try {
+        const response = await axios.get(`${API_Base_URL}/recommendations`, {
+            params: { ...sessionParams(selectedMovieIds), cursor }
+        });
+        return { items: response.data.recommendations, nextCursor: nextCursorOf(response.headers) };
+    } catch (error) {
+        console.error("Recommendation error:", error);
+        return { items: [], nextCursor: null };
+    }
+};
+
+// Streams /recommendations/stream (NDJSON): onEvent is called for every line as it arrives,
+// so the page can render sequels and a first ranking before every upstream call is done.
+// Aborting the signal closes the connection, which makes the server cancel its upstream calls.
+export const streamRecommendations = async (
+    selectedMovieIds: number[],
+    onEvent: (event: RecommendationsStreamEvent) => void,
+    signal?: AbortSignal
+): Promise<void> => {
+    if (selectedMovieIds.length === 0) {
+        onEvent({ type: 'done', sequels: [], recommendations: [], next_cursor: null, session: null });
+        return;
+    }
+    const params = new URLSearchParams(sessionParams(selectedMovieIds));
+    const response = await fetch(`${API_Base_URL}/recommendations/stream?${params}`, { signal });
+    if (!response.ok || !response.body) {
+        throw new Error(`Recommendation stream failed: ${response.status}`);
+    }
+
+    const handle = (event: RecommendationsStreamEvent) => {
+        if (event.type === 'done' && event.session) recommendationSession = event.session;
+        onEvent(event);
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop() ?? '';
+        lines.filter(line => line.trim()).forEach(line => handle(JSON.parse(line)));
+    }
+    if (buffer.trim()) handle(JSON.parse(buffer));
+};
+
 export const getMovieDetails = async (movieId: number): Promise<MovieDetails | null> => {
     try {
         const response = await axios.get(`${API_Base_URL}/movies/${movieId}`);
@@ -39,6 +126,17 @@ export const getMovieDetails = async (movieId: number): Promise<MovieDetails | n
     }
 };
 
+export const getMoviesBatch = async (movieIds: number[]): Promise<MovieDetails[]> => {
+    if (movieIds.length === 0) return [];
+    try {
+        const response = await axios.post(`${API_Base_URL}/movies/batch`, { ids: movieIds });
+        return response.data;
+    } catch (error) {
+        console.error("Batch details error:", error);
+        return [];
+    }
+};
+
 export const getWeeklyTrends = async (): Promise<Movie[]> => {
     try {
         const response = await axios.get(`${API_Base_URL}/movies/trends`);
@@ -0,0 +1,11 @@
+// Poster URLs from the API look like `${API}/images/w342/abc.jpg` (see backend/services/models.py);
+// the same image is available in TMDB's other widths by swapping the size segment.
+const SIZED_IMAGE = /\/images\/w\d+\//;
+
+const POSTER_WIDTHS = [185, 342, 500, 780];
+
+export const posterSrcSet = (poster: string, widths: number[] = POSTER_WIDTHS): string | undefined => {
+    // Placeholders (and anything not proxied) have no variants
+    if (!SIZED_IMAGE.test(poster)) return undefined;
+    return widths.map(w => `${poster.replace(SIZED_IMAGE, `/images/w${w}/`)} ${w}w`).join(', ');
+};
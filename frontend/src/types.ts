@@ -21,7 +21,20 @@ export interface SequelGroup {
     movies: Movie[];
 }
 
+// One page of a paginated list; nextCursor is null on the last page
+export interface Page<T> {
+    items: T[];
+    nextCursor: string | null;
+}
+
 export interface RecommendationsResponse {
     sequels: SequelGroup[];
     recommendations: Movie[];
 }
+
+export type RecommendationsStreamEvent =
+    | { type: 'sequel'; group: SequelGroup }
+    | { type: 'recommendations'; recommendations: Movie[] }
+    // partial: the server's deadline passed before every upstream call was back
+    | { type: 'done'; sequels: SequelGroup[]; recommendations: Movie[]; next_cursor: string | null; session: string | null; partial?: boolean }
+    | { type: 'error'; error: string };